@@ -5,10 +5,13 @@ Provides alerts with context, explanations, and actionable recommendations.
 Moves beyond simple anomaly detection to proactive guidance.
 """
 
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+import itertools
+
+from ..alerting import AlertStore, AlertGrouper, EnrichmentCache, EnrichmentPool, alert_fingerprint, alert_region
 
 
 class AlertPriority(Enum):
@@ -53,6 +56,10 @@ class Alert:
     confidence: float
     created_at: datetime
     metadata: Dict[str, Any]
+    fingerprint: Tuple[str, str, str] = ()  # (metric, region, direction)
+    occurrences: int = 1  # Anomalies grouped into this alert
+    last_seen: Optional[datetime] = None
+    enrichment_status: str = "complete"  # "pending", "complete" or "failed"
 
 
 class AlertAgent:
@@ -65,6 +72,7 @@ class AlertAgent:
     - Impact assessment
     - Action recommendation generation
     - Priority and urgency scoring
+    - Fingerprint grouping of repeated anomalies
     
     Example:
         >>> agent = AlertAgent()
@@ -77,16 +85,59 @@ class AlertAgent:
         ...     print(f"  Action: {action.action}")
     """
     
-    def __init__(self, llm_provider: str = "openai"):
+    def __init__(
+        self,
+        llm_provider: str = "openai",
+        history_size: int = 10000,
+        group_window: float = 900.0,
+        enrichment_cache_size: int = 1024,
+        enrichment_ttl: Optional[float] = 3600.0,
+        async_enrichment: bool = False,
+        enrichment_batch_size: int = 16,
+        enrichment_concurrency: int = 4,
+        enrichment_rate_limit: Optional[float] = None
+    ):
         """
         Initialize Alert Agent.
         
         Args:
             llm_provider: LLM provider for explanation generation
+            history_size: Resolved alerts kept in the history archive
+            group_window: Seconds after an alert's last occurrence in which
+                anomalies with the same fingerprint are grouped into it
+            enrichment_cache_size: Fingerprint and severity pairs whose root causes and actions are cached
+            enrichment_ttl: Seconds cached root causes and actions are reused
+            async_enrichment: Return alerts before their LLM enrichment
+                (description, root causes, actions) and fill it in from a
+                background worker pool
+            enrichment_batch_size: Alerts combined into one enrichment request
+            enrichment_concurrency: Maximum enrichment requests in flight
+            enrichment_rate_limit: Maximum enrichment requests per second (unlimited if None)
         """
         self.llm_provider = llm_provider
-        self.active_alerts = []
-        self.alert_history = []
+        self.alerts = AlertStore(history_size=history_size)
+        self.grouper = AlertGrouper(window_seconds=group_window)
+        self.enrichment_cache = EnrichmentCache(max_entries=enrichment_cache_size, ttl=enrichment_ttl)
+        self._alert_sequence = itertools.count()  # Keeps ids unique within one timestamp tick
+        self.enrichment_pool = None
+        if async_enrichment:
+            self.enrichment_pool = EnrichmentPool(
+                self._enrich_batch,
+                self._apply_enrichment,
+                max_batch_size=enrichment_batch_size,
+                max_concurrency=enrichment_concurrency,
+                rate_limit=enrichment_rate_limit
+            )
+    
+    @property
+    def active_alerts(self) -> List[Alert]:
+        """Open (active or acknowledged) alerts, oldest first."""
+        return list(self.alerts)
+    
+    @property
+    def alert_history(self) -> List[Alert]:
+        """Archived (resolved) alerts, oldest first; bounded by history_size."""
+        return list(self.alerts.history)
     
     def create_alert(
         self,
@@ -96,6 +147,14 @@ class AlertAgent:
         """
         Create a contextual alert from anomaly data.
         
+        If an open alert with the same (metric, region, direction)
+        fingerprint had an occurrence within the grouping window, the
+        anomaly is added to that alert as another occurrence instead.
+        
+        With async_enrichment, the alert is returned with its enrichment
+        pending (enrichment_status "pending"); description, root causes,
+        suggested actions and confidence are filled in when ready.
+        
         Args:
             anomaly_data: Detected anomaly information
             context: Additional context for the alert
@@ -103,12 +162,21 @@ class AlertAgent:
         Returns:
             Contextual alert with suggested actions
         """
-        # Generate alert title and description
-        title = self._generate_alert_title(anomaly_data)
-        description = self._generate_alert_description(anomaly_data, context)
+        fingerprint = alert_fingerprint(anomaly_data, context)
+        seen_at = context.get('detected_at')
+        if not isinstance(seen_at, datetime):
+            seen_at = datetime.now()
+            
+        alert_id = self.grouper.match(fingerprint, seen_at.timestamp())
+        if alert_id is not None:
+            alert = self.alerts.get(alert_id)
+            if alert is not None:
+                self._add_occurrence(alert, anomaly_data, context, seen_at)
+                return alert
+            self.grouper.forget(alert_id)
         
-        # Analyze root causes
-        root_causes = self._identify_root_causes(anomaly_data, context)
+        # Generate alert title
+        title = self._generate_alert_title(anomaly_data)
         
         # Assess impact
         impact_assessment = self._assess_impact(anomaly_data, context)
@@ -116,32 +184,47 @@ class AlertAgent:
         # Determine priority
         priority = self._determine_priority(anomaly_data, impact_assessment)
         
-        # Generate suggested actions
-        suggested_actions = self._generate_suggested_actions(
-            anomaly_data, root_causes, impact_assessment
-        )
-        
-        # Calculate confidence
-        confidence = self._calculate_confidence(anomaly_data, root_causes)
-        
         alert = Alert(
-            id=f"alert_{datetime.now().timestamp()}",
+            id=f"alert_{datetime.now().timestamp()}_{next(self._alert_sequence)}",
             title=title,
-            description=description,
+            description="",
             priority=priority,
             status=AlertStatus.ACTIVE,
             context=context,
-            root_causes=root_causes,
+            root_causes=[],
             impact_assessment=impact_assessment,
-            suggested_actions=suggested_actions,
-            confidence=confidence,
+            suggested_actions=[],
+            confidence=self._calculate_confidence(anomaly_data, []),
             created_at=datetime.now(),
-            metadata=anomaly_data
+            metadata=anomaly_data,
+            fingerprint=fingerprint,
+            last_seen=seen_at,
+            enrichment_status="pending"
         )
         
-        self.active_alerts.append(alert)
+        self.alerts.add(alert)
+        self.grouper.track(fingerprint, alert.id, seen_at.timestamp())
+        
+        # Generate description, root causes and suggested actions
+        self._enrich(alert)
         return alert
     
+    def wait_for_enrichment(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued alert enrichment has been applied.
+        
+        Returns:
+            True if no enrichment is pending, False on timeout
+        """
+        if self.enrichment_pool is None:
+            return True
+        return self.enrichment_pool.join(timeout)
+    
+    def close(self) -> None:
+        """Finish queued enrichment and stop the enrichment workers."""
+        if self.enrichment_pool is not None:
+            self.enrichment_pool.close()
+    
     def get_active_alerts(
         self,
         priority_filter: Optional[AlertPriority] = None
@@ -155,39 +238,116 @@ class AlertAgent:
         Returns:
             List of active alerts
         """
-        alerts = [a for a in self.active_alerts if a.status == AlertStatus.ACTIVE]
-        
         if priority_filter:
-            alerts = [a for a in alerts if a.priority == priority_filter]
-        
-        return sorted(alerts, key=lambda x: self._priority_score(x.priority), reverse=True)
+            priorities = [priority_filter]
+        else:
+            priorities = sorted(AlertPriority, key=self._priority_score, reverse=True)
+        return self.alerts.select([AlertStatus.ACTIVE], priorities)
     
     def acknowledge_alert(self, alert_id: str) -> bool:
         """Mark alert as acknowledged."""
-        for alert in self.active_alerts:
-            if alert.id == alert_id:
-                alert.status = AlertStatus.ACKNOWLEDGED
-                return True
-        return False
+        return self.alerts.set_status(alert_id, AlertStatus.ACKNOWLEDGED) is not None
     
     def resolve_alert(self, alert_id: str, resolution_notes: str = "") -> bool:
-        """Mark alert as resolved."""
-        for alert in self.active_alerts:
-            if alert.id == alert_id:
-                alert.status = AlertStatus.RESOLVED
-                alert.metadata['resolution_notes'] = resolution_notes
-                alert.metadata['resolved_at'] = datetime.now()
-                self.alert_history.append(alert)
-                self.active_alerts.remove(alert)
-                return True
-        return False
+        """Mark alert as resolved and move it to the history archive."""
+        alert = self.alerts.archive(alert_id, AlertStatus.RESOLVED)
+        if alert is None:
+            return False
+        self.grouper.forget(alert_id)
+        alert.metadata['resolution_notes'] = resolution_notes
+        alert.metadata['resolved_at'] = datetime.now()
+        return True
+    
+    def _add_occurrence(
+        self,
+        alert: Alert,
+        anomaly_data: Dict[str, Any],
+        context: Dict[str, Any],
+        seen_at: datetime
+    ) -> None:
+        """
+        Fold a repeated anomaly into its open alert.
+        
+        An occurrence that escalates the priority becomes the anomaly the
+        alert describes: impact is reassessed and the description, root
+        causes and suggested actions are generated again, since they depend
+        on the size of the change.
+        """
+        alert.occurrences += 1
+        alert.last_seen = max(alert.last_seen, seen_at) if alert.last_seen else seen_at
+        impact_assessment = self._assess_impact(anomaly_data, context)
+        priority = self._determine_priority(anomaly_data, impact_assessment)
+        if self._priority_score(priority) > self._priority_score(alert.priority):
+            self.alerts.set_priority(alert.id, priority)
+            alert.impact_assessment = impact_assessment
+            alert.metadata = {**alert.metadata, **anomaly_data}
+            self._enrich(alert)
+    
+    def _enrich(self, alert: Alert) -> None:
+        """Generate an alert's LLM-backed fields, in the background if enabled."""
+        alert.enrichment_status = "pending"
+        if self.enrichment_pool is not None:
+            self.enrichment_pool.submit(alert)
+        else:
+            self._apply_enrichment(alert, self._enrich_batch([alert])[0], None)
+    
+    def _enrich_batch(self, alerts: List[Alert]) -> List[Dict[str, Any]]:
+        """
+        Generate the LLM-backed fields of several alerts in one request.
+        
+        Root causes and suggested actions are reused per fingerprint and
+        severity (they depend on the size of the change, not only its
+        direction), so only alerts whose key is not cached ask for them.
+        """
+        # Placeholder: send one prompt covering every alert in the batch and
+        # parse a section per alert from the response
+        enrichments = []
+        for alert in alerts:
+            anomaly_data, context = alert.metadata, alert.context
+            cache_key = (*alert.fingerprint, self._assess_severity(anomaly_data))
+            enrichment = self.enrichment_cache.get(cache_key)
+            if enrichment is None:
+                root_causes = self._identify_root_causes(anomaly_data, context)
+                enrichment = {
+                    'root_causes': root_causes,
+                    'suggested_actions': self._generate_suggested_actions(
+                        anomaly_data, root_causes, alert.impact_assessment
+                    )
+                }
+                self.enrichment_cache.put(cache_key, enrichment)
+            enrichments.append({
+                'description': self._generate_alert_description(anomaly_data, context),
+                'anomaly_data': anomaly_data,
+                **enrichment
+            })
+        return enrichments
+    
+    def _apply_enrichment(
+        self,
+        alert: Alert,
+        enrichment: Optional[Dict[str, Any]],
+        error: Optional[BaseException]
+    ) -> None:
+        """Fill in an alert's enrichment fields (or mark the enrichment failed)."""
+        if error is not None:
+            alert.enrichment_status = "failed"
+            return
+        if enrichment['anomaly_data'] is not alert.metadata:
+            return  # Superseded: the alert escalated and was queued again
+        alert.description = enrichment['description']
+        alert.root_causes = list(enrichment['root_causes'])
+        alert.suggested_actions = list(enrichment['suggested_actions'])
+        alert.confidence = self._calculate_confidence(alert.metadata, alert.root_causes)
+        alert.enrichment_status = "complete"
     
     def _generate_alert_title(self, anomaly_data: Dict[str, Any]) -> str:
         """Generate alert title."""
         metric = anomaly_data.get('metric', 'Unknown metric')
         change = anomaly_data.get('change', 0)
+        # The percent change is 0 against a zero baseline; the direction is not
+        direction = anomaly_data.get('direction')
         
-        if change < 0:
+        if direction == "down" or (direction is None and change < 0):
             return f"Declining {metric} detected ({change}%)"
         else:
             return f"Spike in {metric} detected (+{change}%)"
@@ -201,7 +361,7 @@ class AlertAgent:
         # Placeholder: Use LLM to generate contextual description
         metric = anomaly_data.get('metric', 'metric')
         change = anomaly_data.get('change', 0)
-        region = context.get('region', 'Unknown region')
+        region = alert_region(context) or 'Unknown region'
         timeframe = context.get('timeframe', 'recent period')
         
         return (
@@ -220,7 +380,8 @@ class AlertAgent:
         # Analyze context and data to identify causes
         # Placeholder: Use LLM and rule-based analysis
         
-        if 'region' in context and context['region'] == 'EU':
+        # Same region as the fingerprint, which keys the enrichment cache
+        if alert_region(context) == 'EU':
             root_causes.append("Regulatory uncertainty in EU markets")
             root_causes.append("Economic conditions affecting consumer behavior")
         
@@ -235,20 +396,24 @@ class AlertAgent:
         context: Dict[str, Any]
     ) -> str:
         """Assess the impact of the anomaly."""
-        change_magnitude = abs(anomaly_data.get('change', 0))
-        
-        if change_magnitude > 20:
-            severity = "High"
-        elif change_magnitude > 10:
-            severity = "Medium"
-        else:
-            severity = "Low"
+        severity = self._assess_severity(anomaly_data)
         
         # Calculate affected portfolio percentage (placeholder)
         affected_pct = 22
         
         return f"{severity} - affects {affected_pct}% of portfolio allocation"
     
+    def _assess_severity(self, anomaly_data: Dict[str, Any]) -> str:
+        """Severity bucket of the change magnitude: High, Medium or Low."""
+        change_magnitude = abs(anomaly_data.get('change', 0))
+        
+        if change_magnitude > 20:
+            return "High"
+        elif change_magnitude > 10:
+            return "Medium"
+        else:
+            return "Low"
+    
     def _determine_priority(
         self,
         anomaly_data: Dict[str, Any],
@@ -336,16 +501,18 @@ class AlertAgent:
         return priority_map.get(priority, 0)
     
     def get_alert_summary(self) -> Dict[str, Any]:
-        """Get summary of all alerts."""
+        """Get summary of all alerts (from counters kept by the alert store)."""
+        by_priority = self.alerts.priority_counts
         return {
-            'total_active': len([a for a in self.active_alerts if a.status == AlertStatus.ACTIVE]),
+            'total_active': self.alerts.status_counts.get(AlertStatus.ACTIVE, 0),
             'by_priority': {
-                'critical': len([a for a in self.active_alerts if a.priority == AlertPriority.CRITICAL]),
-                'high': len([a for a in self.active_alerts if a.priority == AlertPriority.HIGH]),
-                'medium': len([a for a in self.active_alerts if a.priority == AlertPriority.MEDIUM]),
-                'low': len([a for a in self.active_alerts if a.priority == AlertPriority.LOW])
+                'critical': by_priority.get(AlertPriority.CRITICAL, 0),
+                'high': by_priority.get(AlertPriority.HIGH, 0),
+                'medium': by_priority.get(AlertPriority.MEDIUM, 0),
+                'low': by_priority.get(AlertPriority.LOW, 0)
             },
-            'total_resolved': len(self.alert_history)
+            'total_resolved': self.alerts.archived_counts.get(AlertStatus.RESOLVED, 0),
+            'grouped_occurrences': self.grouper.grouped
         }
 
 
@@ -4,10 +4,37 @@ Personalized Recommendations Agent
 Suggests datasets, papers, and insights based on researchers' activities and interests.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional
 from dataclasses import dataclass
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import copy
+import heapq
+import multiprocessing
+import os
+import pickle
+import time
+
+from ..recommendation import (
+    ActivityStore,
+    ContentCatalog,
+    ItemSimilarityModel,
+    PreferenceVectors,
+    RecommendationStore,
+    SharedSparseMatrix,
+    content_embedding,
+    interaction_weight,
+)
+from ..recommendation.activity import to_seconds
+from ..recommendation.precompute import init_worker, recommend_batch
+
+# Most candidates each source contributes to a ranking
+CONTENT_BASED_CANDIDATES = 5
+COLLABORATIVE_CANDIDATES = 5
+TRENDING_CANDIDATES = 3
+SIMILAR_USER_CANDIDATES = 3
 
 
 @dataclass
@@ -23,6 +50,14 @@ class Recommendation:
     metadata: Dict[str, Any] = None
 
 
+class _Candidate(NamedTuple):
+    """Scored candidate; ``position`` is the content's interned catalogue id."""
+    score: float
+    position: int
+    source: str
+    reason: str
+
+
 @dataclass
 class UserProfile:
     """User activity profile."""
@@ -52,17 +87,74 @@ class RecommendationAgent:
         ...     print(f"{rec.title} - Relevance: {rec.relevance_score:.2f}")
     """
     
-    def __init__(self, llm_provider: str = "openai"):
+    def __init__(
+        self,
+        llm_provider: str = "openai",
+        collaborative_neighbours: int = 50,
+        collaborative_refresh_interval: float = 300.0,
+        activity_retention_days: float = 30,
+        max_activities_per_user: int = 1000,
+        trending_window_hours: int = 24,
+        preference_half_life_days: float = 14,
+        user_index_backend: str = "flat",
+        user_index_params: Optional[Dict[str, Any]] = None,
+        precompute_path: Optional[str] = None,
+        precompute_ttl: float = 3600.0
+    ):
         """
         Initialize Recommendation Agent.
         
         Args:
             llm_provider: LLM provider for content understanding
+            collaborative_neighbours: Similar items kept per item for collaborative filtering
+            collaborative_refresh_interval: Minimum seconds between rebuilds of the
+                item-item model when new interactions arrive
+            activity_retention_days: Activities older than this are dropped
+            max_activities_per_user: Most recent activities kept per user
+            trending_window_hours: Window (in hourly buckets) for trending items
+            preference_half_life_days: Age at which an interaction's weight in the
+                preference vector has halved
+            user_index_backend: Vector index for similar-user lookup ("flat" for
+                exact search, or an ANN backend such as "ivf_flat" or "hnsw")
+            user_index_params: Parameters for the user index backend
+            precompute_path: sqlite file for precomputed recommendation lists
+                (an in-memory store is created by precompute_all if None)
+            precompute_ttl: Seconds a precomputed list is served for
         """
         self.llm_provider = llm_provider
         self.user_profiles = {}
-        self.content_database = []
-        self.activity_log = defaultdict(list)
+        self.catalog = ContentCatalog()  # Id and tag indexes over content
+        self.content_database = self.catalog.contents
+        self.activity_log = ActivityStore(
+            retention_seconds=activity_retention_days * 86400,
+            max_per_user=max_activities_per_user,
+            bucket_seconds=3600,
+            trending_buckets=trending_window_hours
+        )
+        
+        # Interest/expertise counts are updated per event; profiles built from
+        # them are recomputed lazily when marked dirty
+        self.interest_counts = defaultdict(Counter)
+        self.expertise_counts = defaultdict(Counter)
+        self._dirty_profiles = set()
+        
+        # Preference vectors from content embeddings, with a user vector index
+        self.content_vectors: Dict[str, Any] = {}
+        self.preferences = PreferenceVectors(
+            half_life_seconds=preference_half_life_days * 86400,
+            index_backend=user_index_backend,
+            **(user_index_params or {})
+        )
+        
+        # Item-item collaborative filtering, rebuilt lazily from activity_log
+        self.item_model = ItemSimilarityModel(neighbours=collaborative_neighbours)
+        self.collaborative_refresh_interval = collaborative_refresh_interval
+        self._item_model_built_at: Optional[float] = None
+        self._interactions_since_build = 0
+        
+        # Precomputed lists served by get_recommendations while fresh
+        self.recommendation_store = RecommendationStore(precompute_path) if precompute_path else None
+        self.precompute_ttl = precompute_ttl
     
     def get_recommendations(
         self,
@@ -73,6 +165,9 @@ class RecommendationAgent:
         """
         Get personalized recommendations for a user.
         
+        Lists written by precompute_all are served while younger than
+        precompute_ttl; otherwise recommendations are computed on the spot.
+        
         Args:
             user_id: User identifier
             limit: Maximum number of recommendations
@@ -81,58 +176,256 @@ class RecommendationAgent:
         Returns:
             List of personalized recommendations
         """
-        # Get or create user profile
-        profile = self._get_user_profile(user_id)
+        precomputed = self._precomputed_recommendations(user_id, limit, min_score)
+        if precomputed is not None:
+            return precomputed
+        return self._rank_recommendations(user_id, limit, min_score)
+    
+    def precompute_all(
+        self,
+        user_ids: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        limit: int = 50,
+        batch_size: int = 256,
+        start_method: Optional[str] = None
+    ) -> int:
+        """
+        Precompute ranked recommendation lists for many users in parallel.
         
-        # Generate recommendations from different sources
-        content_based = self._content_based_recommendations(profile)
-        collaborative = self._collaborative_recommendations(profile)
-        trending = self._trending_recommendations()
-        similar_users = self._similar_user_recommendations(profile)
+        Workers get one pickled snapshot of the agent, with the item-item
+        neighbour matrix shared through shared memory, and the lists are
+        written to the recommendation store.
         
-        # Combine and rank recommendations
-        all_recommendations = (
-            content_based + collaborative + trending + similar_users
-        )
+        Args:
+            user_ids: Users to precompute (all users with retained activity if None)
+            workers: Worker processes (CPU count if None; 1 runs in-process)
+            limit: Items stored per user (requests for more are computed live)
+            batch_size: Users per worker task
+            start_method: multiprocessing start method (platform default if None)
+            
+        Returns:
+            Number of users precomputed
+        """
+        user_ids = list(user_ids) if user_ids is not None else self.activity_log.users()
+        if self.recommendation_store is None:
+            self.recommendation_store = RecommendationStore()
+        store = self.recommendation_store
+        
+        # Bring shared state up to date once, so workers never rebuild it
+        if self._interactions_since_build or not self.item_model.is_fitted:
+            self.build_collaborative_model()
+        self.refresh_profiles()
+        
+        batches = [user_ids[start:start + batch_size] for start in range(0, len(user_ids), batch_size)]
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        if workers <= 1 or len(batches) <= 1:
+            for batch in batches:
+                store.put_many([(user_id, self._ranked_rows(user_id, limit)) for user_id in batch], limit)
+            return len(user_ids)
+            
+        context = multiprocessing.get_context(start_method)
+        with SharedSparseMatrix(self.item_model.similarities) as shared:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(batches)),
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(self._worker_snapshot(), shared.spec)
+            ) as pool:
+                for results in pool.map(recommend_batch, batches, repeat(limit)):
+                    store.put_many(results, limit)
+        return len(user_ids)
+    
+    def _rank_recommendations(
+        self,
+        user_id: str,
+        limit: int,
+        min_score: float
+    ) -> List[Recommendation]:
+        """
+        Compute recommendations from all candidate sources.
+        
+        Each source lazily yields at most its own cap of candidates (and
+        never more than ``limit``), best first, so no single source can
+        crowd out the others.
+        The sources are merged by score and deduplicated on content as they
+        stream, and merging stops after ``limit`` results or at the first
+        candidate below min_score, so Recommendation objects are only built
+        for returned items.
+        """
+        profile = self._get_user_profile(user_id)
         
-        # Remove duplicates and filter by score
-        unique_recs = self._deduplicate_recommendations(all_recommendations)
-        filtered_recs = [r for r in unique_recs if r.relevance_score >= min_score]
+        # Equal scores keep source order: content-based, collaborative, trending, similar users
+        sources = [
+            self._content_based_candidates(profile, limit),
+            self._collaborative_candidates(profile, limit),
+            self._trending_candidates(limit),
+            self._similar_user_candidates(profile, limit)
+        ]
         
-        # Sort by relevance and return top N
-        sorted_recs = sorted(
-            filtered_recs,
-            key=lambda x: x.relevance_score,
-            reverse=True
-        )
-        
-        return sorted_recs[:limit]
+        recommendations = []
+        seen = set()
+        for candidate in heapq.merge(*sources, key=lambda c: -c.score):
+            if len(recommendations) >= limit or candidate.score < min_score:
+                break
+            if candidate.position in seen:
+                continue
+            seen.add(candidate.position)
+            recommendations.append(self._build_recommendation(candidate))
+            
+        return recommendations
+    
+    def _precomputed_recommendations(
+        self,
+        user_id: str,
+        limit: int,
+        min_score: float
+    ) -> Optional[List[Recommendation]]:
+        """Serve a fresh precomputed list, or None if there is none or it is too short."""
+        if self.recommendation_store is None:
+            return None
+        entry = self.recommendation_store.get(user_id, max_age=self.precompute_ttl)
+        if entry is None:
+            return None
+            
+        rows = entry['items']
+        selected = [row for row in rows if row['relevance_score'] >= min_score]
+        # A list cut off at its generation limit may lack items this request needs
+        if len(selected) < limit and len(selected) == len(rows) and len(rows) >= entry['limit']:
+            return None
+        return [self._recommendation_from_row(row) for row in selected[:limit]]
+    
+    def _ranked_rows(self, user_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Ranked recommendations for a user as storable rows (without score cut-off)."""
+        rows = []
+        for rec in self._rank_recommendations(user_id, limit, min_score=0.0):
+            rows.append({
+                'id': rec.id,
+                'type': rec.type,
+                'title': rec.title,
+                'description': rec.description,
+                'relevance_score': float(rec.relevance_score),
+                'reasons': list(rec.reasons),
+                'url': rec.url,
+                'content_id': (rec.metadata or {}).get('id')
+            })
+        return rows
+    
+    def _recommendation_from_row(self, row: Dict[str, Any]) -> Recommendation:
+        """Rebuild a Recommendation from a stored row, re-attaching its content."""
+        fields = dict(row)
+        content_id = fields.pop('content_id')
+        content = self._find_content_by_id(content_id) if content_id is not None else None
+        return Recommendation(metadata=content, **fields)
+    
+    def _worker_snapshot(self) -> bytes:
+        """Pickled copy of the agent for precompute workers, minus shared and unpicklable parts."""
+        snapshot = copy.copy(self)
+        snapshot.recommendation_store = None
+        snapshot.item_model = copy.copy(self.item_model)
+        # Workers map the neighbour matrix from shared memory and never refit
+        snapshot.item_model.similarities = None
+        snapshot.item_model.interactions = None
+        return pickle.dumps(snapshot)
     
     def track_activity(self, user_id: str, activity: Dict[str, Any]) -> None:
         """
         Track user activity for building profile.
         
+        Interest and expertise counters are updated in O(1); the profile is
+        only marked dirty and rebuilt the next time it is read (or by
+        refresh_profiles).
+        
         Args:
             user_id: User identifier
             activity: Activity data (type, item, timestamp, etc.)
         """
         activity['timestamp'] = activity.get('timestamp', datetime.now())
-        self.activity_log[user_id].append(activity)
+        self._count_activity(user_id, activity)
+        for expired_user_id, expired in self.activity_log.append(user_id, activity):
+            # Counters cover retained activity only
+            self._count_activity(expired_user_id, expired, -1)
+            self._dirty_profiles.add(expired_user_id)
+        if 'item_id' in activity:
+            self._interactions_since_build += 1
+        
+        embedding = self.content_vectors.get(activity.get('item_id'))
+        if embedding is not None:
+            self.preferences.update(
+                user_id,
+                embedding,
+                weight=interaction_weight(activity.get('type')),
+                timestamp=to_seconds(activity['timestamp'])
+            )
+        self._get_user_profile(user_id, refresh=False)
+        self._dirty_profiles.add(user_id)
+    
+    def refresh_profiles(self, user_ids: Optional[List[str]] = None) -> int:
+        """
+        Rebuild dirty user profiles.
+        
+        Intended for a periodic batch worker so reads rarely pay for a rebuild.
         
-        # Update user profile
-        self._update_user_profile(user_id)
+        Args:
+            user_ids: Users to refresh (all dirty profiles if None)
+            
+        Returns:
+            Number of profiles rebuilt
+        """
+        dirty = self._dirty_profiles if user_ids is None else self._dirty_profiles.intersection(user_ids)
+        refreshed = list(dirty)
+        for user_id in refreshed:
+            self._update_user_profile(user_id)
+        return len(refreshed)
     
     def add_content(self, content: Dict[str, Any]) -> None:
         """
         Add content to recommendation database.
         
+        Content with an id that is already known replaces the earlier entry.
+        The content embedding is taken from ``content['embedding']`` if given,
+        otherwise derived from its tags, category and title.
+        
         Args:
             content: Content metadata (type, title, description, tags, etc.)
         """
-        self.content_database.append(content)
+        self.catalog.add(content)
+        if content.get('id') is not None:
+            self.content_vectors[content['id']] = content_embedding(content)
+    
+    def build_collaborative_model(self) -> None:
+        """
+        Rebuild the item-item similarity model from the activity log.
+        
+        Runs automatically (at most every collaborative_refresh_interval
+        seconds) when recommendations are requested after new interactions.
+        """
+        self.item_model.fit(
+            (user_id, item_id, interaction_weight(activity_type))
+            for user_id, item_id, activity_type in self.activity_log.interactions()
+        )
+        self._item_model_built_at = time.monotonic()
+        self._interactions_since_build = 0
     
-    def _get_user_profile(self, user_id: str) -> UserProfile:
-        """Get or create user profile."""
+    def _get_item_model(self) -> ItemSimilarityModel:
+        """Get the item-item model, rebuilding it if it is missing or stale."""
+        if self._interactions_since_build and (
+            self._item_model_built_at is None
+            or time.monotonic() - self._item_model_built_at >= self.collaborative_refresh_interval
+        ):
+            self.build_collaborative_model()
+        return self.item_model
+    
+    def _user_interactions(self, user_id: str) -> Dict[str, float]:
+        """Aggregated interaction weight per item for a user."""
+        weights: Dict[str, float] = {}
+        for item_id, activity_type in self.activity_log.item_events(user_id):
+            weights[item_id] = weights.get(item_id, 0.0) + interaction_weight(activity_type)
+        return weights
+    
+    def _get_user_profile(self, user_id: str, refresh: bool = True) -> UserProfile:
+        """Get or create user profile, rebuilding it first if it is dirty."""
+        if refresh and user_id in self._dirty_profiles:
+            self._update_user_profile(user_id)
         if user_id not in self.user_profiles:
             self.user_profiles[user_id] = UserProfile(
                 user_id=user_id,
@@ -145,154 +438,120 @@ class RecommendationAgent:
     
     def _update_user_profile(self, user_id: str) -> None:
         """Update user profile based on activities."""
-        profile = self._get_user_profile(user_id)
-        activities = self.activity_log[user_id]
+        self._dirty_profiles.discard(user_id)
+        profile = self._get_user_profile(user_id, refresh=False)
+        activities = self.activity_log.recent(user_id, 50)  # Keep last 50
         
         # Extract interests from recent activities
-        profile.recent_activities = activities[-50:]  # Keep last 50
-        profile.interests = self._extract_interests(activities)
-        profile.preference_vector = self._build_preference_vector(activities)
-        profile.expertise_areas = self._identify_expertise(activities)
-    
-    def _extract_interests(self, activities: List[Dict[str, Any]]) -> List[str]:
-        """Extract interest topics from activities."""
-        interests = []
-        for activity in activities:
-            if 'tags' in activity:
-                interests.extend(activity['tags'])
-            if 'category' in activity:
-                interests.append(activity['category'])
-        
-        # Count frequency and return top interests
-        from collections import Counter
-        interest_counts = Counter(interests)
-        return [interest for interest, _ in interest_counts.most_common(10)]
-    
-    def _build_preference_vector(self, activities: List[Dict[str, Any]]) -> List[float]:
-        """Build user preference vector for similarity matching."""
-        # Placeholder: Build embedding-based preference vector
-        import numpy as np
-        return np.random.rand(128).tolist()  # Simulated vector
-    
-    def _identify_expertise(self, activities: List[Dict[str, Any]]) -> List[str]:
-        """Identify user's expertise areas."""
-        # Analyze activities to identify expertise
-        expertise = []
+        profile.recent_activities = activities
+        profile.interests = self._extract_interests(user_id)
+        profile.preference_vector = self._build_preference_vector(user_id)
+        profile.expertise_areas = self._identify_expertise(user_id)
+    
+    def _count_activity(self, user_id: str, activity: Dict[str, Any], delta: int = 1) -> None:
+        """Add an activity to a user's interest and expertise counters (delta -1 removes it)."""
+        interests = self.interest_counts[user_id]
+        keys = list(activity.get('tags', ()))
+        if 'category' in activity:
+            keys.append(activity['category'])
+        counters = [(interests, keys)]
         
         # Activities with "create" or "publish" indicate expertise
-        for activity in activities:
-            if activity.get('type') in ['create', 'publish', 'review']:
-                if 'category' in activity:
-                    expertise.append(activity['category'])
-        
-        from collections import Counter
-        expertise_counts = Counter(expertise)
-        return [area for area, _ in expertise_counts.most_common(5)]
+        if 'category' in activity and activity.get('type') in ['create', 'publish', 'review']:
+            counters.append((self.expertise_counts[user_id], [activity['category']]))
+            
+        for counter, keys in counters:
+            for key in keys:
+                counter[key] += delta
+                if counter[key] <= 0:
+                    del counter[key]
     
-    def _content_based_recommendations(
-        self,
-        profile: UserProfile
-    ) -> List[Recommendation]:
-        """Generate content-based recommendations."""
-        recommendations = []
-        
-        for content in self.content_database:
-            score = self._calculate_content_similarity(profile, content)
-            if score > 0.3:  # Threshold
-                rec = Recommendation(
-                    id=f"rec_{content.get('id', '')}_{datetime.now().timestamp()}",
-                    type=content.get('type', 'content'),
-                    title=content.get('title', ''),
-                    description=content.get('description', ''),
-                    relevance_score=score,
-                    reasons=[
-                        f"Matches your interest in {profile.interests[0] if profile.interests else 'research'}"
-                    ],
-                    url=content.get('url'),
-                    metadata=content
-                )
-                recommendations.append(rec)
-        
-        return recommendations[:5]
+    def _extract_interests(self, user_id: str) -> List[str]:
+        """Top interest topics from the user's activity counters."""
+        return [interest for interest, _ in self.interest_counts[user_id].most_common(10)]
     
-    def _collaborative_recommendations(
-        self,
-        profile: UserProfile
-    ) -> List[Recommendation]:
-        """Generate collaborative filtering recommendations."""
-        # Find similar users and recommend what they liked
-        recommendations = []
-        
-        # Placeholder: Implement collaborative filtering
-        # Using user-user or item-item similarity
-        
-        return recommendations
+    def _build_preference_vector(self, user_id: str) -> List[float]:
+        """User preference vector (decayed average of touched content embeddings)."""
+        vector = self.preferences.vector(user_id)
+        return vector.tolist() if vector is not None else []
     
-    def _trending_recommendations(self) -> List[Recommendation]:
-        """Get trending content across all users."""
-        recommendations = []
-        
-        # Analyze recent activity across all users
-        all_activities = []
-        for activities in self.activity_log.values():
-            all_activities.extend(activities[-10:])  # Recent activities
+    def _identify_expertise(self, user_id: str) -> List[str]:
+        """Identify user's expertise areas from their expertise counters."""
+        return [area for area, _ in self.expertise_counts[user_id].most_common(5)]
+    
+    def _content_based_candidates(
+        self,
+        profile: UserProfile,
+        limit: int
+    ) -> Iterator[_Candidate]:
+        """
+        Content-based candidates, best first.
         
-        # Find trending items
-        from collections import Counter
-        trending_items = Counter(
-            activity.get('item_id') for activity in all_activities
-            if 'item_id' in activity
+        Only content sharing a tag with the user's interests can score, so
+        candidates come from the tag index instead of the whole catalogue,
+        and a bounded heap keeps the best of them.
+        """
+        reason = f"Matches your interest in {profile.interests[0] if profile.interests else 'research'}"
+        contents = self.catalog.contents
+        scored = (
+            (self._calculate_content_similarity(profile, contents[position]), position)
+            for position in self.catalog.positions_with_any_tag(profile.interests)
         )
-        
-        for item_id, count in trending_items.most_common(3):
-            # Find content details
-            content = self._find_content_by_id(item_id)
-            if content:
-                rec = Recommendation(
-                    id=f"trending_{item_id}_{datetime.now().timestamp()}",
-                    type=content.get('type', 'content'),
-                    title=content.get('title', ''),
-                    description=content.get('description', ''),
-                    relevance_score=0.7,
-                    reasons=[f"Trending - {count} recent views"],
-                    url=content.get('url'),
-                    metadata=content
-                )
-                recommendations.append(rec)
-        
-        return recommendations
+        top = heapq.nlargest(min(limit, CONTENT_BASED_CANDIDATES), (entry for entry in scored if entry[0] > 0.3), key=lambda entry: entry[0])
+        for score, position in top:
+            yield _Candidate(score, position, 'rec', reason)
     
-    def _similar_user_recommendations(
+    def _collaborative_candidates(
         self,
-        profile: UserProfile
-    ) -> List[Recommendation]:
-        """Recommendations based on similar users' activities."""
-        recommendations = []
-        
-        # Find users with similar profiles
-        similar_users = self._find_similar_users(profile)
+        profile: UserProfile,
+        limit: int
+    ) -> Iterator[_Candidate]:
+        """
+        Item-item collaborative filtering candidates, best first.
         
-        for similar_user_id in similar_users[:3]:
-            # Get their recent activities
-            similar_activities = self.activity_log[similar_user_id][-10:]
-            
-            for activity in similar_activities:
+        Items are scored by their precomputed similarity to the items the
+        user interacted with (co-occurrence across researchers).
+        """
+        item_ids, scores = self._get_item_model().recommend(self._user_interactions(profile.user_id), k=min(limit, COLLABORATIVE_CANDIDATES))
+        for item_id, score in zip(item_ids, scores):
+            position = self.catalog.position(item_id)
+            if position >= 0:
+                yield _Candidate(float(score), position, 'collab', "Used by researchers with similar activity")
+    
+    def _trending_candidates(self, limit: int) -> Iterator[_Candidate]:
+        """Trending content across all users (from the sliding trending window)."""
+        for item_id, count in self.activity_log.trending(min(limit, TRENDING_CANDIDATES)):
+            position = self.catalog.position(item_id)
+            if position >= 0:
+                yield _Candidate(0.7, position, 'trending', f"Trending - {count} recent views")
+    
+    def _similar_user_candidates(self, profile: UserProfile, limit: int) -> Iterator[_Candidate]:
+        """Content recently liked by the most similar users."""
+        remaining = min(limit, SIMILAR_USER_CANDIDATES)
+        for similar_user_id in self._find_similar_users(profile)[:3]:
+            for activity in self.activity_log.recent(similar_user_id, 10):
                 if activity.get('type') == 'like' and 'item_id' in activity:
-                    content = self._find_content_by_id(activity['item_id'])
-                    if content:
-                        rec = Recommendation(
-                            id=f"similar_{activity['item_id']}_{datetime.now().timestamp()}",
-                            type=content.get('type', 'content'),
-                            title=content.get('title', ''),
-                            description=content.get('description', ''),
-                            relevance_score=0.6,
-                            reasons=[f"Liked by similar researchers"],
-                            url=content.get('url'),
-                            metadata=content
-                        )
-                        recommendations.append(rec)
-        
-        return recommendations[:3]
+                    position = self.catalog.position(activity['item_id'])
+                    if position >= 0:
+                        yield _Candidate(0.6, position, 'similar', "Liked by similar researchers")
+                        remaining -= 1
+                        if remaining == 0:
+                            return
+    
+    def _build_recommendation(self, candidate: _Candidate) -> Recommendation:
+        """Materialize a candidate; the id is stable per source and content."""
+        content = self.catalog.contents[candidate.position]
+        content_key = content.get('id', f"#{candidate.position}")
+        return Recommendation(
+            id=f"{candidate.source}_{content_key}",
+            type=content.get('type', 'content'),
+            title=content.get('title', ''),
+            description=content.get('description', ''),
+            relevance_score=float(candidate.score),
+            reasons=[candidate.reason],
+            url=content.get('url'),
+            metadata=content
+        )
     
     def _calculate_content_similarity(
         self,
@@ -313,60 +572,13 @@ class RecommendationAgent:
         return min(similarity, 1.0)
     
     def _find_similar_users(self, profile: UserProfile) -> List[str]:
-        """Find users with similar profiles."""
-        similar_users = []
-        
-        for user_id, other_profile in self.user_profiles.items():
-            if user_id == profile.user_id:
-                continue
-            
-            # Calculate similarity
-            similarity = self._calculate_profile_similarity(profile, other_profile)
-            if similarity > 0.5:  # Threshold
-                similar_users.append(user_id)
-        
-        return similar_users
-    
-    def _calculate_profile_similarity(
-        self,
-        profile1: UserProfile,
-        profile2: UserProfile
-    ) -> float:
-        """Calculate similarity between two user profiles."""
-        # Interest overlap
-        interests1 = set(profile1.interests)
-        interests2 = set(profile2.interests)
-        
-        if not interests1 or not interests2:
-            return 0.0
-        
-        overlap = len(interests1 & interests2)
-        union = len(interests1 | interests2)
-        
-        return overlap / union if union > 0 else 0.0
+        """Find users with similar preference vectors via the user vector index."""
+        similar = self.preferences.similar(profile.user_id, k=10, min_similarity=0.5)
+        return [user_id for user_id, _ in similar]
     
     def _find_content_by_id(self, content_id: str) -> Optional[Dict[str, Any]]:
         """Find content by ID."""
-        for content in self.content_database:
-            if content.get('id') == content_id:
-                return content
-        return None
-    
-    def _deduplicate_recommendations(
-        self,
-        recommendations: List[Recommendation]
-    ) -> List[Recommendation]:
-        """Remove duplicate recommendations."""
-        seen = set()
-        unique = []
-        
-        for rec in recommendations:
-            key = (rec.type, rec.title)
-            if key not in seen:
-                seen.add(key)
-                unique.append(rec)
-        
-        return unique
+        return self.catalog.get(content_id)
 
 
 # Example usage
@@ -5,11 +5,55 @@ Enables natural language queries across historical research reports, datasets, a
 Uses vector embeddings and semantic similarity for intelligent document retrieval.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+import asyncio
+import os
+import threading
+import time
 import numpy as np
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from ..search import (
+    BM25Index,
+    ChunkTable,
+    CorpusStatistics,
+    EmbeddingCache,
+    EmbeddingMatrix,
+    EmbeddingMicroBatcher,
+    EmbeddingStore,
+    FilterIndex,
+    QueryResultCache,
+    RequestCoalescer,
+    RowMap,
+    ShardedSearchPool,
+    VectorIndex,
+    chunk_document,
+    create_index,
+    measure_recall,
+    reciprocal_rank_fusion,
+    top_k_indices,
+)
+
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid", "lexical_rerank")
+
+# Sharded search: smaller candidate sets are scored in-process, and the pool
+# is rebuilt once rows appended since it was built exceed this fraction
+SHARDED_MIN_CANDIDATES = 20000
+SHARD_REBUILD_FRACTION = 0.1
+
+# Rows parsed per sequential sidecar read when catching up secondary indexes
+CATCH_UP_BATCH_ROWS = 10000
+
+# Rows fed per step when building a vector index over existing rows, so a
+# memory-mapped store is never copied into memory as a whole
+INDEX_BUILD_BATCH_ROWS = 4096
+
+# Backends that keep quantized codes in memory and re-rank from the store
+QUANTIZED_BACKENDS = ("sq8", "pq")
+
 
 @dataclass
 class SearchResult:
@@ -33,6 +77,7 @@ class SemanticSearchAgent:
     - Time-based filtering
     - Multi-document type search
     - Result ranking and relevance scoring
+    - In-place document updates and deletes (tombstones + compaction)
     
     Example:
         >>> agent = SemanticSearchAgent()
@@ -45,43 +90,239 @@ class SemanticSearchAgent:
         self,
         embedding_model: str = "text-embedding-ada-002",
         vector_store_path: Optional[str] = None,
-        llm_provider: str = "openai"
+        llm_provider: str = "openai",
+        index_backend: str = "flat",
+        index_params: Optional[Dict[str, Any]] = None,
+        candidate_multiplier: int = 10,
+        exact_scan_limit: int = 50000,
+        embedding_cache_size: int = 10000,
+        embedding_cache_path: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: int = 0,
+        async_batch_window: float = 0.005,
+        async_max_batch_size: int = 64,
+        retrieval_mode: str = "vector",
+        enable_lexical: bool = True,
+        lexical_candidates: int = 2000,
+        rrf_k: int = 60,
+        compaction_threshold: Optional[float] = 0.2,
+        compaction_min_rows: int = 1000,
+        search_workers: int = 0,
+        result_cache_size: int = 1024,
+        result_cache_ttl: float = 300.0
     ):
         """
         Initialize the Semantic Search Agent.
         
         Args:
             embedding_model: Name of the embedding model to use
-            vector_store_path: Path to vector database (FAISS/Pinecone)
+            vector_store_path: Directory of the persistent memory-mapped embedding
+                store (in-memory only if None)
             llm_provider: LLM provider for query expansion ("openai", "claude", "gemini")
+            index_backend: Vector index backend ("flat", "ivf_flat", "sq8", "pq",
+                "hnsw", "ivf_pq"); "sq8"/"pq" keep only quantized codes in
+                memory and re-rank a shortlist against the memory-mapped
+                float rows, so they require vector_store_path
+            index_params: Backend parameters (e.g. {"nlist": 1024, "nprobe": 16}
+                or {"pq_m": 96, "rerank": 4})
+            candidate_multiplier: ANN candidates fetched per requested result
+                when filters may discard some of them
+            exact_scan_limit: Pre-filtered candidate sets up to this size are
+                scored exactly instead of going through the ANN index
+            embedding_cache_size: Entries in the in-memory embedding LRU (0 disables caching)
+            embedding_cache_path: sqlite file for the on-disk embedding cache
+                (defaults to the vector store directory when persistent)
+            chunk_size: Split documents into passages of about this many
+                characters (index whole documents if None)
+            chunk_overlap: Characters shared by consecutive passages
+            async_batch_window: Seconds asearch() waits to micro-batch query embeddings
+            async_max_batch_size: Query embeddings per micro-batch before flushing early
+            retrieval_mode: Default retrieval mode: "vector", "lexical", "hybrid"
+                (BM25 + vector fused with reciprocal-rank fusion) or
+                "lexical_rerank" (vector-score only the BM25 candidates)
+            enable_lexical: Maintain the BM25 index alongside the embeddings
+            lexical_candidates: Ranked hits taken from each retriever before fusion
+            rrf_k: Reciprocal-rank fusion constant
+            compaction_threshold: Tombstoned fraction of rows that triggers a
+                background compaction (None disables automatic compaction)
+            compaction_min_rows: Stored rows below which compaction never triggers
+            search_workers: Worker processes for sharded exact scans, each
+                owning a shared-memory shard of the embeddings (0 or 1 scans
+                in-process)
+            result_cache_size: Search result lists cached per query and filter
+                arguments (0 disables the result cache)
+            result_cache_ttl: Seconds cached results of relative time filters
+                ("last month") stay valid
         """
         self.embedding_model = embedding_model
         self.vector_store_path = vector_store_path
         self.llm_provider = llm_provider
-        self.documents = []  # In-memory document store (replace with actual DB)
-        self.embeddings = []  # In-memory embeddings (replace with vector DB)
+        self.store: Optional[EmbeddingStore] = None
+        
+        if index_backend in QUANTIZED_BACKENDS and not vector_store_path:
+            raise ValueError(
+                f"The {index_backend} backend re-ranks from the memory-mapped store "
+                "instead of float rows in memory: vector_store_path is required"
+            )
+        if vector_store_path:
+            # Reopen persisted rows instead of re-embedding the corpus
+            self.store = EmbeddingStore(vector_store_path, embedding_model)
+            self.documents = self.store.documents
+            self.embeddings = self.store.embeddings
+        else:
+            self.documents = []  # In-memory document store
+            self.embeddings = EmbeddingMatrix()  # Pre-normalized float32 rows, one per document
+        self.index_backend = index_backend
+        self.index_params = index_params or {}
+        self.candidate_multiplier = candidate_multiplier
+        self.exact_scan_limit = exact_scan_limit
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.filter_index = FilterIndex()  # Type bitmaps and sorted created_at
+        self.chunk_table = ChunkTable()  # Parent/prev/next pointers per row
+        
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+        self.retrieval_mode = retrieval_mode
+        self.lexical_candidates = lexical_candidates
+        self.rrf_k = rrf_k
+        self.lexical_index: Optional[BM25Index] = BM25Index() if enable_lexical else None
+        
+        # Updates and deletes: id -> rows map with tombstones, compacted in the
+        # background. Writers serialize on the lock; a compaction publishes its
+        # rebuilt state between two bumps of the swap sequence (odd while
+        # swapping) and readers retry if the sequence moved under them.
+        self.row_map = RowMap()
+        self.corpus_stats = CorpusStatistics()  # Per-type counts and date range, kept current
+        self.compaction_threshold = compaction_threshold
+        self.compaction_min_rows = compaction_min_rows
+        self.compactions = 0
+        self._swap_sequence = 0
+        self._write_lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        
+        # Search results cached per (normalized query, filters) and invalidated
+        # by the index generation, bumped on every change to the indexed rows
+        self.index_generation = 0
+        self.result_cache_ttl = result_cache_ttl
+        self.result_cache: Optional[QueryResultCache] = (
+            QueryResultCache(result_cache_size) if result_cache_size > 0 else None
+        )
+        
+        # Query latency counters for get_statistics
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self._latency_lock = threading.Lock()
+        
+        # Sharded exact search, started on first use
+        self.search_workers = search_workers
+        self.shard_pool: Optional[ShardedSearchPool] = None
+        self._shard_lock = threading.Lock()
+        
+        # Async serving: coalesce identical queries, micro-batch embeddings
+        self.query_coalescer = RequestCoalescer()
+        self.query_batcher = EmbeddingMicroBatcher(
+            self._embed_texts,
+            window=async_batch_window,
+            max_batch_size=async_max_batch_size
+        )
+        self.index: Optional[VectorIndex] = None  # Created on first use
+        
+        if embedding_cache_path is None and vector_store_path:
+            embedding_cache_path = os.path.join(vector_store_path, 'embedding_cache.sqlite')
+        self.embedding_cache: Optional[EmbeddingCache] = None
+        if embedding_cache_size > 0:
+            self.embedding_cache = EmbeddingCache(
+                embedding_model,
+                max_entries=embedding_cache_size,
+                disk_path=embedding_cache_path
+            )
+        
+        # Secondary indexes of a reopened store start from its saved snapshot
+        # (if any) and catch up on later rows and tombstones on first use
+        self._snapshot_pending = self.store is not None
+        self._tombstones_pending = self.store is not None
+        self._indexes_dirty = False
         
     def index_document(self, document: Dict[str, Any]) -> None:
         """
         Index a document for semantic search.
         
+        Re-indexing a document id replaces the previous version.
+        
+        Args:
+            document: Dictionary containing document content and metadata
+        """
+        # Split into passages (or keep the whole document as one row)
+        rows = self._prepare_rows(document)
+        
+        # Generate embeddings and store rows with their normalized embeddings
+        embeddings = self._embed_texts([row['content'] for row in rows])
+        self._store_rows(rows, embeddings)
+        
+    def upsert_document(self, document: Dict[str, Any]) -> bool:
+        """
+        Insert a document or replace the indexed version with the same id.
+        
+        The new version is appended and the old rows are tombstoned.
+        
         Args:
             document: Dictionary containing document content and metadata
+            
+        Returns:
+            True if an existing document was replaced
+        """
+        replaced = document.get('id') in self._get_row_map()
+        self.index_document(document)
+        return replaced
+    
+    def delete_document(self, document_id: str) -> bool:
         """
-        # Generate embedding for document
-        embedding = self._generate_embedding(document['content'])
+        Remove a document (all of its passages) from search results.
         
-        # Store document and embedding
-        self.documents.append(document)
-        self.embeddings.append(embedding)
+        Rows are tombstoned; storage is reclaimed by compaction.
         
+        Args:
+            document_id: Id of the document to delete
+            
+        Returns:
+            True if the document was indexed
+        """
+        with self._write_lock:
+            rows = self._get_row_map().remove(document_id)
+            if not rows:
+                return False
+            self.corpus_stats.remove(document_id)
+            if self.store is not None:
+                self.store.mark_deleted(rows)
+            self.index_generation += 1
+            self._indexes_dirty = True
+            
+        self._maybe_compact()
+        return True
+    
+    def compact(self) -> Dict[str, Any]:
+        """
+        Rewrite storage and indexes without tombstoned rows.
+        
+        Runs automatically in the background once the tombstone ratio passes
+        ``compaction_threshold``. Writers wait while it runs; searches keep
+        using the previous rows until the rebuilt state is swapped in.
+        
+        Returns:
+            Dictionary with rows before/after and elapsed seconds
+        """
+        with self._write_lock:
+            return self._compact()
+    
     def search(
         self,
         query: str,
         top_k: int = 10,
         time_filter: Optional[str] = None,
         document_types: Optional[List[str]] = None,
-        min_score: float = 0.0
+        min_score: float = 0.0,
+        retrieval_mode: Optional[str] = None
     ) -> List[SearchResult]:
         """
         Search for documents using natural language query.
@@ -91,10 +332,43 @@ class SemanticSearchAgent:
             top_k: Number of results to return
             time_filter: Time-based filter (e.g., "last quarter", "last 2 months")
             document_types: Filter by document types
-            min_score: Minimum relevance score threshold
+            min_score: Minimum relevance score threshold (vector similarity)
+            retrieval_mode: Override the agent's default retrieval mode
             
         Returns:
-            List of SearchResult objects ranked by relevance
+            List of SearchResult objects ranked by relevance (fused RRF scores
+            in the "hybrid" and "lexical_rerank" modes, BM25 in "lexical")
+        """
+        start_time = time.perf_counter()
+        cache_key = self._result_cache_key(query, top_k, time_filter, document_types, min_score, retrieval_mode)
+        generation = self.index_generation
+        cached = self._cached_results(cache_key, generation)
+        if cached is not None:
+            self._record_query(start_time)
+            return cached
+        
+        def read() -> List[SearchResult]:
+            top_results = self._search_rows(
+                query, top_k, time_filter, document_types, min_score, retrieval_mode
+            )
+            return [self._create_search_result(row, score) for row, score in top_results]
+        
+        results = self._read_consistent(read)
+        self._cache_results(cache_key, generation, results, time_filter)
+        self._record_query(start_time)
+        return results
+    
+    def _search_rows(
+        self,
+        query: str,
+        top_k: int = 10,
+        time_filter: Optional[str] = None,
+        document_types: Optional[List[str]] = None,
+        min_score: float = 0.0,
+        retrieval_mode: Optional[str] = None
+    ) -> List[tuple]:
+        """
+        Run the search pipeline and return ranked (row id, score) pairs.
         """
         # Expand query using LLM for better semantic understanding
         expanded_query = self._expand_query(query)
@@ -102,22 +376,179 @@ class SemanticSearchAgent:
         # Generate query embedding
         query_embedding = self._generate_embedding(expanded_query)
         
-        # Calculate similarity scores
-        scores = self._calculate_similarity(query_embedding, self.embeddings)
+        return self._search_embedding(
+            query_embedding, expanded_query, top_k, time_filter,
+            document_types, min_score, retrieval_mode
+        )
+    
+    def _search_embedding(
+        self,
+        query_embedding: np.ndarray,
+        query_text: str,
+        top_k: int = 10,
+        time_filter: Optional[str] = None,
+        document_types: Optional[List[str]] = None,
+        min_score: float = 0.0,
+        retrieval_mode: Optional[str] = None
+    ) -> List[tuple]:
+        """
+        Filter, score and rank rows for an already embedded query.
+        """
+        mode = retrieval_mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        if mode != "vector" and self.lexical_index is None:
+            raise ValueError(f"Retrieval mode '{mode}' requires enable_lexical=True")
+        
+        # Rows stored after this point are ignored: indexes are fed before
+        # rows are stored, so every row below the bound is in all of them
+        visible_rows = min(len(self.documents), len(self.embeddings))
         
-        # Apply filters
-        filtered_results = self._apply_filters(
-            scores=scores,
-            documents=self.documents,
-            time_filter=time_filter,
+        # Restrict candidates with the type/time indexes before scoring
+        candidates = self._get_filter_index().candidate_rows(
             document_types=document_types,
-            min_score=min_score
+            since=self._time_filter_cutoff(time_filter)
         )
+        row_map = self._get_row_map()
+        if candidates is not None:
+            candidates = candidates[:np.searchsorted(candidates, visible_rows)]
+        if candidates is not None and row_map.deleted_count:
+            candidates = candidates[~row_map.is_deleted(candidates)]
         
-        # Rank and return top results
-        top_results = self._rank_results(filtered_results, top_k)
+        if mode == "vector":
+            # Score candidates: matrix product over the (pre-filtered) rows for the
+            # flat backend, approximate top candidates for ANN backends
+            row_ids, scores = self._score_candidates(query_embedding, top_k, candidates)
+            
+            # Apply score threshold
+            row_ids, row_scores = self._apply_filters(row_ids, scores, min_score, visible_rows)
+            
+            # Rank and return top results
+            return self._rank_results(row_ids, row_scores, top_k)
+        
+        # Lexical stage: BM25 over the inverted index
+        depth = max(top_k, self.lexical_candidates)
+        lexical_rows, lexical_scores = self._get_lexical_index().search(
+            query_text, k=depth, candidates=candidates, row_limit=visible_rows
+        )
+        lexical_rows, lexical_scores = self._apply_filters(lexical_rows, lexical_scores, -np.inf, visible_rows)
+        if mode == "lexical":
+            return self._rank_results(lexical_rows, lexical_scores, top_k)
         
-        return [self._create_search_result(doc, score) for doc, score in top_results]
+        if mode == "lexical_rerank":
+            # Only the lexical candidates are vector-scored
+            vector_rows = lexical_rows
+            vector_scores = self.embeddings.scores(query_embedding, rows=lexical_rows)
+        else:
+            vector_rows, vector_scores = self._score_candidates(query_embedding, depth, candidates)
+        
+        vector_rows, vector_scores = self._apply_filters(vector_rows, vector_scores, min_score, visible_rows)
+        vector_ranking = vector_rows[top_k_indices(vector_scores, depth)]
+        
+        fused_rows, fused_scores = reciprocal_rank_fusion(
+            [vector_ranking, lexical_rows], k=self.rrf_k
+        )
+        return [(int(row), float(score)) for row, score in zip(fused_rows[:top_k], fused_scores[:top_k])]
+    
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = 10,
+        time_filter: Optional[str] = None,
+        document_types: Optional[List[str]] = None,
+        min_score: float = 0.0,
+        retrieval_mode: Optional[str] = None
+    ) -> List[SearchResult]:
+        """
+        Search without blocking the event loop.
+        
+        Identical in-flight queries share one expansion/embedding call, and
+        embeddings of concurrent queries are micro-batched into a single
+        batched embedding call. Blocking work runs on executor threads.
+        
+        Args:
+            query: Natural language search query
+            top_k: Number of results to return
+            time_filter: Time-based filter (e.g., "last quarter", "last 2 months")
+            document_types: Filter by document types
+            min_score: Minimum relevance score threshold (vector similarity)
+            retrieval_mode: Override the agent's default retrieval mode
+            
+        Returns:
+            List of SearchResult objects ranked by relevance
+        """
+        start_time = time.perf_counter()
+        cache_key = self._result_cache_key(query, top_k, time_filter, document_types, min_score, retrieval_mode)
+        generation = self.index_generation
+        cached = self._cached_results(cache_key, generation)
+        if cached is not None:
+            self._record_query(start_time)
+            return cached
+        
+        expanded_query, query_embedding = await self.query_coalescer.run(
+            query, partial(self._aembed_query, query)
+        )
+        
+        def read() -> List[SearchResult]:
+            top_results = self._search_embedding(
+                query_embedding, expanded_query, top_k,
+                time_filter, document_types, min_score, retrieval_mode
+            )
+            return [self._create_search_result(row, score) for row, score in top_results]
+        
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, self._read_consistent, read)
+        self._cache_results(cache_key, generation, results, time_filter)
+        self._record_query(start_time)
+        return results
+    
+    def _record_query(self, start_time: float) -> None:
+        with self._latency_lock:
+            self.query_count += 1
+            self.query_seconds += time.perf_counter() - start_time
+    
+    def _result_cache_key(
+        self,
+        query: str,
+        top_k: int,
+        time_filter: Optional[str],
+        document_types: Optional[List[str]],
+        min_score: float,
+        retrieval_mode: Optional[str]
+    ) -> tuple:
+        """Normalize search arguments into a result cache key."""
+        return (
+            " ".join(query.lower().split()),
+            top_k,
+            " ".join(time_filter.lower().split()) if time_filter else None,
+            tuple(sorted(set(document_types))) if document_types else None,
+            float(min_score),
+            retrieval_mode or self.retrieval_mode
+        )
+    
+    def _cached_results(self, cache_key: tuple, generation: int) -> Optional[List[SearchResult]]:
+        if self.result_cache is None:
+            return None
+        return self.result_cache.get(cache_key, generation)
+    
+    def _cache_results(
+        self,
+        cache_key: tuple,
+        generation: int,
+        results: List[SearchResult],
+        time_filter: Optional[str]
+    ) -> None:
+        if self.result_cache is None:
+            return
+        # Relative time filters move with the clock, so their results expire
+        ttl = self.result_cache_ttl if self._time_filter_cutoff(time_filter) is not None else None
+        self.result_cache.put(cache_key, generation, results, ttl=ttl)
+    
+    async def _aembed_query(self, query: str) -> tuple:
+        """Expand and embed a query off the event loop."""
+        loop = asyncio.get_running_loop()
+        expanded_query = await loop.run_in_executor(None, self._expand_query, query)
+        return expanded_query, await self.query_batcher.embed(expanded_query)
     
     def semantic_search_with_context(
         self,
@@ -128,6 +559,9 @@ class SemanticSearchAgent:
         """
         Search with surrounding context from documents.
         
+        With passage chunking enabled, each hit is a passage and the context
+        holds up to ``context_window`` neighbouring passages on each side.
+        
         Args:
             query: Search query
             context_window: Number of surrounding sections to include
@@ -136,18 +570,139 @@ class SemanticSearchAgent:
         Returns:
             List of results with extended context
         """
-        results = self.search(query, **kwargs)
+        def read() -> List[Dict[str, Any]]:
+            top_results = self._search_rows(query, **kwargs)
+            
+            # Enhance results with context
+            enhanced_results = []
+            for row, score in top_results:
+                enhanced = {
+                    'result': self._create_search_result(row, score),
+                    'context': self._get_document_context(row, context_window)
+                }
+                enhanced_results.append(enhanced)
+            return enhanced_results
         
-        # Enhance results with context
-        enhanced_results = []
-        for result in results:
-            enhanced = {
-                'result': result,
-                'context': self._get_document_context(result.document_id, context_window)
-            }
-            enhanced_results.append(enhanced)
+        return self._read_consistent(read)
+    
+    def refresh(self) -> None:
+        """
+        Pick up documents appended to the persistent store by another process.
+        """
+        if self.store is None:
+            return
+        
+        with self._write_lock:
+            previous = len(self.embeddings)
+            self.index_generation += 1
+            if self.store.refresh():
+                # The writer compacted the store: row ids changed, so rebuild
+                # the row indexes lazily from the new generation
+                self._publish(
+                    self.store.documents, self.store.embeddings, None,
+                    *self._empty_row_indexes()
+                )
+                self._snapshot_pending = True
+                self._tombstones_pending = True
+                return
+                
+            if self.index is not None and len(self.embeddings) > previous:
+                new_rows = np.arange(previous, len(self.embeddings))
+                self.index.add(self.embeddings[new_rows], new_rows)
+            for document_id in self._get_row_map().mark_deleted(self.store.deleted_rows()):
+                self.corpus_stats.remove(document_id)
+    
+    def save_indexes(self) -> None:
+        """
+        Snapshot the secondary indexes into the persistent store.
+        
+        A reopened store loads the snapshot instead of re-reading every
+        document; rows and deletes after the snapshot are caught up.
+        Called by ``close()`` and after compaction when rows changed.
+        """
+        if self.store is None:
+            return
+        with self._write_lock:
+            self._get_row_map()
+            self._get_filter_index()
+            self._get_chunk_table()
+            lexical_index = self._get_lexical_index() if self.lexical_index is not None else None
+            self.store.save_indexes({
+                'filter_index': self.filter_index,
+                'chunk_table': self.chunk_table,
+                'row_map': self.row_map,
+                'corpus_stats': self.corpus_stats,
+                'lexical_index': lexical_index
+            })
+            self._indexes_dirty = False
+    
+    def close(self) -> None:
+        """Save index snapshots, stop search worker processes and close the embedding cache."""
+        if self._indexes_dirty:
+            self.save_indexes()
+        with self._shard_lock:
+            if self.shard_pool is not None:
+                self.shard_pool.close()
+                self.shard_pool = None
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
+    
+    def set_index_params(self, **params) -> None:
+        """
+        Tune the recall/latency trade-off of the vector index.
+        
+        Args:
+            **params: Backend knobs, e.g. nprobe=32 (IVF) or ef_search=128 (HNSW)
+        """
+        self.index_params.update(params)
+        if self.index is not None:
+            self.index.set_params(**params)
+        self.index_generation += 1
+    
+    def evaluate_index(
+        self,
+        queries: Optional[np.ndarray] = None,
+        k: int = 10,
+        sample_size: int = 100
+    ) -> Dict[str, float]:
+        """
+        Measure recall@k, latency and memory of the index against brute force.
+        
+        The float32 scan is the baseline: ``recall_loss`` is the fraction of
+        its top-k the index misses, and ``compression_ratio`` compares the
+        float rows with the total memory resident for vector search: the
+        index plus the float rows held in memory, and memory-mapped rows too
+        when the index scans them exactly (flat or not yet trained).
+        
+        Args:
+            queries: Query vectors (defaults to a sample of indexed embeddings)
+            k: Number of neighbours compared
+            sample_size: Number of indexed embeddings sampled when queries is None
             
-        return enhanced_results
+        Returns:
+            Dictionary with recall_at_k, recall_loss, latency percentiles in
+            milliseconds, and index, float and resident memory in bytes
+        """
+        vectors = self.embeddings.vectors
+        if queries is None:
+            rng = np.random.default_rng(0)
+            sample = rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)
+            queries = vectors[sample]
+        
+        index = self._get_index()
+        report = measure_recall(index, vectors, queries, k=k)
+        report['recall_loss'] = 1.0 - report['recall_at_k']
+        usage = self._memory_usage()
+        report['index_bytes'] = index.nbytes
+        report['float_bytes'] = self.embeddings.nbytes
+        report['resident_bytes'] = usage['embeddings'] + usage['vector_index']
+        if index.backend == "flat" or not getattr(index, 'is_trained', True):
+            # Exact scans page every float row in, memory-mapped or not
+            report['resident_bytes'] += usage['mapped_embeddings']
+        report['compression_ratio'] = (
+            report['float_bytes'] / report['resident_bytes'] if report['resident_bytes'] else 0.0
+        )
+        return report
     
     def _generate_embedding(self, text: str) -> np.ndarray:
         """
@@ -159,11 +714,48 @@ class SemanticSearchAgent:
         Returns:
             Embedding vector as numpy array
         """
-        # Placeholder: Replace with actual embedding generation
-        # Using OpenAI, Sentence-Transformers, or similar
+        return self._embed_texts([text])[0]
+    
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, serving repeated text from the embedding cache.
+        
+        Only cache misses (deduplicated) reach the embedding provider.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding matrix of shape (len(texts), dimension)
+        """
+        if self.embedding_cache is None:
+            return self._generate_embeddings(texts)
+        
+        cached = self.embedding_cache.get_many(texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        if missing:
+            generated = self._generate_embeddings(missing)
+            self.embedding_cache.put_many(missing, generated)
+            lookup = dict(zip(missing, generated))
+            cached = [v if v is not None else lookup[t] for t, v in zip(texts, cached)]
         
-        # Simulated embedding (random vector for demonstration)
-        return np.random.rand(1536)  # OpenAI ada-002 dimension
+        return np.vstack(cached)
+    
+    def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embedding vectors for a batch of texts in one call.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding matrix of shape (len(texts), dimension)
+        """
+        # Placeholder: Replace with actual batched embedding generation
+        # (OpenAI embeddings accept a list input; Sentence-Transformers encode())
+        
+        # Simulated embeddings (random vectors for demonstration)
+        return np.random.rand(len(texts), 1536)  # OpenAI ada-002 dimension
     
     def _expand_query(self, query: str) -> str:
         """
@@ -184,185 +776,699 @@ class SemanticSearchAgent:
     def _calculate_similarity(
         self,
         query_embedding: np.ndarray,
-        document_embeddings: List[np.ndarray]
-    ) -> List[float]:
+        document_embeddings: EmbeddingMatrix
+    ) -> np.ndarray:
         """
         Calculate cosine similarity between query and documents.
         
+        Document rows are normalized at index time, so this is a single
+        matrix-vector product against the normalized query.
+        
         Args:
             query_embedding: Query vector
-            document_embeddings: List of document vectors
+            document_embeddings: Matrix of normalized document vectors
             
         Returns:
-            List of similarity scores
+            Array of similarity scores, one per document row
         """
-        scores = []
-        for doc_embedding in document_embeddings:
-            # Cosine similarity
-            similarity = np.dot(query_embedding, doc_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding)
-            )
-            scores.append(similarity)
-        return scores
+        return document_embeddings.scores(query_embedding)
     
-    def _apply_filters(
+    def _score_candidates(
         self,
-        scores: List[float],
-        documents: List[Dict[str, Any]],
-        time_filter: Optional[str],
-        document_types: Optional[List[str]],
-        min_score: float
-    ) -> List[tuple]:
+        query_embedding: np.ndarray,
+        top_k: int,
+        candidates: Optional[np.ndarray] = None
+    ) -> tuple:
         """
-        Apply filters to search results.
+        Retrieve scored candidate rows for a query.
         
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results requested
+            candidates: Sorted row ids allowed by filters (all rows if None)
+            
         Returns:
-            List of (document, score) tuples that pass filters
+            Tuple of (row ids, scores) arrays
         """
-        filtered = []
+        index = self._get_index()
+        exact = index.backend == "flat" or (candidates is not None and len(candidates) <= self.exact_scan_limit)
+        if exact and self.search_workers > 1 and (candidates is None or len(candidates) >= SHARDED_MIN_CANDIDATES):
+            return self._sharded_scores(query_embedding, top_k, candidates)
         
-        for doc, score in zip(documents, scores):
-            # Score filter
-            if score < min_score:
-                continue
+        if candidates is None:
+            if index.backend == "flat":
+                scores = self._calculate_similarity(query_embedding, self.embeddings)
+                return np.arange(len(scores)), scores
+            if self.row_map.deleted_count:
+                # Tombstoned rows are dropped after the index search
+                top_k *= self.candidate_multiplier
+            return index.search(query_embedding, top_k)
+        
+        # Selective filters: exact scoring of the qualifying rows only
+        if exact:
+            return candidates, self.embeddings.scores(query_embedding, rows=candidates)
+        
+        # Broad filters: over-fetch from the ANN index and keep qualifying rows
+        row_ids, scores = index.search(query_embedding, top_k * self.candidate_multiplier)
+        position = np.minimum(np.searchsorted(candidates, row_ids), len(candidates) - 1)
+        keep = candidates[position] == row_ids
+        return row_ids[keep], scores[keep]
+    
+    def _sharded_scores(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        candidates: Optional[np.ndarray] = None
+    ) -> tuple:
+        """
+        Exact top candidates from the worker shards plus rows appended since.
+        
+        Args:
+            query_embedding: Query vector
+            top_k: Number of results requested
+            candidates: Sorted row ids allowed by filters (all rows if None)
             
-            # Document type filter
-            if document_types and doc.get('type') not in document_types:
-                continue
+        Returns:
+            Tuple of (row ids, scores) arrays
+        """
+        pool = self._get_shard_pool()
+        if self.row_map.deleted_count:
+            # Tombstoned rows are dropped after the merge
+            top_k *= self.candidate_multiplier
             
-            # Time filter
-            if time_filter and not self._passes_time_filter(doc, time_filter):
-                continue
+        if candidates is None:
+            row_ids, scores = pool.search(query_embedding, top_k)
+            tail = np.arange(len(pool), len(self.embeddings))
+        else:
+            split = np.searchsorted(candidates, len(pool))
+            row_ids, scores = pool.search(query_embedding, top_k, candidates[:split])
+            tail = candidates[split:]
             
-            filtered.append((doc, score))
+        # Rows appended after the pool was built are scored in-process
+        if len(tail):
+            row_ids = np.concatenate([row_ids, tail])
+            scores = np.concatenate([scores, self.embeddings.scores(query_embedding, rows=tail)])
+        return row_ids, scores
+    
+    def _get_shard_pool(self) -> ShardedSearchPool:
+        """Get the worker pool, rebuilding it after compaction or heavy growth."""
+        with self._shard_lock:
+            pool = self.shard_pool
+            stale = (
+                pool is None
+                or pool.matrix is not self.embeddings
+                or len(self.embeddings) - len(pool) > SHARD_REBUILD_FRACTION * max(len(pool), 1)
+            )
+            if stale:
+                self.shard_pool = ShardedSearchPool(self.embeddings, self.search_workers)
+                if pool is not None:
+                    pool.close()
+            return self.shard_pool
+    
+    def _apply_filters(
+        self,
+        row_ids: np.ndarray,
+        scores: np.ndarray,
+        min_score: float,
+        visible_rows: int
+    ) -> tuple:
+        """
+        Apply the score threshold to scored candidates and drop tombstoned rows.
+        
+        Type and time filters are applied before scoring by the filter index.
+        Rows at or past visible_rows were stored after the read started and
+        are dropped as well.
         
-        return filtered
+        Returns:
+            Tuple of (row ids, scores) arrays for rows that pass filters
+        """
+        keep = (scores >= min_score) & (row_ids < visible_rows)
+        if self.row_map.deleted_count:
+            keep &= ~self.row_map.is_deleted(row_ids)
+        return row_ids[keep], scores[keep]
     
-    def _passes_time_filter(self, document: Dict[str, Any], time_filter: str) -> bool:
+    def _time_filter_cutoff(self, time_filter: Optional[str]) -> Optional[datetime]:
         """
-        Check if document passes time filter.
+        Parse a time filter once per query.
         
         Args:
-            document: Document to check
             time_filter: Time filter string (e.g., "last quarter", "last 2 months")
             
         Returns:
-            True if document is within time range
+            Earliest allowed creation time, or None if the filter is not recognized
         """
-        # Parse time filter and check document date
-        # Placeholder implementation
-        doc_date = document.get('created_at', datetime.now())
+        if not time_filter:
+            return None
         
         # Simple parsing for common filters
-        if "last quarter" in time_filter.lower():
-            cutoff = datetime.now() - timedelta(days=90)
-        elif "last 2 months" in time_filter.lower():
-            cutoff = datetime.now() - timedelta(days=60)
-        elif "last month" in time_filter.lower():
-            cutoff = datetime.now() - timedelta(days=30)
-        else:
-            return True
-        
-        return doc_date >= cutoff
+        time_filter = time_filter.lower()
+        if "last quarter" in time_filter:
+            return datetime.now() - timedelta(days=90)
+        elif "last 2 months" in time_filter:
+            return datetime.now() - timedelta(days=60)
+        elif "last month" in time_filter:
+            return datetime.now() - timedelta(days=30)
+        return None
     
-    def _rank_results(self, results: List[tuple], top_k: int) -> List[tuple]:
+    def _rank_results(
+        self,
+        row_ids: np.ndarray,
+        scores: np.ndarray,
+        top_k: int
+    ) -> List[tuple]:
         """
         Rank results by score and return top K.
         
+        Uses argpartition to select the K best rows in linear time and only
+        sorts those K.
+        
         Args:
-            results: List of (document, score) tuples
+            row_ids: Row ids of candidate documents
+            scores: Scores aligned with row_ids
             top_k: Number of results to return
             
         Returns:
-            Top K results sorted by score
+            Top K (row id, score) tuples sorted by score
         """
-        sorted_results = sorted(results, key=lambda x: x[1], reverse=True)
-        return sorted_results[:top_k]
+        top = top_k_indices(scores, top_k)
+        return [(int(row_ids[i]), float(scores[i])) for i in top]
     
-    def _create_search_result(self, document: Dict[str, Any], score: float) -> SearchResult:
+    def _create_search_result(self, row: int, score: float) -> SearchResult:
         """
-        Create SearchResult object from document and score.
+        Create SearchResult object from a stored row and score.
         
         Args:
-            document: Document dictionary
+            row: Row id of the document or passage
             score: Relevance score
             
         Returns:
             SearchResult object
         """
+        document = self.documents[row]
+        metadata = document.get('metadata', {})
+        if 'parent_id' in document:
+            metadata = {
+                **metadata,
+                'chunk_id': document.get('id'),
+                'chunk_index': document.get('chunk_index'),
+                'chunk_count': document.get('chunk_count')
+            }
+        
         return SearchResult(
-            document_id=document.get('id', ''),
+            document_id=document.get('parent_id', document.get('id', '')),
             title=document.get('title', ''),
             content=document.get('content', ''),
             score=score,
-            metadata=document.get('metadata', {}),
+            metadata=metadata,
             created_at=document.get('created_at', datetime.now()),
             document_type=document.get('type', 'unknown')
         )
     
-    def _get_document_context(self, document_id: str, window: int) -> Dict[str, Any]:
+    def _prepare_rows(self, document: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Turn a document into the rows that get embedded.
+        
+        Args:
+            document: Document dictionary
+            
+        Returns:
+            Passage rows when chunking is enabled, else the document itself
+        """
+        if not self.chunk_size:
+            return [document]
+        return chunk_document(document, self.chunk_size, self.chunk_overlap)
+    
+    def _store_rows(self, documents: List[Dict[str, Any]], embeddings: np.ndarray) -> np.ndarray:
         """
-        Get surrounding context for a document.
+        Append documents and embeddings to storage and the vector index.
         
         Args:
-            document_id: ID of the document
-            window: Number of surrounding sections/documents
+            documents: Documents to store
+            embeddings: Embedding matrix aligned with documents
+            
+        Returns:
+            Row ids assigned to the documents
+        """
+        # Reject a malformed batch before any index sees it: a failure part-way
+        # through would leave the indexes ahead of the stored rows
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if len(embeddings) != len(documents):
+            raise ValueError(
+                f"Got {len(embeddings)} embeddings for {len(documents)} documents"
+            )
+        lines = self.store.encode_documents(documents) if self.store is not None else None
+        
+        with self._write_lock:
+            dimension = self.embeddings.dimension
+            if dimension is not None and embeddings.shape[1] != dimension:
+                raise ValueError(
+                    f"Embedding dimension mismatch: expected {dimension}, got {embeddings.shape[1]}"
+                )
+                
+            # Secondary indexes must have seen every earlier row before appending
+            secondary = [self._get_filter_index(), self._get_chunk_table(), self._get_row_map(), self.corpus_stats]
+            if self.lexical_index is not None:
+                secondary.append(self._get_lexical_index())
+            
+            # Index the rows before storing them: readers only look at stored
+            # rows, so they never meet a row an index has not seen yet
+            start = min(len(self.documents), len(self.embeddings))
+            row_ids = np.arange(start, start + len(documents))
+            for row_index in secondary:
+                # The row map tombstones rows of replaced document versions
+                row_index.add(row_ids, documents)
+            
+            if self.store is not None:
+                self.store.append_batch(documents, embeddings, lines)
+            else:
+                self.documents.extend(documents)
+                self.embeddings.append(embeddings)
+            
+            self._get_index().add(self.embeddings[row_ids], row_ids)
+            self.index_generation += 1
+            self._indexes_dirty = True
+            
+        self._maybe_compact()
+        return row_ids
+    
+    def _create_index(self, embeddings: Optional[EmbeddingMatrix] = None) -> VectorIndex:
+        """Create the configured vector index backend over existing rows."""
+        embeddings = self.embeddings if embeddings is None else embeddings
+        index = create_index(
+            self.index_backend,
+            dimension=embeddings.dimension,
+            matrix=embeddings,
+            **self.index_params
+        )
+        if index.backend != "flat":
+            for start in range(0, len(embeddings), INDEX_BUILD_BATCH_ROWS):
+                stop = min(start + INDEX_BUILD_BATCH_ROWS, len(embeddings))
+                index.add(embeddings.vectors[start:stop], np.arange(start, stop))
+        return index
+    
+    def _get_index(self) -> VectorIndex:
+        """Get the vector index, creating dimension-dependent backends lazily."""
+        if self.index is None:
+            self.index = self._create_index()
+        return self.index
+    
+    def _get_filter_index(self) -> FilterIndex:
+        """Get the filter index, catching up on rows loaded from the store."""
+        return self._synced_indexes('filter_index')[0]
+    
+    def _get_chunk_table(self) -> ChunkTable:
+        """Get the chunk table, catching up on rows loaded from the store."""
+        return self._synced_indexes('chunk_table')[0]
+    
+    def _get_lexical_index(self) -> BM25Index:
+        """Get the BM25 index, catching up on rows loaded from the store."""
+        return self._synced_indexes('lexical_index')[0]
+    
+    def _get_row_map(self) -> RowMap:
+        """
+        Get the id -> row map, catching up on rows and tombstones from the store.
+        
+        Corpus statistics are caught up alongside, since persisted tombstones
+        remove documents from both.
+        """
+        row_map, _ = self._synced_indexes('row_map', 'corpus_stats')
+        if self._tombstones_pending:
+            with self._write_lock:
+                if self._tombstones_pending:
+                    # Re-applying tombstones already in a loaded snapshot is a no-op
+                    for document_id in self.row_map.mark_deleted(self.store.deleted_rows()):
+                        self.corpus_stats.remove(document_id)
+                    self._tombstones_pending = False
+                row_map = self.row_map
+        return row_map
+    
+    def _synced_indexes(self, *names) -> list:
+        """
+        Secondary indexes (by attribute name) that have seen every stored row.
+        
+        Only writers feed the indexes: loading the store snapshot and catching
+        up on rows run under the write lock. Indexes that are current (the
+        common case) are returned without locking.
+        """
+        row_indexes = [getattr(self, name) for name in names]
+        if self._snapshot_pending or any(len(row_index) < len(self.documents) for row_index in row_indexes):
+            with self._write_lock:
+                self._load_indexes()
+                row_indexes = [getattr(self, name) for name in names]
+                self._catch_up(*row_indexes)
+        return row_indexes
+    
+    def _catch_up(self, *row_indexes) -> None:
+        """Feed rows that secondary indexes have not seen yet (caller holds the write lock)."""
+        start = min(len(row_index) for row_index in row_indexes)
+        for batch_start in range(start, len(self.documents), CATCH_UP_BATCH_ROWS):
+            rows = np.arange(batch_start, min(batch_start + CATCH_UP_BATCH_ROWS, len(self.documents)))
+            documents = self._document_rows(rows)
+            for row_index in row_indexes:
+                skip = max(0, len(row_index) - int(rows[0]))
+                if skip < len(rows):
+                    row_index.add(rows[skip:], documents[skip:])
+    
+    def _document_rows(self, rows: np.ndarray, documents=None) -> List[Dict[str, Any]]:
+        """Documents of contiguous rows, read sequentially from a store sidecar."""
+        documents = self.documents if documents is None else documents
+        if not len(rows):
+            return []
+        if isinstance(documents, list):
+            return documents[int(rows[0]):int(rows[-1]) + 1]
+        return documents.read_range(int(rows[0]), int(rows[-1]) + 1)
+    
+    def _load_indexes(self) -> None:
+        """Start the secondary indexes from the snapshot saved in the store, once, if usable (under the write lock)."""
+        if not self._snapshot_pending:
+            return
+        self._snapshot_pending = False
+        snapshot = self.store.load_indexes()
+        if not snapshot:
+            return
+        rows = len(self.documents)
+        names = ('filter_index', 'chunk_table', 'row_map', 'corpus_stats')
+        # A snapshot covering rows beyond a truncated (torn) tail is unusable
+        if any(len(snapshot[name]) > rows for name in names):
+            return
+        self.filter_index = snapshot['filter_index']
+        self.chunk_table = snapshot['chunk_table']
+        self.row_map = snapshot['row_map']
+        self.corpus_stats = snapshot['corpus_stats']
+        
+        lexical_index = snapshot.get('lexical_index')
+        if (
+            self.lexical_index is not None and lexical_index is not None
+            and len(lexical_index) <= rows
+            and (lexical_index.k1, lexical_index.b, lexical_index.fields)
+            == (self.lexical_index.k1, self.lexical_index.b, self.lexical_index.fields)
+        ):
+            self.lexical_index = lexical_index
+    
+    def _get_document_context(self, row: int, window: int) -> Dict[str, Any]:
+        """
+        Get surrounding context for a search hit.
+        
+        Args:
+            row: Row id of the hit
+            window: Number of surrounding passages on each side
             
         Returns:
             Context information
         """
-        # Placeholder: Implement context retrieval
+        chunk_table = self._get_chunk_table()
+        previous_rows, next_rows = chunk_table.neighbours(row, window)
+        
+        def passage(neighbour: int) -> Dict[str, Any]:
+            document = self.documents[neighbour]
+            return {
+                'chunk_id': document.get('id'),
+                'chunk_index': document.get('chunk_index', 0),
+                'content': document.get('content', '')
+            }
+        
         return {
-            'previous': [],
-            'next': [],
+            'parent_id': chunk_table.parent_id(row),
+            'previous': [passage(r) for r in previous_rows],
+            'next': [passage(r) for r in next_rows],
             'related': []
         }
     
-    def batch_index(self, documents: List[Dict[str, Any]], batch_size: int = 100) -> None:
+    def _maybe_compact(self) -> None:
+        """Start a background compaction once the tombstone ratio passes the threshold."""
+        if self.compaction_threshold is None:
+            return
+        row_map = self.row_map
+        if len(row_map) < self.compaction_min_rows or row_map.tombstone_ratio < self.compaction_threshold:
+            return
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+            
+        self._compaction = threading.Thread(target=self.compact, name="semantic-search-compaction", daemon=True)
+        self._compaction.start()
+    
+    def _compact(self) -> Dict[str, Any]:
+        """Rebuild storage and indexes from live rows (caller holds the write lock)."""
+        start_time = time.perf_counter()
+        row_map = self._get_row_map()
+        rows_before = len(row_map)
+        if not row_map.deleted_count:
+            return {'compacted': False, 'rows_before': rows_before, 'rows_after': rows_before, 'elapsed_seconds': 0.0}
+            
+        live_rows = row_map.live_rows()
+        if self.store is not None:
+            documents, embeddings = self.store.prepare_compaction(live_rows)
+        else:
+            documents = [self.documents[row] for row in live_rows]
+            embeddings = EmbeddingMatrix(self.embeddings.dimension)
+            if len(live_rows):
+                embeddings.append(self.embeddings.vectors[live_rows])
+                
+        # Build the new row indexes while searches still use the old ones
+        row_indexes = self._empty_row_indexes()
+        for start in range(0, len(documents), CATCH_UP_BATCH_ROWS):
+            row_ids = np.arange(start, min(start + CATCH_UP_BATCH_ROWS, len(documents)))
+            batch = self._document_rows(row_ids, documents)
+            for row_index in row_indexes:
+                if row_index is not None:
+                    row_index.add(row_ids, batch)
+        index = self._create_index(embeddings) if self.index is not None else None
+        
+        if self.store is not None:
+            self._publish(documents, embeddings, index, *row_indexes, commit=self.store.commit_compaction)
+            self._snapshot_pending = self._tombstones_pending = False  # Indexes match the new generation
+            self.save_indexes()
+        else:
+            self._publish(documents, embeddings, index, *row_indexes)
+        self.compactions += 1
+        
+        return {
+            'compacted': True,
+            'rows_before': rows_before,
+            'rows_after': len(live_rows),
+            'elapsed_seconds': time.perf_counter() - start_time
+        }
+    
+    def _empty_row_indexes(self) -> tuple:
+        """Fresh (filter index, chunk table, row map, corpus stats, lexical index) for rebuilt rows."""
+        lexical_index = None
+        if self.lexical_index is not None:
+            lexical_index = BM25Index(self.lexical_index.k1, self.lexical_index.b, self.lexical_index.fields)
+        return FilterIndex(), ChunkTable(), RowMap(), CorpusStatistics(), lexical_index
+    
+    def _publish(
+        self,
+        documents,
+        embeddings: EmbeddingMatrix,
+        index: Optional[VectorIndex],
+        filter_index: FilterIndex,
+        chunk_table: ChunkTable,
+        row_map: RowMap,
+        corpus_stats: CorpusStatistics,
+        lexical_index: Optional[BM25Index],
+        commit: Optional[Callable] = None
+    ) -> None:
+        """Swap in rebuilt rows and indexes; readers retry across the swap."""
+        self._swap_sequence += 1
+        try:
+            if commit is not None:
+                commit(documents, embeddings)
+            self.documents = documents
+            self.embeddings = embeddings
+            self.index = index
+            self.filter_index = filter_index
+            self.chunk_table = chunk_table
+            self.row_map = row_map
+            self.corpus_stats = corpus_stats
+            self.lexical_index = lexical_index
+            # Scores depend on corpus statistics: cached results are stale
+            self.index_generation += 1
+        finally:
+            self._swap_sequence += 1
+    
+    def _read_consistent(self, read: Callable[[], Any]) -> Any:
+        """
+        Run a read against a single version of the rows.
+        
+        Args:
+            read: Function reading rows and indexes
+            
+        Returns:
+            Result of the read, retried if a compaction swapped rows under it
+        """
+        while True:
+            sequence = self._swap_sequence
+            if sequence % 2:
+                time.sleep(0)  # Swap in progress
+                continue
+            try:
+                result = read()
+            except (IndexError, KeyError, ValueError, OSError):
+                if sequence == self._swap_sequence:
+                    raise
+                continue
+            if sequence == self._swap_sequence:
+                return result
+    
+    def batch_index(
+        self,
+        documents: List[Dict[str, Any]],
+        batch_size: int = 100,
+        max_workers: int = 4,
+        max_pending: Optional[int] = None,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5
+    ) -> Dict[str, Any]:
         """
         Index multiple documents in batches.
         
+        Each batch is embedded with a single batched embedding call. Batches
+        are fanned out over a bounded thread pool; at most ``max_pending``
+        batches are in flight at once, so a slow embedding provider applies
+        backpressure instead of queueing the whole corpus. A failing batch is
+        retried with exponential backoff and then split in halves to isolate
+        the documents that cannot be embedded.
+        
         Args:
             documents: List of documents to index
             batch_size: Number of documents per batch
+            max_workers: Concurrent embedding calls
+            max_pending: Maximum batches in flight (default 2 * max_workers)
+            max_retries: Retries per batch before splitting it
+            retry_backoff: Initial retry delay in seconds (doubles per retry)
+            
+        Returns:
+            Dictionary with indexed/failed counts and docs/sec throughput
+        """
+        start_time = time.perf_counter()
+        max_pending = max_pending or 2 * max_workers
+        batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
+        indexed, failed_ids = 0, []
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            next_batch = 0
+            
+            while next_batch < len(batches) or pending:
+                # Keep the pipeline full up to the backpressure limit
+                while next_batch < len(batches) and len(pending) < max_pending:
+                    batch = batches[next_batch]
+                    future = executor.submit(self._embed_batch, batch, max_retries, retry_backoff)
+                    pending[future] = next_batch
+                    next_batch += 1
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.pop(future)
+                    embedded, failed = future.result()
+                    
+                    # Storage is single-writer: rows are appended on this thread
+                    for docs, embeddings in embedded:
+                        self._store_rows(docs, embeddings)
+                        indexed += len(docs)
+                    failed_ids.extend(doc.get('id', '') for doc in failed)
+        
+        elapsed = time.perf_counter() - start_time
+        return {
+            'indexed': indexed,
+            'failed': len(failed_ids),
+            'failed_ids': failed_ids,
+            'batches': len(batches),
+            'elapsed_seconds': elapsed,
+            'docs_per_second': indexed / elapsed if elapsed > 0 else 0.0
+        }
+    
+    def _embed_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        max_retries: int,
+        retry_backoff: float
+    ) -> tuple:
+        """
+        Embed a batch, retrying and bisecting on failure.
+        
+        Args:
+            batch: Documents to embed
+            max_retries: Retries before the batch is split
+            retry_backoff: Initial retry delay in seconds
+            
+        Returns:
+            Tuple of ([(documents, embeddings), ...], failed documents)
         """
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            for doc in batch:
-                self.index_document(doc)
+        rows = [row for document in batch for row in self._prepare_rows(document)]
+        
+        delay = retry_backoff
+        for attempt in range(max_retries + 1):
+            try:
+                embeddings = self._embed_texts([row['content'] for row in rows])
+                return [(rows, embeddings)], []
+            except Exception:
+                if attempt < max_retries:
+                    time.sleep(delay)
+                    delay *= 2
+        
+        if len(batch) == 1:
+            return [], batch
+        
+        # Split to isolate the documents that keep failing
+        middle = len(batch) // 2
+        left_ok, left_failed = self._embed_batch(batch[:middle], 0, retry_backoff)
+        right_ok, right_failed = self._embed_batch(batch[middle:], 0, retry_backoff)
+        return left_ok + right_ok, left_failed + right_failed
     
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get statistics about indexed documents.
         
+        Counters are maintained as documents are indexed, replaced and
+        deleted, so this does not scan the corpus. Replaced and deleted
+        documents are not counted; documents without created_at are left
+        out of the date range.
+        
         Returns:
             Dictionary with statistics
         """
+        with self._write_lock:
+            # The date range prunes its heaps, so corpus statistics are read like a write
+            row_map = self._get_row_map()
+            document_types = dict(self.corpus_stats.type_counts)
+            date_range = self.corpus_stats.date_range()
         return {
-            'total_documents': len(self.documents),
-            'document_types': self._count_document_types(),
-            'date_range': self._get_date_range(),
-            'embedding_dimension': len(self.embeddings[0]) if self.embeddings else 0
+            'total_documents': row_map.document_count,
+            'document_types': document_types,
+            'date_range': date_range,
+            'embedding_dimension': self.embeddings.dimension or 0,
+            'embedding_cache': self.embedding_cache.get_stats() if self.embedding_cache else None,
+            'result_cache': self.result_cache.get_stats() if self.result_cache else None,
+            'index_generation': self.index_generation,
+            'stored_rows': len(row_map),
+            'deleted_rows': row_map.deleted_count,
+            'tombstone_ratio': row_map.tombstone_ratio,
+            'compactions': self.compactions,
+            'memory_bytes': self._memory_usage(),
+            'queries': self.query_count,
+            'avg_query_latency_ms': (
+                1000 * self.query_seconds / self.query_count if self.query_count else 0.0
+            )
         }
     
-    def _count_document_types(self) -> Dict[str, int]:
-        """Count documents by type."""
-        counts = {}
-        for doc in self.documents:
-            doc_type = doc.get('type', 'unknown')
-            counts[doc_type] = counts.get(doc_type, 0) + 1
-        return counts
-    
-    def _get_date_range(self) -> Dict[str, datetime]:
-        """Get earliest and latest document dates."""
-        if not self.documents:
-            return {'earliest': None, 'latest': None}
+    def _memory_usage(self) -> Dict[str, int]:
+        """
+        Bytes resident in process memory for the embeddings and indexes.
         
-        dates = [doc.get('created_at', datetime.now()) for doc in self.documents]
-        return {
-            'earliest': min(dates),
-            'latest': max(dates)
+        Memory-mapped embedding rows live in the page cache and are reported
+        separately as ``mapped_embeddings``, outside the total.
+        """
+        index = self.index
+        usage = {
+            'embeddings': self.embeddings.resident_nbytes,
+            # The flat backend scans the embedding rows themselves
+            'vector_index': index.nbytes if index is not None and index.backend != "flat" else 0,
+            'lexical_index': self.lexical_index.nbytes if self.lexical_index is not None else 0
         }
+        usage['total'] = sum(usage.values())
+        usage['mapped_embeddings'] = self.embeddings.nbytes - self.embeddings.resident_nbytes
+        return usage
 
 
 # Example usage
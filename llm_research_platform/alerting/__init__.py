@@ -0,0 +1,19 @@
+"""
+Alerting infrastructure for the LLM Research Platform.
+"""
+
+from .detection import StreamingAnomalyDetector, Anomaly
+from .store import AlertStore
+from .grouping import AlertGrouper, EnrichmentCache, alert_fingerprint, alert_region
+from .enrichment import EnrichmentPool
+
+__all__ = [
+    "StreamingAnomalyDetector",
+    "Anomaly",
+    "AlertStore",
+    "AlertGrouper",
+    "EnrichmentCache",
+    "alert_fingerprint",
+    "alert_region",
+    "EnrichmentPool",
+]
@@ -0,0 +1,316 @@
+"""
+Streaming anomaly detection over metric streams.
+
+Each (entity, metric) series keeps O(1)-update rolling statistics:
+
+- sliding-window Welford mean/variance over the last ``window`` points
+- exponentially weighted mean/variance (EWMA)
+- a ring buffer of the window for a robust median/MAD check
+
+A point is flagged when its Welford or EWMA z-score crosses the threshold;
+the (O(window)) robust score is only computed for flagged points and must
+confirm them. One alert is raised per anomalous run, and a series stays
+quiet for ``cooldown`` seconds after alerting.
+"""
+
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+import math
+import time
+import numpy as np
+
+from ..models import Metric, TimeSeriesData
+
+# Scales the MAD to a standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+
+
+def _to_seconds(timestamp: Any) -> float:
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return time.time()
+
+
+@dataclass
+class Anomaly:
+    """A detected anomaly in one series."""
+    entity: str
+    metric: str
+    value: float
+    expected_value: float
+    timestamp: float
+    z_score: float
+    ewma_score: float
+    robust_score: float
+    direction: str  # "up" or "down"
+    source: str = ""
+    
+    @property
+    def change(self) -> float:
+        """Percent change against the expected (median) value."""
+        if self.expected_value == 0:
+            return 0.0
+        return round(100.0 * (self.value - self.expected_value) / abs(self.expected_value), 2)
+    
+    def to_alert_input(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(anomaly_data, context) arguments for AlertAgent.create_alert."""
+        anomaly_data = {
+            'metric': self.metric,
+            'change': self.change,
+            'current_value': self.value,
+            'expected_value': self.expected_value,
+            'z_score': round(self.z_score, 2),
+            'ewma_score': round(self.ewma_score, 2),
+            'robust_score': round(self.robust_score, 2),
+            'direction': self.direction
+        }
+        context = {
+            'entity': self.entity,
+            'source': self.source,
+            'detected_at': datetime.fromtimestamp(self.timestamp),
+            'detector': 'streaming'
+        }
+        return anomaly_data, context
+
+
+class _SeriesState:
+    """Rolling statistics of one series."""
+    
+    __slots__ = (
+        'window', 'count', 'mean', 'm2', 'ewma', 'ewm_var',
+        'anomalous', 'last_alert_at'
+    )
+    
+    def __init__(self, size: int):
+        self.window = np.zeros(size, dtype=np.float64)  # Ring buffer of the last `size` values
+        self.count = 0  # Points seen
+        self.mean = 0.0  # Welford mean over the window
+        self.m2 = 0.0  # Welford sum of squared deviations over the window
+        self.ewma = 0.0
+        self.ewm_var = 0.0
+        self.anomalous = None  # Direction of the current anomalous run
+        self.last_alert_at = float('-inf')
+
+
+class StreamingAnomalyDetector:
+    """
+    Per-series rolling anomaly detector that raises alerts on threshold crossings.
+    
+    Example:
+        >>> detector = StreamingAnomalyDetector(alert_agent=AlertAgent())
+        >>> for metric in metric_stream:
+        ...     detector.observe_metric(metric)
+        >>> detector.get_stats()
+    """
+    
+    def __init__(
+        self,
+        alert_agent=None,
+        window: int = 64,
+        min_samples: int = 30,
+        z_threshold: float = 4.0,
+        ewma_alpha: float = 0.1,
+        ewma_threshold: float = 4.0,
+        robust_threshold: float = 5.0,
+        cooldown: float = 900.0
+    ):
+        """
+        Initialize the detector.
+        
+        Args:
+            alert_agent: AlertAgent whose create_alert receives anomalies (none if None)
+            window: Points per series in the sliding window
+            min_samples: Points a series needs before it can alert
+            z_threshold: Welford z-score that flags a point
+            ewma_alpha: EWMA smoothing factor
+            ewma_threshold: EWMA z-score that flags a point
+            robust_threshold: Median/MAD score that confirms a flagged point
+            cooldown: Seconds (event time) a series stays quiet after alerting
+        """
+        if min_samples > window:
+            raise ValueError("min_samples cannot exceed the window size")
+        self.alert_agent = alert_agent
+        self.window = window
+        self.min_samples = max(2, min_samples)
+        self.z_threshold = z_threshold
+        self.ewma_alpha = ewma_alpha
+        self.ewma_threshold = ewma_threshold
+        self.robust_threshold = robust_threshold
+        self.cooldown = cooldown
+        self._series: Dict[Tuple[str, str], _SeriesState] = {}
+        self.points = 0
+        self.flagged = 0
+        self.anomalies = 0
+        self.suppressed = 0
+    
+    def __len__(self) -> int:
+        return len(self._series)
+    
+    def observe(
+        self,
+        entity: str,
+        metric: str,
+        value: float,
+        timestamp: Any = None,
+        source: str = ""
+    ) -> Optional[Anomaly]:
+        """
+        Fold one point into its series and alert if it is anomalous.
+        
+        The point is scored against the statistics of the points before it.
+        
+        Args:
+            entity: What the metric is about (e.g. "Ethereum")
+            metric: Metric name
+            value: Observed value
+            timestamp: Event time (datetime or epoch seconds; now if None)
+            source: Data source, passed on to the alert context
+            
+        Returns:
+            The anomaly if an alert was raised, else None
+        """
+        key = (entity, metric)
+        state = self._series.get(key)
+        if state is None:
+            state = self._series[key] = _SeriesState(self.window)
+        self.points += 1
+        value = float(value)
+        
+        anomaly = None
+        if state.count >= self.min_samples:
+            anomaly = self._score(state, entity, metric, value, timestamp, source)
+        self._update(state, value)
+        return anomaly
+    
+    def observe_metric(self, metric: Metric) -> Optional[Anomaly]:
+        """Observe a Metric record."""
+        return self.observe(metric.entity, metric.name, metric.value, metric.timestamp, metric.source)
+    
+    def observe_series(self, series: TimeSeriesData) -> List[Anomaly]:
+        """
+        Observe every point of a TimeSeriesData in order.
+        
+        Returns:
+            Anomalies that raised alerts
+        """
+        anomalies = []
+        for timestamp, value in zip(series.timestamps, series.values):
+            anomaly = self.observe(series.entity, series.metric_name, value, timestamp, series.source)
+            if anomaly is not None:
+                anomalies.append(anomaly)
+        return anomalies
+    
+    def observe_many(self, metrics: Iterable[Metric]) -> List[Anomaly]:
+        """Observe a batch of Metric records; returns anomalies that raised alerts."""
+        anomalies = []
+        for metric in metrics:
+            anomaly = self.observe_metric(metric)
+            if anomaly is not None:
+                anomalies.append(anomaly)
+        return anomalies
+    
+    def reset(self, entity: str, metric: str) -> None:
+        """Forget a series (e.g. after a known level shift)."""
+        self._series.pop((entity, metric), None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get detector counters."""
+        return {
+            'series': len(self._series),
+            'points': self.points,
+            'flagged': self.flagged,
+            'anomalies': self.anomalies,
+            'suppressed': self.suppressed
+        }
+    
+    def _score(
+        self,
+        state: _SeriesState,
+        entity: str,
+        metric: str,
+        value: float,
+        timestamp: Any,
+        source: str
+    ) -> Optional[Anomaly]:
+        """Score a point against its series; alert on a new, confirmed anomaly."""
+        n = min(state.count, self.window)
+        std = math.sqrt(state.m2 / (n - 1)) if state.m2 > 0 else 0.0
+        z_score = _deviation(value - state.mean, std)
+        ewma_score = _deviation(value - state.ewma, math.sqrt(state.ewm_var))
+        
+        if abs(z_score) < self.z_threshold and abs(ewma_score) < self.ewma_threshold:
+            state.anomalous = None
+            return None
+        self.flagged += 1
+        
+        # Confirm with the robust score; only flagged points pay for the median
+        values = state.window[:n]
+        median = float(np.median(values))
+        mad = float(np.median(np.abs(values - median)))
+        robust_score = _deviation(value - median, MAD_SCALE * mad)
+        if abs(robust_score) < self.robust_threshold:
+            state.anomalous = None
+            return None
+            
+        direction = "up" if value > median else "down"
+        seconds = _to_seconds(timestamp)
+        # Dedup: one alert per anomalous run in the same direction, then a cooldown
+        if state.anomalous == direction or seconds - state.last_alert_at < self.cooldown:
+            state.anomalous = direction
+            self.suppressed += 1
+            return None
+        state.anomalous = direction
+        state.last_alert_at = seconds
+        self.anomalies += 1
+        
+        anomaly = Anomaly(
+            entity=entity,
+            metric=metric,
+            value=value,
+            expected_value=median,
+            timestamp=seconds,
+            z_score=z_score,
+            ewma_score=ewma_score,
+            robust_score=robust_score,
+            direction=direction,
+            source=source
+        )
+        if self.alert_agent is not None:
+            self.alert_agent.create_alert(*anomaly.to_alert_input())
+        return anomaly
+    
+    def _update(self, state: _SeriesState, value: float) -> None:
+        """Fold a point into the window, Welford and EWMA statistics in O(1)."""
+        size = self.window
+        position = state.count % size
+        if state.count < size:
+            # Growing window: plain Welford step
+            n = state.count + 1
+            delta = value - state.mean
+            state.mean += delta / n
+            state.m2 += delta * (value - state.mean)
+        else:
+            # Full window: replace the oldest value
+            oldest = state.window[position]
+            old_mean = state.mean
+            state.mean += (value - oldest) / size
+            state.m2 = max(0.0, state.m2 + (value - oldest) * (value - state.mean + oldest - old_mean))
+        state.window[position] = value
+        
+        if state.count == 0:
+            state.ewma = value
+        else:
+            delta = value - state.ewma
+            state.ewma += self.ewma_alpha * delta
+            state.ewm_var = (1 - self.ewma_alpha) * (state.ewm_var + self.ewma_alpha * delta * delta)
+        state.count += 1
+
+
+def _deviation(difference: float, scale: float) -> float:
+    """Difference in units of scale (infinite if scale is zero and difference is not)."""
+    if scale > 0:
+        return float(difference / scale)  # Window values are numpy scalars
+    return 0.0 if difference == 0 else math.copysign(math.inf, difference)
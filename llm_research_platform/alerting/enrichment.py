@@ -0,0 +1,219 @@
+"""
+Asynchronous, batched alert enrichment.
+
+Alerts are submitted from any thread and enriched on a background asyncio
+event loop: submissions arriving within a short window are combined into
+one batched (LLM) request, with a cap on concurrent requests and a minimum
+spacing between request starts. Results are handed back per item through a
+callback as soon as their batch completes.
+"""
+
+from typing import List, Dict, Any, Optional, Callable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+
+
+class EnrichmentPool:
+    """
+    Background worker pool that batches enrichment requests.
+    
+    ``enrich_batch`` receives a list of submitted items and returns one
+    result per item; it may be a plain function (run on the pool's threads)
+    or a coroutine function. ``on_result(item, result, error)`` is called
+    on the pool's loop thread for every item, with ``error`` set and
+    ``result`` None if its batch failed.
+    
+    Example:
+        >>> pool = EnrichmentPool(llm_enrich_batch, apply_enrichment, max_batch_size=16, rate_limit=5)
+        >>> pool.submit(item)
+        >>> pool.join(timeout=30)
+    """
+    
+    def __init__(
+        self,
+        enrich_batch: Callable[[List[Any]], Any],
+        on_result: Callable[[Any, Any, Optional[BaseException]], None],
+        max_batch_size: int = 16,
+        batch_window: float = 0.05,
+        max_concurrency: int = 4,
+        rate_limit: Optional[float] = None
+    ):
+        """
+        Initialize the pool (the worker loop starts on the first submit).
+        
+        Args:
+            enrich_batch: Batched enrichment function (items -> results)
+            on_result: Callback receiving (item, result, error) per item
+            max_batch_size: Maximum items per request
+            batch_window: Seconds to wait for a batch to fill before sending it
+            max_concurrency: Maximum requests in flight
+            rate_limit: Maximum requests started per second (unlimited if None)
+        """
+        self.enrich_batch = enrich_batch
+        self.on_result = on_result
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.max_concurrency = max_concurrency
+        self.rate_limit = rate_limit
+        self._pending = deque()  # Submitted, not yet batched (appended from any thread)
+        self._outstanding = 0  # Submitted, result not yet delivered
+        self._condition = threading.Condition()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._started = threading.Event()
+        self._closing = False
+        self._next_start = 0.0
+        self.submitted = 0
+        self.batches = 0
+        self.failed = 0
+    
+    @property
+    def pending(self) -> int:
+        """Items whose results have not been delivered yet."""
+        return self._outstanding
+    
+    def submit(self, item: Any) -> None:
+        """
+        Queue an item for enrichment (thread-safe, never blocks on the request).
+        
+        Raises:
+            RuntimeError: If the pool is closed
+        """
+        self._start()
+        with self._condition:
+            # Checked with the append under one lock: the loop drains every
+            # item queued before close and none can be queued after it
+            if self._closing:
+                raise RuntimeError("EnrichmentPool is closed")
+            self._outstanding += 1
+            self.submitted += 1
+            self._pending.append(item)
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every submitted item has been delivered.
+        
+        Returns:
+            True if nothing is pending, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._outstanding == 0, timeout)
+    
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish the queued work and stop the worker loop; later submits raise."""
+        with self._condition:
+            self._closing = True
+            if self._thread is None:
+                return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # The loop already finished (closed before)
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'submitted': self.submitted,
+            'pending': self._outstanding,
+            'batches': self.batches,
+            'failed_batches': self.failed,
+            'avg_batch_size': (self.submitted - self._outstanding) / self.batches if self.batches else 0.0
+        }
+    
+    def _start(self) -> None:
+        if self._started.is_set():
+            return
+        with self._condition:
+            if self._closing:
+                raise RuntimeError("EnrichmentPool is closed")
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="enrichment"
+                )
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run_loop, name="enrichment-loop", daemon=True)
+                self._thread.start()
+        self._started.wait()
+    
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._dispatch())
+        finally:
+            self._loop.close()
+    
+    async def _dispatch(self) -> None:
+        """Collect batches and start them within the concurrency and rate limits."""
+        self._wakeup = asyncio.Event()
+        self._started.set()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        running = set()
+        
+        while True:
+            self._wakeup.clear()
+            if not self._pending:
+                with self._condition:
+                    # Nothing can be queued once closing is seen with an empty queue
+                    done = self._closing and not self._pending
+                if done:
+                    break
+                await self._wakeup.wait()
+                continue
+            if len(self._pending) < self.max_batch_size and not self._closing:
+                # Give a burst a moment to fill the batch
+                await asyncio.sleep(self.batch_window)
+                
+            await semaphore.acquire()
+            await self._throttle()
+            batch = [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+            task = asyncio.ensure_future(self._run_batch(batch, semaphore))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            
+        if running:
+            await asyncio.gather(*running)
+    
+    async def _throttle(self) -> None:
+        """Space request starts at least 1 / rate_limit seconds apart."""
+        if not self.rate_limit:
+            return
+        now = time.monotonic()
+        delay = self._next_start - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next_start = max(now, self._next_start) + 1.0 / self.rate_limit
+    
+    async def _run_batch(self, batch: List[Any], semaphore: asyncio.Semaphore) -> None:
+        self.batches += 1
+        error = None
+        try:
+            if asyncio.iscoroutinefunction(self.enrich_batch):
+                results = await self.enrich_batch(batch)
+            else:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(self._executor, self.enrich_batch, batch)
+            results = list(results)
+            if len(results) != len(batch):
+                raise ValueError(f"enrich_batch returned {len(results)} results for {len(batch)} items")
+        except Exception as exc:
+            self.failed += 1
+            error = exc
+            results = [None] * len(batch)
+        finally:
+            semaphore.release()
+            
+        for item, result in zip(batch, results):
+            try:
+                self.on_result(item, result, error)
+            except Exception:
+                pass  # A failing callback must not stall the other items
+        with self._condition:
+            self._outstanding -= len(batch)
+            self._condition.notify_all()
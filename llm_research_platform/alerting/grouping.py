@@ -0,0 +1,169 @@
+"""
+Alert fingerprinting, time-windowed grouping and per-fingerprint caching.
+
+An alert's fingerprint is its (metric, region, direction). While an open
+alert with the same fingerprint has seen an occurrence within the grouping
+window, new anomalies are folded into it instead of raising another alert,
+so a flapping metric produces one alert with a growing occurrence count.
+Enrichment that only depends on the fingerprint and the severity of the
+change (root causes, suggested actions) is cached so it is generated once
+per key.
+"""
+
+from typing import Dict, Any, Hashable, Optional, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+
+def alert_region(context: Dict[str, Any]) -> str:
+    """Region an alert is about: the context's region, else its entity."""
+    return str(context.get('region') or context.get('entity') or '')
+
+
+def alert_fingerprint(anomaly_data: Dict[str, Any], context: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    Fingerprint of an anomaly: (metric, region, direction).
+    
+    The region falls back to the entity, and the direction to the sign of
+    the change, for anomalies that do not carry them.
+    """
+    metric = str(anomaly_data.get('metric', ''))
+    region = alert_region(context)
+    direction = anomaly_data.get('direction')
+    if direction is None:
+        direction = "down" if anomaly_data.get('change', 0) < 0 else "up"
+    return metric, region, str(direction)
+
+
+class AlertGrouper:
+    """
+    Open alert per fingerprint, matched while its last occurrence is recent.
+    
+    The window slides: every grouped occurrence extends it, so an alert
+    stays open for as long as its metric keeps flapping.
+    
+    Example:
+        >>> grouper = AlertGrouper(window_seconds=900)
+        >>> alert_id = grouper.match(fingerprint, timestamp)
+        >>> if alert_id is None:
+        ...     grouper.track(fingerprint, new_alert.id, timestamp)
+    """
+    
+    def __init__(self, window_seconds: float = 900.0):
+        """
+        Initialize the grouper.
+        
+        Args:
+            window_seconds: Seconds after the last occurrence in which new anomalies are grouped
+        """
+        self.window_seconds = window_seconds
+        self._groups: Dict[Hashable, Tuple[str, float]] = {}  # Fingerprint -> (alert id, last seen)
+        self._fingerprints: Dict[str, Hashable] = {}  # Alert id -> fingerprint
+        self.grouped = 0
+    
+    def __len__(self) -> int:
+        return len(self._groups)
+    
+    def match(self, fingerprint: Hashable, timestamp: float) -> Optional[str]:
+        """
+        Alert an occurrence at timestamp should be grouped into.
+        
+        A match extends the group's window to the new occurrence.
+        
+        Args:
+            fingerprint: Fingerprint of the new anomaly
+            timestamp: Occurrence time in epoch seconds
+            
+        Returns:
+            Id of the open alert, or None if a new alert should be raised
+        """
+        group = self._groups.get(fingerprint)
+        if group is None:
+            return None
+        alert_id, last_seen = group
+        if timestamp - last_seen > self.window_seconds:
+            self.forget(alert_id)
+            return None
+        self._groups[fingerprint] = (alert_id, max(last_seen, timestamp))
+        self.grouped += 1
+        return alert_id
+    
+    def track(self, fingerprint: Hashable, alert_id: str, timestamp: float) -> None:
+        """Make alert_id the open alert of a fingerprint."""
+        previous = self._groups.get(fingerprint)
+        if previous is not None:
+            self._fingerprints.pop(previous[0], None)
+        self._groups[fingerprint] = (alert_id, timestamp)
+        self._fingerprints[alert_id] = fingerprint
+    
+    def forget(self, alert_id: str) -> None:
+        """Stop grouping into an alert (e.g. once it is resolved)."""
+        fingerprint = self._fingerprints.pop(alert_id, None)
+        if fingerprint is not None:
+            del self._groups[fingerprint]
+
+
+class EnrichmentCache:
+    """
+    Bounded LRU cache of alert enrichment per key (e.g. fingerprint and severity), with a TTL.
+    
+    Example:
+        >>> cache = EnrichmentCache(max_entries=1024, ttl=3600)
+        >>> enrichment = cache.get(fingerprint)
+        >>> if enrichment is None:
+        ...     cache.put(fingerprint, {"root_causes": causes, "suggested_actions": actions})
+    """
+    
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 3600.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum cached fingerprints
+            ttl: Seconds an entry stays valid (no expiry if None)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, fingerprint: Hashable) -> Optional[Dict[str, Any]]:
+        """Cached enrichment of a fingerprint, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None or (entry[0] is not None and time.monotonic() >= entry[0]):
+                if entry is not None:
+                    del self._entries[fingerprint]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, fingerprint: Hashable, enrichment: Dict[str, Any]) -> None:
+        """Cache the enrichment of a fingerprint."""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[fingerprint] = (expires_at, enrichment)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,145 @@
+"""
+Indexed in-memory alert store.
+
+Open alerts are held in an id -> alert dict and indexed by (status,
+priority), with per-status and per-priority counters updated on every
+transition, so lookups, transitions and summaries never scan the alerts.
+Closed alerts move to a bounded, append-only history archive.
+"""
+
+from typing import List, Dict, Any, Hashable, Iterable, Optional, Tuple
+from collections import deque
+
+
+class AlertStore:
+    """
+    Open alerts with O(1) lookup, transitions and counts, plus a bounded archive.
+    
+    Alerts are any objects with ``id``, ``status`` and ``priority``
+    attributes; status and priority values are used as index keys.
+    
+    Example:
+        >>> store = AlertStore(history_size=10000)
+        >>> store.add(alert)
+        >>> store.set_status(alert.id, AlertStatus.ACKNOWLEDGED)
+        >>> store.archive(alert.id, AlertStatus.RESOLVED)
+        >>> store.status_counts[AlertStatus.ACTIVE]
+    """
+    
+    def __init__(self, history_size: int = 10000):
+        """
+        Initialize an empty store.
+        
+        Args:
+            history_size: Closed alerts kept in the archive (oldest dropped first)
+        """
+        self._alerts: Dict[str, Any] = {}
+        # (status, priority) -> ordered set (dict) of alert ids, in insertion order
+        self._index: Dict[Tuple[Hashable, Hashable], Dict[str, None]] = {}
+        self.status_counts: Dict[Hashable, int] = {}
+        self.priority_counts: Dict[Hashable, int] = {}
+        self.history = deque(maxlen=history_size)
+        self.archived_counts: Dict[Hashable, int] = {}  # Closed alerts ever, by final status
+    
+    def __len__(self) -> int:
+        return len(self._alerts)
+    
+    def __contains__(self, alert_id: str) -> bool:
+        return alert_id in self._alerts
+    
+    def __iter__(self):
+        return iter(self._alerts.values())
+    
+    def add(self, alert: Any) -> None:
+        """Add an open alert (replacing one with the same id)."""
+        if alert.id in self._alerts:
+            self._unindex(self._alerts[alert.id])
+        self._alerts[alert.id] = alert
+        self._reindex(alert)
+    
+    def get(self, alert_id: str) -> Optional[Any]:
+        """Open alert with the given id, or None."""
+        return self._alerts.get(alert_id)
+    
+    def set_status(self, alert_id: str, status: Hashable) -> Optional[Any]:
+        """
+        Move an open alert to another status.
+        
+        Returns:
+            The alert, or None if no open alert has the id
+        """
+        alert = self._alerts.get(alert_id)
+        if alert is None:
+            return None
+        self._unindex(alert)
+        alert.status = status
+        self._reindex(alert)
+        return alert
+    
+    def set_priority(self, alert_id: str, priority: Hashable) -> Optional[Any]:
+        """Change the priority of an open alert (None if unknown)."""
+        alert = self._alerts.get(alert_id)
+        if alert is None:
+            return None
+        self._unindex(alert)
+        alert.priority = priority
+        self._reindex(alert)
+        return alert
+    
+    def archive(self, alert_id: str, status: Hashable) -> Optional[Any]:
+        """
+        Close an open alert and append it to the history archive.
+        
+        Args:
+            alert_id: Alert to close
+            status: Final status (e.g. resolved or dismissed)
+            
+        Returns:
+            The alert, or None if no open alert has the id
+        """
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+        self._unindex(alert)
+        alert.status = status
+        self.history.append(alert)
+        self.archived_counts[status] = self.archived_counts.get(status, 0) + 1
+        return alert
+    
+    def select(
+        self,
+        statuses: Iterable[Hashable],
+        priorities: Iterable[Hashable]
+    ) -> List[Any]:
+        """
+        Open alerts matching any of the statuses and priorities.
+        
+        Results are grouped in the given priority order (then status order),
+        oldest first within a group; only matching index buckets are read.
+        """
+        statuses = list(statuses)
+        alerts = []
+        for priority in priorities:
+            for status in statuses:
+                bucket = self._index.get((status, priority))
+                if bucket:
+                    alerts.extend(self._alerts[alert_id] for alert_id in bucket)
+        return alerts
+    
+    def count(self, status: Hashable, priority: Hashable) -> int:
+        """Open alerts with the given status and priority."""
+        return len(self._index.get((status, priority), ()))
+    
+    def _reindex(self, alert: Any) -> None:
+        self._index.setdefault((alert.status, alert.priority), {})[alert.id] = None
+        self.status_counts[alert.status] = self.status_counts.get(alert.status, 0) + 1
+        self.priority_counts[alert.priority] = self.priority_counts.get(alert.priority, 0) + 1
+    
+    def _unindex(self, alert: Any) -> None:
+        key = (alert.status, alert.priority)
+        bucket = self._index[key]
+        del bucket[alert.id]
+        if not bucket:
+            del self._index[key]
+        self.status_counts[alert.status] -= 1
+        self.priority_counts[alert.priority] -= 1
@@ -0,0 +1,31 @@
+"""
+Recommendation engine infrastructure for the LLM Research Platform.
+"""
+
+from .activity import ActivityStore, IdInterner
+from .catalog import ContentCatalog
+from .collaborative import ItemSimilarityModel, interaction_weight, INTERACTION_WEIGHTS
+from .precompute import RecommendationStore, SharedSparseMatrix
+from .preferences import (
+    PreferenceVectors,
+    content_embedding,
+    hashed_embedding,
+    project_embedding,
+    PREFERENCE_DIMENSION,
+)
+
+__all__ = [
+    "ActivityStore",
+    "IdInterner",
+    "ContentCatalog",
+    "ItemSimilarityModel",
+    "interaction_weight",
+    "INTERACTION_WEIGHTS",
+    "RecommendationStore",
+    "SharedSparseMatrix",
+    "PreferenceVectors",
+    "content_embedding",
+    "project_embedding",
+    "hashed_embedding",
+    "PREFERENCE_DIMENSION",
+]
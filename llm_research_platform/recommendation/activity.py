@@ -0,0 +1,412 @@
+"""
+Bounded, time-windowed activity storage for recommendations.
+
+Each user's activities are kept as columnar arrays (timestamp, activity
+type, item, category, tags) in a ring buffer capped at ``max_per_user``
+events, with string ids interned to integer codes. Events older than the
+retention window are dropped, and item counts for trending are kept in
+sliding time buckets, so memory stays flat no matter how long the service
+runs. Dropped events are handed back to the caller, so counters derived
+from them can be decremented.
+
+Retention is event time: the window ends at the newest timestamp seen, so
+replayed or backfilled history is retained the same way as live traffic.
+The trending window ends at the newest timestamp or the wall clock,
+whichever is later, so items stop trending when activity stops.
+"""
+
+from typing import List, Dict, Any, Hashable, Iterator, Optional, Tuple
+from collections import Counter
+from datetime import datetime
+import heapq
+import time
+import numpy as np
+
+# Appends between sweeps that drop expired events of idle users
+PRUNE_EVERY = 10000
+
+# Items kept ranked for trending reads (larger k scans the whole window)
+TRENDING_TOP_SIZE = 100
+
+
+def to_seconds(timestamp: Any) -> float:
+    """Epoch seconds of a datetime or number (the current time otherwise)."""
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    return time.time()
+
+
+class IdInterner:
+    """
+    Two-way mapping between ids and dense integer codes.
+    
+    Example:
+        >>> items = IdInterner()
+        >>> code = items.intern("content_001")
+        >>> items[code]
+        'content_001'
+    """
+    
+    def __init__(self):
+        self._codes: Dict[Hashable, int] = {}
+        self._values: List[Hashable] = []
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def __getitem__(self, code: int) -> Hashable:
+        return self._values[code]
+    
+    def intern(self, value: Hashable) -> int:
+        """Code of a value, assigning the next code to new values."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+    
+    def get(self, value: Hashable) -> int:
+        """Code of a value, or -1 if it was never interned."""
+        return self._codes.get(value, -1)
+
+
+class _ActivityRing:
+    """Columnar ring buffer of one user's activities, grown up to a cap."""
+    
+    __slots__ = ('timestamps', 'types', 'items', 'categories', 'tags', 'start', 'count')
+    
+    def __init__(self, capacity: int):
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.types = np.zeros(capacity, dtype=np.int32)
+        self.items = np.zeros(capacity, dtype=np.int32)
+        self.categories = np.zeros(capacity, dtype=np.int32)
+        self.tags = np.zeros(capacity, dtype=np.int32)
+        self.start = 0
+        self.count = 0
+    
+    @property
+    def capacity(self) -> int:
+        return len(self.timestamps)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.capacity * 24
+    
+    def append(
+        self,
+        timestamp: float,
+        activity_type: int,
+        item: int,
+        category: int,
+        tags: int,
+        max_size: int
+    ) -> None:
+        if self.count == self.capacity and self.capacity < max_size:
+            self._grow(min(max_size, 2 * self.capacity))
+        if self.count == self.capacity:
+            # Full: overwrite the oldest event
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+        position = (self.start + self.count) % self.capacity
+        self.timestamps[position] = timestamp
+        self.types[position] = activity_type
+        self.items[position] = item
+        self.categories[position] = category
+        self.tags[position] = tags
+        self.count += 1
+    
+    def expire(self, cutoff: float) -> List[int]:
+        """
+        Drop events from the oldest end while they are older than cutoff.
+        
+        Returns:
+            Positions of the dropped events (valid until the next append)
+        """
+        dropped = []
+        while self.count and self.timestamps[self.start] < cutoff:
+            dropped.append(self.start)
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+        return dropped
+    
+    def positions(self, n: Optional[int] = None) -> np.ndarray:
+        """Buffer positions of the newest n events (all if None), oldest first."""
+        n = self.count if n is None else min(n, self.count)
+        return (self.start + np.arange(self.count - n, self.count)) % self.capacity
+    
+    def _grow(self, capacity: int) -> None:
+        order = self.positions()
+        for name in ('timestamps', 'types', 'items', 'categories', 'tags'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.count] = column[order]
+            setattr(self, name, grown)
+        self.start = 0
+
+
+class ActivityStore:
+    """
+    Per-user activity ring buffers with retention and sliding-window trending.
+    
+    Only the type, item id, category, tags and timestamp of an activity are
+    kept. The counts of the ``top_size`` leading items are kept ranked as
+    events arrive, so reading the top items does not scan the window.
+    
+    Example:
+        >>> store = ActivityStore(retention_seconds=30 * 86400)
+        >>> expired = store.append("user_001", {"type": "view", "item_id": "content_001"})
+        >>> store.recent("user_001", 10)
+        >>> store.trending(3)
+    """
+    
+    def __init__(
+        self,
+        retention_seconds: float = 30 * 86400,
+        max_per_user: int = 1000,
+        bucket_seconds: float = 3600,
+        trending_buckets: int = 24,
+        initial_capacity: int = 16,
+        top_size: int = TRENDING_TOP_SIZE
+    ):
+        """
+        Initialize an empty store.
+        
+        Args:
+            retention_seconds: Events older than this (relative to the newest event) are dropped
+            max_per_user: Maximum events kept per user
+            bucket_seconds: Width of a trending time bucket
+            trending_buckets: Number of buckets in the trending window
+            initial_capacity: Initial ring buffer size per user
+            top_size: Leading items kept ranked for trending reads
+        """
+        self.retention_seconds = retention_seconds
+        self.max_per_user = max_per_user
+        self.bucket_seconds = bucket_seconds
+        self.trending_buckets = trending_buckets
+        self.initial_capacity = max(1, min(initial_capacity, max_per_user))
+        self.top_size = max(1, top_size)
+        self.types = IdInterner()
+        self.items = IdInterner()
+        self.categories = IdInterner()
+        self.tag_sets = IdInterner()
+        self._users: Dict[str, _ActivityRing] = {}
+        self._buckets: Dict[int, Counter] = {}  # Bucket number -> item code counts
+        self._newest_bucket: Optional[int] = None
+        self._trending = Counter()  # Item code -> count over the window
+        # The top_size highest counts of _trending; every other item counts at most _top_floor
+        self._top: Dict[int, int] = {}
+        self._top_floor = 0
+        self._latest = float('-inf')
+        self._appends_since_prune = 0
+    
+    def __len__(self) -> int:
+        return len(self._users)
+    
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._users
+    
+    @property
+    def event_count(self) -> int:
+        return sum(ring.count for ring in self._users.values())
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in self._users.values())
+    
+    def users(self) -> List[str]:
+        """Users with retained activity."""
+        return list(self._users)
+    
+    def append(self, user_id: str, activity: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Record an activity.
+        
+        Args:
+            user_id: User identifier
+            activity: Activity data (type, item_id, category, tags, timestamp)
+            
+        Returns:
+            (user id, activity) of every event this append dropped: evicted
+            by the per-user cap, expired, or the activity itself if it is
+            already older than the retention window
+        """
+        timestamp = to_seconds(activity.get('timestamp'))
+        self._latest = max(self._latest, timestamp)
+        cutoff = self._latest - self.retention_seconds
+        if timestamp < cutoff:
+            return [(user_id, activity)]
+            
+        item_id = activity.get('item_id')
+        category = activity.get('category')
+        tags = activity.get('tags')
+        item = self.items.intern(item_id) if item_id is not None else -1
+        ring = self._users.get(user_id)
+        if ring is None:
+            ring = self._users[user_id] = _ActivityRing(self.initial_capacity)
+            
+        dropped = []
+        if ring.count >= self.max_per_user:
+            # Full: the oldest event is overwritten
+            dropped.append((user_id, self._activity(ring, ring.start)))
+        ring.append(
+            timestamp,
+            self.types.intern(activity.get('type')),
+            item,
+            self.categories.intern(category) if category is not None else -1,
+            self.tag_sets.intern(tuple(tags)) if tags else -1,
+            self.max_per_user
+        )
+        for position in ring.expire(cutoff):
+            dropped.append((user_id, self._activity(ring, position)))
+            
+        if item >= 0:
+            self._count_trending(item, timestamp)
+            
+        self._appends_since_prune += 1
+        if self._appends_since_prune >= PRUNE_EVERY:
+            dropped.extend(self.prune())
+        return dropped
+    
+    def recent(self, user_id: str, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        A user's newest activities, oldest first.
+        
+        Args:
+            user_id: User identifier
+            n: Maximum number of activities (all retained if None)
+            
+        Returns:
+            List of activity dicts with type, item_id, category and timestamp
+        """
+        ring = self._users.get(user_id)
+        if ring is None:
+            return []
+            
+        return [self._activity(ring, position) for position in ring.positions(n)]
+    
+    def item_events(self, user_id: str) -> Iterator[Tuple[Hashable, Hashable]]:
+        """
+        A user's retained item interactions.
+        
+        Yields:
+            (item id, activity type) pairs, oldest first
+        """
+        ring = self._users.get(user_id)
+        if ring is None:
+            return
+        positions = ring.positions()
+        for item, activity_type in zip(ring.items[positions], ring.types[positions]):
+            if item >= 0:
+                yield self.items[item], self.types[activity_type]
+    
+    def interactions(self) -> Iterator[Tuple[str, Hashable, Hashable]]:
+        """
+        Retained item interactions of all users.
+        
+        Yields:
+            (user id, item id, activity type) triples
+        """
+        for user_id in list(self._users):
+            for item_id, activity_type in self.item_events(user_id):
+                yield user_id, item_id, activity_type
+    
+    def trending(self, k: int = 10, now: Optional[Any] = None) -> List[Tuple[Hashable, int]]:
+        """
+        Most interacted-with items in the trending window.
+        
+        Args:
+            k: Maximum number of items
+            now: End of the window if later than the newest event (the
+                current time if None)
+            
+        Returns:
+            List of (item id, count), highest count first
+        """
+        self._slide(int(max(self._latest, to_seconds(now)) // self.bucket_seconds))
+        if k <= self.top_size:
+            top = heapq.nlargest(k, self._top.items(), key=lambda entry: entry[1])
+        else:
+            top = heapq.nlargest(k, self._trending.items(), key=lambda entry: entry[1])
+        return [(self.items[item], count) for item, count in top]
+    
+    def prune(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Drop expired events of every user and forget users with none left.
+        
+        Returns:
+            (user id, activity) of every dropped event
+        """
+        self._appends_since_prune = 0
+        cutoff = self._latest - self.retention_seconds
+        dropped = []
+        emptied = []
+        for user_id, ring in self._users.items():
+            for position in ring.expire(cutoff):
+                dropped.append((user_id, self._activity(ring, position)))
+            if not ring.count:
+                emptied.append(user_id)
+        for user_id in emptied:
+            del self._users[user_id]
+        return dropped
+    
+    def _activity(self, ring: _ActivityRing, position: int) -> Dict[str, Any]:
+        """Decode the event at a ring position into an activity dict."""
+        activity = {'timestamp': datetime.fromtimestamp(ring.timestamps[position])}
+        if self.types[ring.types[position]] is not None:
+            activity['type'] = self.types[ring.types[position]]
+        if ring.items[position] >= 0:
+            activity['item_id'] = self.items[ring.items[position]]
+        if ring.categories[position] >= 0:
+            activity['category'] = self.categories[ring.categories[position]]
+        if ring.tags[position] >= 0:
+            activity['tags'] = list(self.tag_sets[ring.tags[position]])
+        return activity
+    
+    def _count_trending(self, item: int, timestamp: float) -> None:
+        self._slide(int(self._latest // self.bucket_seconds))
+        bucket = int(timestamp // self.bucket_seconds)
+        if bucket <= self._newest_bucket - self.trending_buckets:
+            return
+        counts = self._buckets.get(bucket)
+        if counts is None:
+            counts = self._buckets[bucket] = Counter()
+        counts[item] += 1
+        self._trending[item] += 1
+        self._rank(item, self._trending[item])
+    
+    def _rank(self, item: int, count: int) -> None:
+        """Keep _top current after an item's count went up by one."""
+        top = self._top
+        if item in top:
+            top[item] = count
+            if count - 1 == self._top_floor:
+                self._top_floor = min(top.values())
+        elif len(top) < self.top_size:
+            top[item] = count
+            self._top_floor = min(self._top_floor, count) if len(top) > 1 else count
+        elif count > self._top_floor:
+            del top[min(top, key=top.get)]
+            top[item] = count
+            self._top_floor = min(top.values())
+    
+    def _slide(self, newest: int) -> None:
+        """Move the window end forward to a bucket, forgetting buckets that fell out."""
+        if self._newest_bucket is not None and newest <= self._newest_bucket:
+            return
+        self._newest_bucket = newest
+        oldest = newest - self.trending_buckets + 1
+        expired = [bucket for bucket in self._buckets if bucket < oldest]
+        if not expired:
+            return
+        for bucket in expired:
+            counts = self._buckets.pop(bucket)
+            self._trending.subtract(counts)
+            for item in counts:
+                if self._trending[item] <= 0:
+                    del self._trending[item]
+                    
+        # Counts only went down: rank again (once per slide, not per read)
+        self._top = dict(heapq.nlargest(self.top_size, self._trending.items(), key=lambda entry: entry[1]))
+        self._top_floor = min(self._top.values()) if self._top else 0
@@ -0,0 +1,91 @@
+"""
+Indexed content catalogue for recommendations.
+
+Content is kept in insertion order with an id -> position hash index and a
+tag -> positions inverted index, so lookups by id are O(1) and tag-based
+candidate generation only touches content sharing a tag with the query.
+"""
+
+from typing import List, Dict, Any, Iterable, Optional, Set
+
+
+class ContentCatalog:
+    """
+    Content items with id and tag indexes.
+    
+    Adding content with a known id replaces the earlier item in place.
+    
+    Example:
+        >>> catalog = ContentCatalog()
+        >>> catalog.add({"id": "content_001", "tags": ["DeFi", "analysis"]})
+        >>> catalog.get("content_001")
+        >>> candidates = catalog.with_any_tag(["DeFi", "Layer 2"])
+    """
+    
+    def __init__(self):
+        self.contents: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}  # content id -> position
+        self._tag_positions: Dict[str, Set[int]] = {}  # tag -> positions
+    
+    def __len__(self) -> int:
+        return len(self.contents)
+    
+    def __contains__(self, content_id: str) -> bool:
+        return content_id in self._positions
+    
+    def add(self, content: Dict[str, Any]) -> None:
+        """
+        Add or replace a content item.
+        
+        Args:
+            content: Content metadata (id, tags, ...)
+        """
+        content_id = content.get('id')
+        position = self._positions.get(content_id) if content_id is not None else None
+        if position is None:
+            position = len(self.contents)
+            self.contents.append(content)
+            if content_id is not None:
+                self._positions[content_id] = position
+        else:
+            for tag in self._tags(self.contents[position]):
+                positions = self._tag_positions[tag]
+                positions.discard(position)
+                if not positions:
+                    del self._tag_positions[tag]
+            self.contents[position] = content
+            
+        for tag in self._tags(content):
+            self._tag_positions.setdefault(tag, set()).add(position)
+    
+    def position(self, content_id: str) -> int:
+        """Position (interned id) of the content with the given id, or -1."""
+        return self._positions.get(content_id, -1)
+    
+    def get(self, content_id: str) -> Optional[Dict[str, Any]]:
+        """Content with the given id, or None."""
+        position = self._positions.get(content_id)
+        return self.contents[position] if position is not None else None
+    
+    def with_any_tag(self, tags: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Content sharing at least one of the tags, in insertion order.
+        
+        Args:
+            tags: Tags to match
+            
+        Returns:
+            List of matching content items
+        """
+        return [self.contents[position] for position in self.positions_with_any_tag(tags)]
+    
+    def positions_with_any_tag(self, tags: Iterable[str]) -> List[int]:
+        """Sorted positions of content sharing at least one of the tags."""
+        positions: Set[int] = set()
+        for tag in tags:
+            positions.update(self._tag_positions.get(tag, ()))
+        return sorted(positions)
+    
+    @staticmethod
+    def _tags(content: Dict[str, Any]) -> Set[str]:
+        return set(content.get('tags') or ())
@@ -0,0 +1,197 @@
+"""
+Item-item collaborative filtering over a sparse user x item matrix.
+
+Interactions are aggregated into a CSR matrix of implicit-feedback weights.
+Item-item cosine similarity is computed with sparse matrix products in
+blocks of items, and only the top-N neighbours of each item are kept, so
+scoring a user is one sparse row times the (items x items) neighbour matrix.
+"""
+
+from typing import List, Dict, Iterable, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+# Implicit-feedback weight per activity type; unknown types count as a view
+INTERACTION_WEIGHTS = {
+    'view': 1.0,
+    'download': 2.0,
+    'share': 2.5,
+    'like': 3.0,
+    'review': 3.0,
+    'create': 4.0,
+    'publish': 4.0
+}
+
+# Items whose similarity rows are computed per sparse product
+SIMILARITY_BLOCK_ITEMS = 1024
+
+
+def interaction_weight(activity_type: Optional[str]) -> float:
+    """Implicit-feedback weight of an activity type."""
+    return INTERACTION_WEIGHTS.get(activity_type, 1.0)
+
+
+class ItemSimilarityModel:
+    """
+    Top-N item-item cosine neighbours learned from user interactions.
+    
+    Example:
+        >>> model = ItemSimilarityModel(neighbours=50)
+        >>> model.fit([("user_001", "content_001", 3.0), ("user_002", "content_001", 1.0)])
+        >>> item_ids, scores = model.recommend({"content_001": 3.0}, k=10)
+    """
+    
+    def __init__(self, neighbours: int = 50, min_similarity: float = 0.0):
+        """
+        Initialize an empty model.
+        
+        Args:
+            neighbours: Similar items kept per item
+            min_similarity: Similarities at or below this are dropped
+        """
+        self.neighbours = neighbours
+        self.min_similarity = min_similarity
+        self.user_ids: List[str] = []
+        self.item_ids: List[str] = []
+        self.user_index: Dict[str, int] = {}
+        self.item_index: Dict[str, int] = {}
+        self.interactions = sparse.csr_matrix((0, 0), dtype=np.float32)  # users x items
+        self.similarities = sparse.csr_matrix((0, 0), dtype=np.float32)  # items x items, top-N per row
+    
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.item_ids)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            for matrix in (self.interactions, self.similarities)
+        )
+    
+    def fit(self, interactions: Iterable[Tuple[str, str, float]]) -> None:
+        """
+        Build the interaction matrix and the top-N neighbour lists.
+        
+        Args:
+            interactions: (user id, item id, weight) triples; repeated pairs are summed
+        """
+        user_index: Dict[str, int] = {}
+        item_index: Dict[str, int] = {}
+        rows, cols, weights = [], [], []
+        for user_id, item_id, weight in interactions:
+            rows.append(user_index.setdefault(user_id, len(user_index)))
+            cols.append(item_index.setdefault(item_id, len(item_index)))
+            weights.append(weight)
+            
+        self.user_index = user_index
+        self.item_index = item_index
+        self.user_ids = list(user_index)
+        self.item_ids = list(item_index)
+        
+        # COO -> CSR sums duplicate (user, item) entries
+        self.interactions = sparse.coo_matrix(
+            (np.asarray(weights, dtype=np.float32), (rows, cols)),
+            shape=(len(user_index), len(item_index))
+        ).tocsr()
+        self.similarities = self._top_neighbours(self.interactions)
+    
+    def similar_items(self, item_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Most similar items to an item.
+        
+        Args:
+            item_id: Item to look up
+            k: Maximum number of neighbours
+            
+        Returns:
+            List of (item id, cosine similarity), most similar first
+        """
+        item = self.item_index.get(item_id)
+        if item is None:
+            return []
+        start, end = self.similarities.indptr[item], self.similarities.indptr[item + 1]
+        columns = self.similarities.indices[start:end]
+        scores = self.similarities.data[start:end]
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(self.item_ids[columns[i]], float(scores[i])) for i in order]
+    
+    def recommend(
+        self,
+        user_items: Dict[str, float],
+        k: int = 10,
+        exclude_seen: bool = True
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Score items for a user from the items they interacted with.
+        
+        The score of an item is the interaction-weighted average of its
+        similarity to the user's items, so it lies in [0, 1].
+        
+        Args:
+            user_items: Item id -> interaction weight for the user
+            k: Maximum number of items
+            exclude_seen: Leave out items the user already interacted with
+            
+        Returns:
+            Tuple of (item ids, scores) sorted by descending score
+        """
+        known = [(self.item_index[item_id], weight) for item_id, weight in user_items.items() if item_id in self.item_index]
+        if not known or k <= 0:
+            return [], np.empty(0, dtype=np.float32)
+            
+        columns = np.fromiter((item for item, _ in known), dtype=np.int64, count=len(known))
+        weights = np.fromiter((weight for _, weight in known), dtype=np.float32, count=len(known))
+        user_row = sparse.csr_matrix(
+            (weights, columns, np.array([0, len(known)])),
+            shape=(1, len(self.item_ids))
+        )
+        scores = (user_row @ self.similarities).tocsr()
+        scores.sum_duplicates()
+        
+        items = scores.indices
+        values = scores.data / weights.sum()
+        if exclude_seen:
+            unseen = ~np.isin(items, columns)
+            items, values = items[unseen], values[unseen]
+        if len(values) > k:
+            top = np.argpartition(-values, k - 1)[:k]
+        else:
+            top = np.arange(len(values))
+        top = top[np.argsort(-values[top], kind='stable')]
+        return [self.item_ids[i] for i in items[top]], np.minimum(values[top], 1.0)
+    
+    def _top_neighbours(self, interactions: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Item x item cosine similarities, keeping the top-N per item."""
+        n_items = interactions.shape[1]
+        if not n_items:
+            return sparse.csr_matrix((0, 0), dtype=np.float32)
+            
+        # Scale columns to unit norm so X^T X holds cosine similarities
+        norms = np.sqrt(np.asarray(interactions.multiply(interactions).sum(axis=0))).ravel()
+        norms[norms == 0] = 1.0
+        normalized = (interactions @ sparse.diags(1.0 / norms)).tocsc().astype(np.float32)
+        transposed = normalized.T.tocsr()
+        
+        indptr = [0]
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        for start in range(0, n_items, SIMILARITY_BLOCK_ITEMS):
+            block = (transposed[start:start + SIMILARITY_BLOCK_ITEMS] @ normalized).tocsr()
+            for offset in range(block.shape[0]):
+                lo, hi = block.indptr[offset], block.indptr[offset + 1]
+                columns = block.indices[lo:hi]
+                scores = block.data[lo:hi]
+                keep = (columns != start + offset) & (scores > self.min_similarity)
+                columns, scores = columns[keep], scores[keep]
+                if len(scores) > self.neighbours:
+                    top = np.argpartition(-scores, self.neighbours - 1)[:self.neighbours]
+                    columns, scores = columns[top], scores[top]
+                indices.append(columns)
+                data.append(scores)
+                indptr.append(indptr[-1] + len(columns))
+                
+        return sparse.csr_matrix(
+            (np.concatenate(data).astype(np.float32), np.concatenate(indices), np.asarray(indptr)),
+            shape=(n_items, n_items)
+        )
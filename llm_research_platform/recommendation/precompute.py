@@ -0,0 +1,176 @@
+"""
+Batch precomputation of recommendation lists.
+
+Ranked lists for many users are generated in a process pool and written to
+a sqlite store that interactive requests read from while the entries are
+fresh. The item-item neighbour matrix, the largest shared structure, is
+placed in shared memory once instead of being pickled to every worker.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from multiprocessing import shared_memory
+import json
+import pickle
+import sqlite3
+import threading
+import time
+import numpy as np
+from scipy import sparse
+
+
+class RecommendationStore:
+    """
+    sqlite store of precomputed recommendation lists, one row per user.
+    
+    Each entry records when it was generated and how many items were asked
+    for, so readers can tell whether it is fresh and long enough.
+    
+    Example:
+        >>> store = RecommendationStore("recommendations.sqlite")
+        >>> store.put_many([("user_001", [{"title": "...", "relevance_score": 0.8}])], limit=50)
+        >>> entry = store.get("user_001", max_age=3600)
+    """
+    
+    def __init__(self, path: str = ":memory:"):
+        """
+        Open (or create) the store.
+        
+        Args:
+            path: sqlite file path (":memory:" for a process-local store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS recommendations ("
+            "user_id TEXT PRIMARY KEY, generated_at REAL NOT NULL, "
+            "request_limit INTEGER NOT NULL, items TEXT NOT NULL)"
+        )
+        self._db.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+    
+    def put_many(
+        self,
+        entries: List[Tuple[str, List[Dict[str, Any]]]],
+        limit: int,
+        generated_at: Optional[float] = None
+    ) -> None:
+        """
+        Store ranked lists, replacing earlier entries of the same users.
+        
+        Args:
+            entries: (user id, ranked recommendation dicts) pairs
+            limit: Number of items each list was generated for
+            generated_at: Generation time in epoch seconds (now if None)
+        """
+        generated_at = time.time() if generated_at is None else generated_at
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO recommendations (user_id, generated_at, request_limit, items) "
+                "VALUES (?, ?, ?, ?)",
+                [(user_id, generated_at, limit, json.dumps(items)) for user_id, items in entries]
+            )
+            self._db.commit()
+    
+    def get(self, user_id: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a user's precomputed list.
+        
+        Args:
+            user_id: User identifier
+            max_age: Maximum age in seconds (any age if None)
+            
+        Returns:
+            Dict with 'items', 'limit' and 'generated_at', or None if missing or stale
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT generated_at, request_limit, items FROM recommendations WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[0] > max_age):
+            return None
+        return {'generated_at': row[0], 'limit': row[1], 'items': json.loads(row[2])}
+    
+    def clear(self) -> None:
+        """Delete every stored list."""
+        with self._lock:
+            self._db.execute("DELETE FROM recommendations")
+            self._db.commit()
+    
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class SharedSparseMatrix:
+    """
+    CSR matrix copied once into shared memory for worker processes.
+    
+    ``spec`` is a small picklable description that workers pass to
+    ``attach_shared_matrix`` to map the same blocks without copying.
+    Use as a context manager; the blocks are unlinked on exit.
+    """
+    
+    def __init__(self, matrix: sparse.csr_matrix):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        arrays = []
+        try:
+            for array in (matrix.data, matrix.indices, matrix.indptr):
+                block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+                arrays.append((block.name, array.shape, array.dtype.str))
+        except Exception:
+            self.close()
+            raise
+        self.spec = (arrays, matrix.shape)
+    
+    def __enter__(self) -> "SharedSparseMatrix":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+# Per-worker recommender snapshot, set by the pool initializer
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_recommender = None
+
+
+def attach_shared_matrix(spec) -> sparse.csr_matrix:
+    """Map a SharedSparseMatrix in a worker (the blocks stay open for the worker's lifetime)."""
+    arrays, shape = spec
+    views = []
+    for name, array_shape, dtype in arrays:
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(block)
+        views.append(np.ndarray(array_shape, dtype=np.dtype(dtype), buffer=block.buf))
+    return sparse.csr_matrix(tuple(views), shape=shape, copy=False)
+
+
+def init_worker(snapshot: bytes, similarity_spec) -> None:
+    """
+    Pool initializer: unpickle the recommender and attach the shared neighbours.
+    
+    Args:
+        snapshot: Pickled RecommendationAgent without its item neighbour matrix
+        similarity_spec: SharedSparseMatrix.spec of the item neighbour matrix
+    """
+    global _worker_recommender
+    _worker_recommender = pickle.loads(snapshot)
+    _worker_recommender.item_model.similarities = attach_shared_matrix(similarity_spec)
+
+
+def recommend_batch(user_ids: List[str], limit: int) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Pool task: ranked recommendation rows for a batch of users."""
+    return [(user_id, _worker_recommender._ranked_rows(user_id, limit)) for user_id in user_ids]
@@ -0,0 +1,241 @@
+"""
+Embedding-based user preference vectors with vector-index user matching.
+
+A user's preference vector is the time-decayed, interaction-weighted
+average of the embeddings of the content they touched. It is updated in
+O(d) per event, and similar users are found by cosine similarity over a
+matrix of the normalized vectors (or an ANN index over it).
+"""
+
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from functools import lru_cache
+import hashlib
+import math
+import numpy as np
+
+from ..search import EmbeddingMatrix, create_index, normalize_vector, tokenize, top_k_indices
+from .activity import IdInterner
+
+# Dimension of hashed content embeddings
+PREFERENCE_DIMENSION = 128
+
+
+def hashed_embedding(features: Iterable[str], dimension: int = PREFERENCE_DIMENSION) -> np.ndarray:
+    """
+    Signed feature-hashing embedding of a bag of features.
+    
+    Stable across processes (unlike ``hash``), so vectors can be persisted.
+    
+    Args:
+        features: Feature strings (tags, tokens, ...)
+        dimension: Embedding dimension
+        
+    Returns:
+        Unit-length float32 vector (zeros without features)
+    """
+    vector = np.zeros(dimension, dtype=np.float32)
+    for feature in features:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+        vector[digest % dimension] += 1.0 if digest >> 63 else -1.0
+    return normalize_vector(vector)
+
+
+@lru_cache(maxsize=8)
+def _projection(source_dimension: int, dimension: int) -> np.ndarray:
+    """Fixed Gaussian random projection (seeded by the shapes, so stable across processes)."""
+    rng = np.random.default_rng([source_dimension, dimension])
+    projection = rng.standard_normal((source_dimension, dimension)).astype(np.float32)
+    return projection / np.float32(math.sqrt(dimension))
+
+
+def project_embedding(embedding: np.ndarray, dimension: int = PREFERENCE_DIMENSION) -> np.ndarray:
+    """
+    Map an embedding of any size to ``dimension`` dimensions.
+    
+    Embeddings of another size go through a fixed random projection, which
+    approximately preserves cosine similarity between them.
+    
+    Returns:
+        Unit-length float32 vector of the given dimension
+    """
+    embedding = np.asarray(embedding, dtype=np.float32).ravel()
+    if len(embedding) != dimension:
+        embedding = embedding @ _projection(len(embedding), dimension)
+    return normalize_vector(embedding)
+
+
+def content_embedding(content: Dict[str, Any], dimension: int = PREFERENCE_DIMENSION) -> np.ndarray:
+    """
+    Embedding of a content item, always ``dimension``-dimensional.
+    
+    Uses ``content['embedding']`` when present (projected to ``dimension``
+    if it has another size), otherwise hashes the tags, category and title
+    tokens.
+    """
+    if content.get('embedding') is not None:
+        return project_embedding(content['embedding'], dimension)
+    features = [f"tag:{str(tag).lower()}" for tag in content.get('tags') or ()]
+    if content.get('category'):
+        features.append(f"tag:{str(content['category']).lower()}")
+    features.extend(tokenize(content.get('title') or ''))
+    return hashed_embedding(features, dimension)
+
+
+class PreferenceVectors:
+    """
+    Decayed-average preference vector per user plus nearest-user search.
+    
+    With the "flat" backend, search is one matrix-vector product over all
+    users. Other backends (see ``create_index``) are rebuilt once more than
+    ``rebuild_fraction`` of the users changed; users updated since the last
+    build are scored exactly, and every candidate is re-scored against the
+    current vectors.
+    
+    Example:
+        >>> preferences = PreferenceVectors(half_life_seconds=14 * 86400)
+        >>> preferences.update("user_001", content_vector, weight=3.0, timestamp=time.time())
+        >>> preferences.similar("user_001", k=10)
+    """
+    
+    def __init__(
+        self,
+        half_life_seconds: float = 14 * 86400,
+        index_backend: str = "flat",
+        rebuild_fraction: float = 0.1,
+        **index_params
+    ):
+        """
+        Initialize an empty set of preference vectors.
+        
+        Args:
+            half_life_seconds: Age at which an event's weight has halved
+            index_backend: "flat" for exact search, or an ANN backend name
+            rebuild_fraction: Fraction of changed users that triggers an ANN rebuild
+            **index_params: Parameters for the ANN backend (nlist, nprobe, ...)
+        """
+        self.decay_rate = math.log(2) / half_life_seconds
+        self.index_backend = index_backend
+        self.rebuild_fraction = rebuild_fraction
+        self.index_params = index_params
+        self.users = IdInterner()
+        self.matrix = EmbeddingMatrix()  # Normalized preference vector per user row
+        self._sums = np.empty((0, 0), dtype=np.float32)  # Decayed weighted embedding sums
+        self._weights = np.empty(0, dtype=np.float64)  # Decayed total weights
+        self._updated = np.empty(0, dtype=np.float64)  # Time of the last decay
+        self._index = None
+        self._changed = set()  # Rows updated since the ANN index was built
+    
+    def __len__(self) -> int:
+        return len(self.matrix)
+    
+    def __contains__(self, user_id: str) -> bool:
+        return self.users.get(user_id) >= 0
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # ANN backends such as faiss do not pickle; the index is rebuilt on demand
+        state['_index'] = None
+        return state
+    
+    @property
+    def nbytes(self) -> int:
+        index_bytes = self._index.nbytes if self._index is not None else 0
+        return self.matrix.nbytes + self._sums[:len(self)].nbytes + 16 * len(self) + index_bytes
+    
+    def update(self, user_id: str, embedding: np.ndarray, weight: float, timestamp: float) -> None:
+        """
+        Fold one interaction into a user's preference vector.
+        
+        Args:
+            user_id: User identifier
+            embedding: Embedding of the content interacted with
+            weight: Interaction weight
+            timestamp: Event time in epoch seconds
+        """
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if self.matrix.dimension is not None and len(embedding) != self.matrix.dimension:
+            raise ValueError(
+                f"Embedding dimension mismatch: expected {self.matrix.dimension}, got {len(embedding)}"
+            )
+        row = self.users.get(user_id)
+        if row < 0:
+            row = self.users.intern(user_id)
+            self._append_row(len(embedding), timestamp)
+            
+        elapsed = timestamp - self._updated[row]
+        if elapsed >= 0:
+            decay = math.exp(-self.decay_rate * elapsed)
+            self._sums[row] *= decay
+            self._weights[row] *= decay
+            self._updated[row] = timestamp
+        else:
+            # Late event: decay it to the row's reference time instead
+            weight *= math.exp(self.decay_rate * elapsed)
+            
+        self._sums[row] += weight * embedding
+        self._weights[row] += weight
+        self.matrix.vectors[row] = normalize_vector(self._sums[row])
+        self._changed.add(row)
+    
+    def vector(self, user_id: str) -> Optional[np.ndarray]:
+        """A user's decayed average embedding, or None for unknown users."""
+        row = self.users.get(user_id)
+        if row < 0 or not self._weights[row]:
+            return None
+        return self._sums[row] / self._weights[row]
+    
+    def similar(self, user_id: str, k: int = 10, min_similarity: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Users with the most similar preference vectors.
+        
+        Args:
+            user_id: User to match
+            k: Maximum number of users
+            min_similarity: Minimum cosine similarity
+            
+        Returns:
+            List of (user id, cosine similarity), most similar first
+        """
+        row = self.users.get(user_id)
+        if row < 0 or k <= 0:
+            return []
+            
+        query = self.matrix[row]
+        if self.index_backend == "flat":
+            rows = np.arange(len(self))
+            scores = self.matrix.scores(query)
+        else:
+            rows = self._candidates(query, k + 1)
+            scores = self.matrix.scores(query, rows)
+        
+        keep = (rows != row) & (scores >= min_similarity)
+        rows, scores = rows[keep], scores[keep]
+        top = top_k_indices(scores, k)
+        return [(self.users[int(r)], float(s)) for r, s in zip(rows[top], scores[top])]
+    
+    def _candidates(self, query: np.ndarray, k: int) -> np.ndarray:
+        """ANN candidates plus every row changed since the index was built."""
+        if self._index is None or len(self._changed) > self.rebuild_fraction * len(self):
+            self._rebuild_index()
+        ids, _ = self._index.search(query, 2 * k)
+        changed = np.fromiter(self._changed, dtype=np.int64, count=len(self._changed))
+        return np.unique(np.concatenate([ids[ids >= 0].astype(np.int64), changed]))
+    
+    def _rebuild_index(self) -> None:
+        index = create_index(self.index_backend, dimension=self.matrix.dimension, **self.index_params)
+        index.add(self.matrix.vectors.copy(), np.arange(len(self)))
+        self._index = index
+        self._changed = set()
+    
+    def _append_row(self, dimension: int, timestamp: float) -> None:
+        size = len(self.matrix)
+        self.matrix.append(np.zeros((1, dimension), dtype=np.float32))
+        if size == len(self._weights):
+            capacity = max(1024, 2 * size)
+            sums = np.zeros((capacity, dimension), dtype=np.float32)
+            if size:
+                sums[:size] = self._sums[:size]
+            self._sums = sums
+            self._weights = np.concatenate([self._weights, np.zeros(capacity - size)])
+            self._updated = np.concatenate([self._updated, np.zeros(capacity - size)])
+        self._updated[size] = timestamp
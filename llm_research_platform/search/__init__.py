@@ -0,0 +1,58 @@
+"""
+Vector search infrastructure for the LLM Research Platform.
+"""
+
+from .matrix import EmbeddingMatrix, normalize_vector, normalize_rows
+from .ann import (
+    VectorIndex,
+    FlatIndex,
+    IVFFlatIndex,
+    QuantizedIndex,
+    FaissIndex,
+    create_index,
+    measure_recall,
+    top_k_indices,
+)
+from .quantization import ScalarQuantizer, ProductQuantizer
+from .store import EmbeddingStore, MemmapEmbeddingMatrix, DocumentSidecar
+from .cache import EmbeddingCache, QueryResultCache
+from .filters import FilterIndex
+from .chunking import ChunkTable, chunk_document, split_passages
+from .batching import RequestCoalescer, EmbeddingMicroBatcher
+from .lexical import BM25Index, reciprocal_rank_fusion, tokenize
+from .tombstones import RowMap
+from .sharding import ShardedSearchPool
+from .stats import CorpusStatistics
+
+__all__ = [
+    "EmbeddingMatrix",
+    "normalize_vector",
+    "normalize_rows",
+    "VectorIndex",
+    "FlatIndex",
+    "IVFFlatIndex",
+    "QuantizedIndex",
+    "FaissIndex",
+    "ScalarQuantizer",
+    "ProductQuantizer",
+    "create_index",
+    "measure_recall",
+    "top_k_indices",
+    "EmbeddingStore",
+    "MemmapEmbeddingMatrix",
+    "DocumentSidecar",
+    "EmbeddingCache",
+    "QueryResultCache",
+    "FilterIndex",
+    "ChunkTable",
+    "chunk_document",
+    "split_passages",
+    "RequestCoalescer",
+    "EmbeddingMicroBatcher",
+    "BM25Index",
+    "reciprocal_rank_fusion",
+    "tokenize",
+    "RowMap",
+    "ShardedSearchPool",
+    "CorpusStatistics",
+]
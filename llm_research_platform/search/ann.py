@@ -0,0 +1,750 @@
+"""
+Approximate nearest-neighbour (ANN) index backends for semantic search.
+
+All backends score by inner product over L2-normalized vectors (i.e. cosine
+similarity) and identify vectors by the integer row ids assigned by the
+agent's EmbeddingMatrix.
+
+Backends:
+- "flat": exact brute-force scan (baseline, perfect recall)
+- "ivf_flat": pure-NumPy inverted-file index with k-means coarse quantizer
+- "sq8" / "pq": pure-NumPy quantized scans (8-bit scalar or product
+  quantization) with an optional exact float re-rank
+- "hnsw" / "ivf_pq": optional faiss-cpu backends
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import time
+import numpy as np
+
+from .matrix import EmbeddingMatrix, normalize_vector, normalize_rows
+from .quantization import ScalarQuantizer, ProductQuantizer
+
+
+class VectorIndex:
+    """
+    Base interface for vector index backends.
+    
+    Subclasses implement incremental ``add`` and top-k ``search``; ``search``
+    returns (row ids, scores) sorted by descending score.
+    """
+    
+    backend = "base"
+    
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """
+        Add vectors to the index.
+        
+        Args:
+            vectors: Array of shape (n, d)
+            ids: Row ids for each vector
+        """
+        raise NotImplementedError
+    
+    def search(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar vectors.
+        
+        Args:
+            query_embedding: Query vector
+            k: Number of neighbours to return
+            
+        Returns:
+            Tuple of (row ids, scores) sorted by descending score
+        """
+        raise NotImplementedError
+    
+    def reset(self) -> None:
+        """Remove all vectors from the index."""
+        raise NotImplementedError
+    
+    def __len__(self) -> int:
+        raise NotImplementedError
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the index structures (0 if unknown)."""
+        return 0
+    
+    def get_params(self) -> Dict[str, Any]:
+        """Get the tunable search parameters of the index."""
+        return {'backend': self.backend}
+    
+    def set_params(self, **params) -> None:
+        """Update tunable search parameters (e.g. nprobe, ef_search)."""
+        for name, value in params.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Unknown parameter for {self.backend} index: {name}")
+            setattr(self, name, value)
+
+
+class FlatIndex(VectorIndex):
+    """Exact brute-force index over an EmbeddingMatrix."""
+    
+    backend = "flat"
+    
+    def __init__(self, matrix: Optional[EmbeddingMatrix] = None):
+        """
+        Initialize the flat index.
+        
+        Args:
+            matrix: Existing matrix to scan; a private one is created if None
+        """
+        self._owns_matrix = matrix is None
+        self.matrix = matrix if matrix is not None else EmbeddingMatrix()
+        self._ids = None if matrix is not None else np.empty(0, dtype=np.int64)
+    
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        # Shared matrices are appended to by their owner
+        if self._owns_matrix:
+            self.matrix.append(vectors)
+            self._ids = np.concatenate([self._ids, np.asarray(ids, dtype=np.int64)])
+    
+    def search(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.matrix.scores(query_embedding)
+        top = top_k_indices(scores, k)
+        ids = top if self._ids is None else self._ids[top]
+        return ids, scores[top]
+    
+    def reset(self) -> None:
+        if self._owns_matrix:
+            self.matrix = EmbeddingMatrix()
+            self._ids = np.empty(0, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.matrix)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+
+class IVFFlatIndex(VectorIndex):
+    """
+    Pure-NumPy inverted-file index with flat (uncompressed) lists.
+    
+    Vectors are assigned to the nearest of ``nlist`` k-means centroids; a
+    query only scans the ``nprobe`` closest lists. Until enough vectors have
+    been seen to train the coarse quantizer, the index behaves like a flat
+    index over a staging buffer.
+    
+    Example:
+        >>> index = IVFFlatIndex(nlist=256, nprobe=16)
+        >>> index.add(vectors, np.arange(len(vectors)))
+        >>> ids, scores = index.search(query, k=10)
+    """
+    
+    backend = "ivf_flat"
+    
+    def __init__(
+        self,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        train_size: Optional[int] = None,
+        kmeans_iterations: int = 10,
+        seed: int = 42
+    ):
+        """
+        Initialize the IVF-flat index.
+        
+        Args:
+            nlist: Number of inverted lists (coarse centroids)
+            nprobe: Lists scanned per query (higher = better recall, slower)
+            train_size: Vectors to buffer before training (default 39 * nlist)
+            kmeans_iterations: Lloyd iterations used for training
+            seed: Random seed for centroid initialization
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or 39 * nlist
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.reset()
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+    
+    def reset(self) -> None:
+        self.centroids = None
+        self._lists: List[EmbeddingMatrix] = []
+        self._list_ids: List[List[np.ndarray]] = []
+        self._staging = EmbeddingMatrix()
+        self._staging_ids: List[np.ndarray] = []
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def nbytes(self) -> int:
+        total = self._staging.nbytes + sum(len(ids) * 8 for ids in self._staging_ids)
+        if self.is_trained:
+            total += self.centroids.nbytes
+            total += sum(vectors.nbytes for vectors in self._lists)
+            total += sum(ids.nbytes for parts in self._list_ids for ids in parts)
+        return total
+    
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Train the coarse quantizer with spherical k-means.
+        
+        Args:
+            vectors: Training sample of shape (n, d), n >= nlist
+        """
+        vectors = normalize_rows(vectors)
+        self.centroids = spherical_kmeans(
+            vectors, self.nlist, self.kmeans_iterations, self.seed
+        )
+        self._lists = [EmbeddingMatrix(vectors.shape[1], initial_capacity=64) for _ in range(self.nlist)]
+        self._list_ids = [[] for _ in range(self.nlist)]
+    
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        vectors = normalize_rows(np.atleast_2d(vectors))
+        ids = np.asarray(ids, dtype=np.int64)
+        self._size += len(ids)
+        
+        if not self.is_trained:
+            self._staging.append(vectors)
+            self._staging_ids.append(ids)
+            if len(self._staging) >= max(self.train_size, self.nlist):
+                self._train_from_staging()
+            return
+            
+        self._add_to_lists(vectors, ids)
+    
+    def search(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize_vector(query_embedding)
+        
+        if not self.is_trained:
+            scores = self._staging.scores(query)
+            top = top_k_indices(scores, k)
+            return self._flat_staging_ids()[top], scores[top]
+            
+        # Select the nprobe closest lists
+        probe = top_k_indices(self.centroids @ query, min(self.nprobe, self.nlist))
+        
+        id_parts, score_parts = [], []
+        for list_no in probe:
+            if len(self._lists[list_no]):
+                score_parts.append(self._lists[list_no].vectors @ query)
+                id_parts.append(self._list_id_array(list_no))
+                
+        if not id_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            
+        ids = np.concatenate(id_parts)
+        scores = np.concatenate(score_parts)
+        top = top_k_indices(scores, k)
+        return ids[top], scores[top]
+    
+    def get_params(self) -> Dict[str, Any]:
+        return {
+            'backend': self.backend,
+            'nlist': self.nlist,
+            'nprobe': self.nprobe,
+            'is_trained': self.is_trained
+        }
+    
+    def _train_from_staging(self) -> None:
+        """Train on the staged vectors and move them into the lists."""
+        vectors = self._staging.vectors.copy()
+        ids = self._flat_staging_ids()
+        self.train(vectors)
+        self._add_to_lists(vectors, ids)
+        self._staging = EmbeddingMatrix()
+        self._staging_ids = []
+    
+    def _add_to_lists(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """Assign vectors to their nearest centroid and append to lists."""
+        assignments = assign_to_centroids(vectors, self.centroids)
+        order = np.argsort(assignments, kind='stable')
+        boundaries = np.flatnonzero(np.diff(assignments[order])) + 1
+        for group in np.split(order, boundaries):
+            if len(group) == 0:
+                continue
+            list_no = assignments[group[0]]
+            self._lists[list_no].append(vectors[group])
+            self._list_ids[list_no].append(ids[group])
+    
+    def _list_id_array(self, list_no: int) -> np.ndarray:
+        """Get the ids of one list as a single array (consolidated lazily)."""
+        parts = self._list_ids[list_no]
+        if len(parts) > 1:
+            self._list_ids[list_no] = parts = [np.concatenate(parts)]
+        return parts[0]
+    
+    def _flat_staging_ids(self) -> np.ndarray:
+        if not self._staging_ids:
+            return np.empty(0, dtype=np.int64)
+        if len(self._staging_ids) > 1:
+            self._staging_ids = [np.concatenate(self._staging_ids)]
+        return self._staging_ids[0]
+
+
+class QuantizedIndex(VectorIndex):
+    """
+    Pure-NumPy scan over quantized codes with asymmetric distance.
+    
+    Stores 8-bit scalar codes ("sq8", d bytes per vector) or product
+    quantization codes ("pq", pq_m bytes per vector) instead of float32
+    rows. Queries stay in float and are scored directly against the codes.
+    With a float matrix to re-rank from (e.g. a memory-mapped store), the
+    top ``k * rerank`` candidates are re-scored exactly, recovering most of
+    the recall lost to quantization while only touching a few float rows
+    per query.
+    
+    Until ``train_size`` vectors have been seen, the index behaves like a
+    flat index over the rows seen so far: with a matrix only their ids are
+    staged and the rows are read back from it, otherwise the vectors are
+    buffered.
+    
+    Example:
+        >>> index = QuantizedIndex("pq", pq_m=96, matrix=agent.embeddings)
+        >>> index.add(vectors, np.arange(len(vectors)))
+        >>> ids, scores = index.search(query, k=10)
+    """
+    
+    def __init__(
+        self,
+        quantizer: str = "sq8",
+        matrix: Optional[EmbeddingMatrix] = None,
+        rerank: int = 4,
+        train_size: Optional[int] = None,
+        pq_m: int = 96,
+        pq_bits: int = 8,
+        kmeans_iterations: int = 10,
+        seed: int = 42
+    ):
+        """
+        Initialize the quantized index.
+        
+        Args:
+            quantizer: "sq8" (scalar, 4x smaller) or "pq" (product quantization)
+            matrix: Float rows (by row id) used to re-rank candidates exactly
+            rerank: Candidates re-ranked per requested result (0 disables)
+            train_size: Vectors to stage before training the quantizer (default
+                1024 for "sq8", 16 * 2 ** pq_bits for "pq"); kept small, since
+                staged vectors are scanned exactly
+            pq_m: Sub-vectors per vector for "pq" (must divide the dimension)
+            pq_bits: Bits per sub-vector code for "pq"
+            kmeans_iterations: Lloyd iterations for PQ codebooks
+            seed: Random seed for codebook initialization
+        """
+        if quantizer not in ("sq8", "pq"):
+            raise ValueError(f"Unknown quantizer: {quantizer}")
+        self.backend = quantizer
+        self.matrix = matrix
+        self.rerank = rerank
+        self.train_size = train_size or (1024 if quantizer == "sq8" else 16 * 2 ** pq_bits)
+        self.pq_m = pq_m
+        self.pq_bits = pq_bits
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        self.reset()
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.quantizer.is_trained
+    
+    def reset(self) -> None:
+        if self.backend == "sq8":
+            self.quantizer = ScalarQuantizer()
+        else:
+            self.quantizer = ProductQuantizer(self.pq_m, self.pq_bits, self.kmeans_iterations, self.seed)
+        self._codes = np.empty((0, 0), dtype=np.uint8)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._staging = EmbeddingMatrix()  # Buffered vectors, only without a matrix
+        self._staging_ids: List[np.ndarray] = []
+        self._staged = 0
+    
+    def __len__(self) -> int:
+        return self._size + self._staged
+    
+    @property
+    def nbytes(self) -> int:
+        codes = self._codes[:self._size].nbytes + self._size * 8
+        staging = self._staging.nbytes + sum(ids.nbytes for ids in self._staging_ids)
+        return codes + staging + self.quantizer.nbytes
+    
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        vectors = normalize_rows(np.atleast_2d(vectors))
+        ids = np.asarray(ids, dtype=np.int64)
+        
+        if not self.is_trained:
+            if self.matrix is None:
+                self._staging.append(vectors)
+            self._staging_ids.append(ids)
+            self._staged += len(ids)
+            minimum = 2 ** self.pq_bits if self.backend == "pq" else 1
+            if self._staged >= max(self.train_size, minimum):
+                self._train_from_staging()
+            return
+            
+        self._append_codes(self.quantizer.encode(vectors), ids)
+    
+    def search(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize_vector(query_embedding)
+        
+        if not self.is_trained:
+            ids = np.concatenate(self._staging_ids) if self._staging_ids else np.empty(0, dtype=np.int64)
+            if self.matrix is not None:
+                scores = self.matrix.scores(query, rows=ids)
+            else:
+                scores = self._staging.scores(query)
+            top = top_k_indices(scores, k)
+            return ids[top], scores[top]
+            
+        scores = self.quantizer.scores(query, self._codes[:self._size])
+        rerank = self.rerank and self.matrix is not None
+        top = top_k_indices(scores, k * self.rerank if rerank else k)
+        ids = self._ids[top]
+        if not rerank:
+            return ids, scores[top]
+            
+        # Exact float scores for the shortlisted rows (sorted for locality)
+        ids = np.sort(ids)
+        exact = self.matrix.scores(query, rows=ids)
+        top = top_k_indices(exact, k)
+        return ids[top], exact[top]
+    
+    def get_params(self) -> Dict[str, Any]:
+        params = {
+            'backend': self.backend,
+            'rerank': self.rerank,
+            'is_trained': self.is_trained,
+            'code_size': self.quantizer.code_size
+        }
+        if self.backend == "pq":
+            params['pq_m'] = self.pq_m
+            params['pq_bits'] = self.pq_bits
+        return params
+    
+    def _train_from_staging(self) -> None:
+        """Train on the staged vectors and encode them."""
+        ids = np.concatenate(self._staging_ids)
+        vectors = self._staging.vectors if self.matrix is None else normalize_rows(self.matrix[ids])
+        self.quantizer.train(vectors)
+        self._append_codes(self.quantizer.encode(vectors), ids)
+        self._staging = EmbeddingMatrix()
+        self._staging_ids = []
+        self._staged = 0
+    
+    def _append_codes(self, codes: np.ndarray, ids: np.ndarray) -> None:
+        required = self._size + len(codes)
+        if required > len(self._codes):
+            capacity = max(required, 2 * len(self._codes), 1024)
+            grown_codes = np.empty((capacity, codes.shape[1]), dtype=np.uint8)
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            if self._size:
+                grown_codes[:self._size] = self._codes[:self._size]
+                grown_ids[:self._size] = self._ids[:self._size]
+            self._codes, self._ids = grown_codes, grown_ids
+        self._codes[self._size:required] = codes
+        self._ids[self._size:required] = ids
+        self._size = required
+
+
+class FaissIndex(VectorIndex):
+    """
+    Optional faiss-cpu backend (HNSW or IVF-PQ) using inner-product metric.
+    
+    Requires the ``faiss-cpu`` package. Row ids are kept in a side array so
+    that faiss positions map back to the agent's rows.
+    """
+    
+    def __init__(
+        self,
+        dimension: int,
+        backend: str = "hnsw",
+        hnsw_m: int = 32,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        pq_m: int = 64,
+        pq_bits: int = 8
+    ):
+        """
+        Initialize a faiss index.
+        
+        Args:
+            dimension: Embedding dimension
+            backend: "hnsw" or "ivf_pq"
+            hnsw_m: HNSW graph degree
+            ef_construction: HNSW build-time beam width
+            ef_search: HNSW query-time beam width (recall/latency knob)
+            nlist: IVF lists for "ivf_pq"
+            nprobe: IVF lists probed per query for "ivf_pq"
+            pq_m: Number of PQ sub-quantizers (must divide dimension)
+            pq_bits: Bits per PQ code
+        """
+        try:
+            import faiss
+        except ImportError as exc:
+            raise ImportError(
+                "faiss-cpu is required for the 'hnsw' and 'ivf_pq' index backends: "
+                "pip install faiss-cpu"
+            ) from exc
+            
+        if backend not in ("hnsw", "ivf_pq"):
+            raise ValueError(f"Unsupported faiss backend: {backend}")
+            
+        self._faiss = faiss
+        self.backend = backend
+        self.dimension = dimension
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        self._config = {
+            'hnsw_m': hnsw_m,
+            'ef_construction': ef_construction,
+            'nlist': nlist,
+            'pq_m': pq_m,
+            'pq_bits': pq_bits
+        }
+        self.reset()
+    
+    def reset(self) -> None:
+        faiss = self._faiss
+        config = self._config
+        
+        if self.backend == "hnsw":
+            self._index = faiss.IndexHNSWFlat(
+                self.dimension, config['hnsw_m'], faiss.METRIC_INNER_PRODUCT
+            )
+            self._index.hnsw.efConstruction = config['ef_construction']
+        else:
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            self._index = faiss.IndexIVFPQ(
+                quantizer, self.dimension, config['nlist'],
+                config['pq_m'], config['pq_bits'], faiss.METRIC_INNER_PRODUCT
+            )
+            
+        self._ids = np.empty(0, dtype=np.int64)
+        self._pending: List[np.ndarray] = []
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the stored vectors/codes and graph or list structures (counted without copying)."""
+        index = self._index
+        total = self._ids.nbytes + sum(pending.nbytes for pending in self._pending)
+        if self.backend == "hnsw":
+            hnsw = index.hnsw
+            total += index.ntotal * self.dimension * 4  # Flat storage of the vectors
+            total += hnsw.neighbors.size() * 4 + hnsw.levels.size() * 4 + hnsw.offsets.size() * 8
+        else:
+            # PQ codes plus their ids in the inverted lists, coarse and PQ centroids
+            total += index.ntotal * (index.code_size + 8)
+            total += index.quantizer.ntotal * self.dimension * 4
+            total += index.pq.centroids.size() * 4
+        return total
+    
+    def add(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(normalize_rows(np.atleast_2d(vectors)))
+        self._ids = np.concatenate([self._ids, np.asarray(ids, dtype=np.int64)])
+        
+        if self._index.is_trained:
+            self._index.add(vectors)
+            return
+            
+        # IVF-PQ needs a training sample before vectors can be added
+        self._pending.append(vectors)
+        pending = np.concatenate(self._pending)
+        if len(pending) >= 39 * self._config['nlist']:
+            self._index.train(pending)
+            self._index.add(pending)
+            self._pending = []
+        else:
+            self._pending = [pending]
+    
+    def search(self, query_embedding: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize_vector(query_embedding)
+        
+        if self._pending:
+            # Untrained IVF-PQ: exact scan of the pending buffer
+            scores = self._pending[0] @ query
+            top = top_k_indices(scores, k)
+            return self._ids[top], scores[top]
+            
+        if self.backend == "hnsw":
+            self._index.hnsw.efSearch = max(self.ef_search, k)
+        else:
+            self._index.nprobe = self.nprobe
+            
+        scores, positions = self._index.search(query.reshape(1, -1), min(k, len(self._ids)))
+        valid = positions[0] >= 0
+        return self._ids[positions[0][valid]], scores[0][valid]
+    
+    def get_params(self) -> Dict[str, Any]:
+        params = {'backend': self.backend}
+        if self.backend == "hnsw":
+            params['ef_search'] = self.ef_search
+        else:
+            params['nprobe'] = self.nprobe
+        return params
+
+
+def create_index(
+    backend: str = "flat",
+    dimension: Optional[int] = None,
+    matrix: Optional[EmbeddingMatrix] = None,
+    **params
+) -> VectorIndex:
+    """
+    Create a vector index backend by name.
+    
+    Args:
+        backend: "flat", "ivf_flat", "sq8", "pq", "hnsw" or "ivf_pq"
+        dimension: Embedding dimension (required for faiss backends)
+        matrix: Shared embedding matrix for the flat backend (and the float
+            re-rank of the quantized backends)
+        **params: Backend-specific parameters (nlist, nprobe, ef_search, ...)
+        
+    Returns:
+        VectorIndex instance
+    """
+    if backend == "flat":
+        return FlatIndex(matrix)
+    if backend == "ivf_flat":
+        return IVFFlatIndex(**params)
+    if backend in ("sq8", "pq"):
+        return QuantizedIndex(backend, matrix=matrix, **params)
+    if backend in ("hnsw", "ivf_pq"):
+        if dimension is None:
+            raise ValueError(f"dimension is required for the {backend} backend")
+        return FaissIndex(dimension, backend=backend, **params)
+    raise ValueError(f"Unknown index backend: {backend}")
+
+
+def measure_recall(
+    index: VectorIndex,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    ids: Optional[np.ndarray] = None
+) -> Dict[str, float]:
+    """
+    Measure recall@k and latency of an index against brute force.
+    
+    Args:
+        index: Index under test (already populated with ``vectors``)
+        vectors: Ground-truth vectors, shape (n, d)
+        queries: Query vectors, shape (q, d)
+        k: Number of neighbours compared
+        ids: Row ids of ``vectors`` (defaults to 0..n-1)
+        
+    Returns:
+        Dictionary with recall_at_k and p50/p99/mean latency in milliseconds
+    """
+    exact = normalize_rows(vectors)
+    ids = np.arange(len(exact)) if ids is None else np.asarray(ids)
+    queries = np.atleast_2d(queries)
+    
+    recalls, latencies = [], []
+    for query in queries:
+        truth = set(ids[top_k_indices(exact @ normalize_vector(query), k)].tolist())
+        
+        start = time.perf_counter()
+        found, _ = index.search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        
+        recalls.append(len(truth & set(found.tolist())) / max(len(truth), 1))
+        
+    latencies = np.array(latencies)
+    return {
+        'recall_at_k': float(np.mean(recalls)) if recalls else 0.0,
+        'k': k,
+        'queries': len(queries),
+        'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+        'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+        'latency_mean_ms': float(latencies.mean()) if len(latencies) else 0.0
+    }
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest scores, sorted by descending score.
+    
+    Args:
+        scores: 1-D score array
+        k: Number of indices to return
+        
+    Returns:
+        Array of at most k indices
+    """
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if len(scores) > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def assign_to_centroids(
+    vectors: np.ndarray,
+    centroids: np.ndarray,
+    chunk_size: int = 65536
+) -> np.ndarray:
+    """
+    Assign each vector to its highest inner-product centroid.
+    
+    Args:
+        vectors: Normalized vectors, shape (n, d)
+        centroids: Normalized centroids, shape (c, d)
+        chunk_size: Rows scored per chunk to bound memory
+        
+    Returns:
+        Array of centroid indices, one per vector
+    """
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        chunk = vectors[start:start + chunk_size]
+        assignments[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    n_clusters: int,
+    iterations: int = 10,
+    seed: int = 42
+) -> np.ndarray:
+    """
+    Cluster normalized vectors with cosine-distance k-means.
+    
+    Args:
+        vectors: Normalized vectors, shape (n, d)
+        n_clusters: Number of centroids
+        iterations: Lloyd iterations
+        seed: Random seed
+        
+    Returns:
+        Normalized centroids, shape (n_clusters, d)
+    """
+    if len(vectors) < n_clusters:
+        raise ValueError(f"Need at least {n_clusters} vectors to train, got {len(vectors)}")
+        
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    
+    for _ in range(iterations):
+        assignments = assign_to_centroids(vectors, centroids)
+        order = np.argsort(assignments, kind='stable')
+        clusters, starts = np.unique(assignments[order], return_index=True)
+        sums = np.zeros_like(centroids)
+        sums[clusters] = np.add.reduceat(vectors[order], starts, axis=0)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        
+        # Re-seed empty clusters with random vectors
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+            
+        centroids = normalize_rows(sums)
+        
+    return centroids
@@ -0,0 +1,152 @@
+"""
+Asyncio helpers for serving concurrent semantic search queries.
+
+- RequestCoalescer: identical in-flight requests share one computation
+- EmbeddingMicroBatcher: embedding requests arriving within a short window
+  are combined into one batched embedding call run off the event loop
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Hashable
+from concurrent.futures import Executor
+import asyncio
+import numpy as np
+
+
+class RequestCoalescer:
+    """
+    Coalesce identical concurrent requests into a single computation.
+    
+    The first caller for a key starts the computation; callers arriving while
+    it is in flight await the same result. Cancelling one caller does not
+    cancel the shared computation.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.requests = 0
+        self.coalesced = 0
+    
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``factory()`` once per key among concurrent callers.
+        
+        Args:
+            key: Request identity (e.g. the query string)
+            factory: Coroutine function producing the result
+            
+        Returns:
+            Result of the shared computation
+        """
+        self.requests += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight)
+        }
+
+
+class EmbeddingMicroBatcher:
+    """
+    Micro-batch concurrent embedding requests into batched calls.
+    
+    Requests are collected for up to ``window`` seconds (or until
+    ``max_batch_size`` texts are waiting) and embedded with one call to
+    ``embed_fn`` on an executor thread, keeping the event loop free.
+    
+    Example:
+        >>> batcher = EmbeddingMicroBatcher(agent._embed_texts, window=0.005)
+        >>> vector = await batcher.embed("ETH staking yield")
+    """
+    
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], np.ndarray],
+        window: float = 0.005,
+        max_batch_size: int = 64,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the micro-batcher.
+        
+        Args:
+            embed_fn: Batched embedding function (texts -> matrix)
+            window: Seconds to wait for more requests before flushing
+            max_batch_size: Flush immediately once this many texts wait
+            executor: Executor for embed_fn (the loop's default if None)
+        """
+        self.embed_fn = embed_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()  # Strong refs so flush tasks are not collected
+        self.batches = 0
+        self.texts = 0
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed one text as part of the next micro-batch.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+            
+        return await future
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'texts': self.texts,
+            'avg_batch_size': self.texts / self.batches if self.batches else 0.0
+        }
+    
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run(self, batch: List[tuple]) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.texts += len(texts)
+        
+        loop = asyncio.get_running_loop()
+        try:
+            vectors = await loop.run_in_executor(self.executor, self.embed_fn, texts)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+            
+        by_text = dict(zip(texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
@@ -0,0 +1,298 @@
+"""
+Caches for the semantic index.
+
+- EmbeddingCache: embeddings keyed by (embedding_model, sha256(text)) so
+  identical text is never embedded twice. A bounded in-memory LRU tier
+  serves hot entries; an optional sqlite tier keeps every embedding across
+  restarts and backs entries evicted from memory.
+- QueryResultCache: ranked search results keyed by the normalized query and
+  filter arguments, stamped with the index generation they were computed at.
+"""
+
+from typing import List, Dict, Any, Optional, Hashable
+from collections import OrderedDict
+import hashlib
+import sqlite3
+import threading
+import time
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + sqlite) embedding cache.
+    
+    Thread-safe, so it can be shared by the batch indexing thread pool.
+    
+    Example:
+        >>> cache = EmbeddingCache("text-embedding-ada-002", max_entries=50000)
+        >>> cached = cache.get_many(["DeFi TVL trends"])
+        >>> cache.put_many(["DeFi TVL trends"], embeddings)
+        >>> cache.get_stats()["hit_rate"]
+    """
+    
+    def __init__(
+        self,
+        embedding_model: str,
+        max_entries: int = 10000,
+        disk_path: Optional[str] = None
+    ):
+        """
+        Initialize the embedding cache.
+        
+        Args:
+            embedding_model: Model name, part of every cache key
+            max_entries: Capacity of the in-memory LRU tier
+            disk_path: sqlite file for the on-disk tier (memory only if None)
+        """
+        self.embedding_model = embedding_model
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, digest BLOB NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, digest))"
+            )
+            self._db.commit()
+    
+    def __len__(self) -> int:
+        return len(self._memory)
+    
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for a batch of texts.
+        
+        Args:
+            texts: Texts to look up
+            
+        Returns:
+            List aligned with texts; None marks a cache miss
+        """
+        digests = [self._digest(text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing = []
+        
+        with self._lock:
+            for position, digest in enumerate(digests):
+                vector = self._memory.get(digest)
+                if vector is not None:
+                    self._memory.move_to_end(digest)
+                    results[position] = vector
+                    self.hits += 1
+                else:
+                    missing.append(position)
+                    
+            if missing and self._db is not None:
+                found = self._load_from_disk([digests[p] for p in missing])
+                still_missing = []
+                for position in missing:
+                    vector = found.get(digests[position])
+                    if vector is None:
+                        still_missing.append(position)
+                        continue
+                    results[position] = vector
+                    self._remember(digests[position], vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                missing = still_missing
+                
+            self.misses += len(missing)
+            
+        return results
+    
+    def put_many(self, texts: List[str], embeddings: np.ndarray) -> None:
+        """
+        Store embeddings for a batch of texts.
+        
+        Args:
+            texts: Texts that were embedded
+            embeddings: Embedding matrix aligned with texts
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        digests = [self._digest(text) for text in texts]
+        
+        with self._lock:
+            for digest, vector in zip(digests, vectors):
+                self._remember(digest, vector)
+                
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)",
+                    [(self.embedding_model, d, v.tobytes()) for d, v in zip(digests, vectors)]
+                )
+                self._db.commit()
+    
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset counters (disk tier is kept)."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with size, hits, misses, evictions and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._memory),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'disk_tier': self.disk_path is not None
+        }
+    
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    def _digest(self, text: str) -> bytes:
+        return hashlib.sha256(text.encode('utf-8')).digest()
+    
+    def _remember(self, digest: bytes, vector: np.ndarray) -> None:
+        """Insert into the LRU tier, evicting the least recently used entry."""
+        self._memory[digest] = vector
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+    
+    def _load_from_disk(self, digests: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found = {}
+        # Stay well below sqlite's bound-parameter limit
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._db.execute(
+                f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({placeholders})",
+                [self.embedding_model, *chunk]
+            )
+            for digest, blob in rows:
+                found[digest] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+
+class QueryResultCache:
+    """
+    Bounded LRU cache of search results with generation and TTL checks.
+    
+    Every entry records the index generation it was computed at; a lookup
+    with a newer generation treats it as stale, so results are never served
+    across an index change. Entries may also carry a TTL, for results that
+    depend on the current time (relative time filters).
+    
+    Example:
+        >>> cache = QueryResultCache(max_entries=1024)
+        >>> cache.put(key, generation, results, ttl=300)
+        >>> cache.get(key, generation)
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the result cache.
+        
+        Args:
+            max_entries: Maximum cached result lists
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expired = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable, generation: int) -> Optional[List[Any]]:
+        """
+        Look up results computed at the given index generation.
+        
+        Args:
+            key: Normalized query and filter arguments
+            generation: Current index generation
+            
+        Returns:
+            Copy of the cached result list, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+                
+            entry_generation, expires_at, results = entry
+            if entry_generation != generation or (expires_at is not None and time.monotonic() >= expires_at):
+                if entry_generation != generation:
+                    self.stale += 1
+                else:
+                    self.expired += 1
+                del self._entries[key]
+                self.misses += 1
+                return None
+                
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(results)
+    
+    def put(self, key: Hashable, generation: int, results: List[Any], ttl: Optional[float] = None) -> None:
+        """
+        Store results computed at the given index generation.
+        
+        Args:
+            key: Normalized query and filter arguments
+            generation: Index generation the results were computed at
+            results: Ranked results
+            ttl: Seconds the entry stays valid (no expiry if None)
+        """
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (generation, expires_at, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.stale = self.expired = self.evictions = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+        
+        Returns:
+            Dictionary with size, hits, misses (incl. stale/expired) and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,192 @@
+"""
+Passage chunking for the semantic index.
+
+Documents are split into overlapping passages with stable ids. A ChunkTable
+keeps parent/prev/next pointers in compact integer arrays so neighbouring
+passages of a hit can be returned in O(1) per passage.
+"""
+
+from typing import List, Dict, Any, Tuple
+import numpy as np
+
+NO_ROW = -1
+
+
+def split_passages(text: str, chunk_size: int, overlap: int = 0) -> List[Tuple[int, int]]:
+    """
+    Split text into overlapping character spans, preferring word boundaries.
+    
+    Args:
+        text: Text to split
+        chunk_size: Target passage length in characters
+        overlap: Characters shared by consecutive passages
+        
+    Returns:
+        List of (start, end) character offsets
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be in [0, chunk_size)")
+    if len(text) <= chunk_size:
+        return [(0, len(text))]
+        
+    spans = []
+    start = 0
+    while True:
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            # Break at the last space in the second half of the window
+            cut = text.rfind(' ', start + chunk_size // 2, end)
+            if cut > start:
+                end = cut
+        spans.append((start, end))
+        if end >= len(text):
+            return spans
+            
+        next_start = max(end - overlap, start + 1)
+        if overlap:
+            # Start the overlap on a word boundary
+            space = text.find(' ', next_start, end)
+            if space != -1:
+                next_start = space + 1
+        start = next_start
+
+
+def chunk_id(document_id: str, chunk_index: int) -> str:
+    """Stable passage id derived from the parent id and chunk position."""
+    return f"{document_id}#chunk-{chunk_index}"
+
+
+def chunk_document(
+    document: Dict[str, Any],
+    chunk_size: int,
+    overlap: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Split a document into passage rows.
+    
+    Each passage row carries the parent's fields (title, type, created_at,
+    metadata) with ``content`` replaced by the passage text.
+    
+    Args:
+        document: Document dictionary with a 'content' field
+        chunk_size: Target passage length in characters
+        overlap: Characters shared by consecutive passages
+        
+    Returns:
+        Passage rows in document order
+    """
+    content = document.get('content', '')
+    spans = split_passages(content, chunk_size, overlap)
+    parent_id = document.get('id', '')
+    base = {key: value for key, value in document.items() if key != 'content'}
+    
+    return [
+        {
+            **base,
+            'id': chunk_id(parent_id, index),
+            'parent_id': parent_id,
+            'chunk_index': index,
+            'chunk_count': len(spans),
+            'char_start': start,
+            'char_end': end,
+            'content': content[start:end]
+        }
+        for index, (start, end) in enumerate(spans)
+    ]
+
+
+class ChunkTable:
+    """
+    Parent/prev/next pointers for passage rows in compact int arrays.
+    
+    Passages of one document are stored in consecutive rows, so the pointers
+    are filled in as rows are appended.
+    """
+    
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize an empty table.
+        
+        Args:
+            initial_capacity: Rows to pre-allocate
+        """
+        self._size = 0
+        self.parent = np.full(initial_capacity, NO_ROW, dtype=np.int32)
+        self.prev = np.full(initial_capacity, NO_ROW, dtype=np.int64)
+        self.next = np.full(initial_capacity, NO_ROW, dtype=np.int64)
+        self._parent_ids: List[str] = []
+        self._parent_ordinals: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def parent_count(self) -> int:
+        return len(self._parent_ids)
+    
+    def add(self, row_ids: np.ndarray, rows: List[Dict[str, Any]]) -> None:
+        """
+        Record pointers for newly stored rows.
+        
+        Args:
+            row_ids: Row ids assigned to the rows (contiguous, increasing)
+            rows: Row documents (passages or whole documents)
+        """
+        if len(row_ids) == 0:
+            return
+        self._reserve(int(row_ids[-1]) + 1)
+        
+        for row, document in zip(row_ids, rows):
+            parent_id = document.get('parent_id', document.get('id', ''))
+            ordinal = self._parent_ordinals.get(parent_id)
+            if ordinal is None:
+                ordinal = self._parent_ordinals[parent_id] = len(self._parent_ids)
+                self._parent_ids.append(parent_id)
+            self.parent[row] = ordinal
+            
+            chunk_index = document.get('chunk_index', 0)
+            chunk_count = document.get('chunk_count', 1)
+            self.prev[row] = row - 1 if chunk_index > 0 else NO_ROW
+            self.next[row] = row + 1 if chunk_index < chunk_count - 1 else NO_ROW
+            
+        self._size = max(self._size, int(row_ids[-1]) + 1)
+    
+    def parent_id(self, row: int) -> str:
+        """Id of the document a row belongs to."""
+        return self._parent_ids[self.parent[row]]
+    
+    def neighbours(self, row: int, window: int) -> Tuple[List[int], List[int]]:
+        """
+        Rows of the passages around a row.
+        
+        Args:
+            row: Passage row
+            window: Maximum passages on each side
+            
+        Returns:
+            Tuple of (previous rows nearest-last, next rows nearest-first)
+        """
+        previous, following = [], []
+        cursor = self.prev[row]
+        while cursor != NO_ROW and len(previous) < window:
+            previous.append(int(cursor))
+            cursor = self.prev[cursor]
+        cursor = self.next[row]
+        while cursor != NO_ROW and len(following) < window:
+            following.append(int(cursor))
+            cursor = self.next[cursor]
+        return previous[::-1], following
+    
+    def _reserve(self, required: int) -> None:
+        capacity = len(self.parent)
+        if required <= capacity:
+            return
+            
+        capacity = max(required, capacity * 2)
+        for name in ('parent', 'prev', 'next'):
+            current = getattr(self, name)
+            grown = np.full(capacity, NO_ROW, dtype=current.dtype)
+            grown[:len(current)] = current
+            setattr(self, name, grown)
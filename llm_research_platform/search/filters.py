@@ -0,0 +1,181 @@
+"""
+Secondary indexes for pre-filtering semantic search candidates.
+
+Document types are kept as per-type row bitmaps and creation times as a
+row-aligned timestamp array with a sorted view searched by bisection, so a
+filtered query can restrict its candidate rows before any similarity math.
+
+The indexes have a single writer (``add``) and lock-free readers: arrays
+only grow by copy-and-swap, and the sorted view is replaced as a whole, so
+a reader sees every row below the size it read.
+"""
+
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+import numpy as np
+
+# Rows without a creation date always pass time filters
+MISSING_TIMESTAMP = np.inf
+
+# Rows appended past the sorted timestamp view before add() merges them in;
+# readers scan this unsorted tail directly
+SORT_MERGE_ROWS = 4096
+
+
+class FilterIndex:
+    """
+    Type bitmaps and sorted creation timestamps over document rows.
+    
+    Example:
+        >>> filters = FilterIndex()
+        >>> filters.add(np.arange(len(docs)), docs)
+        >>> rows = filters.candidate_rows(["monthly_wrap"], since=cutoff)
+    """
+    
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize empty indexes.
+        
+        Args:
+            initial_capacity: Rows to pre-allocate
+        """
+        self._capacity = max(1, initial_capacity)
+        self._size = 0
+        self._type_bitmaps: Dict[str, np.ndarray] = {}
+        self._timestamps = np.empty(self._capacity, dtype=np.float64)
+        # (rows, timestamps) of the first len(rows) rows ordered by time
+        self._sorted = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, row_ids: np.ndarray, documents: List[Dict[str, Any]]) -> None:
+        """
+        Index the type and creation time of newly stored rows.
+        
+        Args:
+            row_ids: Row ids assigned to the documents (contiguous, increasing)
+            documents: Documents aligned with row_ids
+        """
+        if len(row_ids) == 0:
+            return
+            
+        end = int(row_ids[-1]) + 1
+        self._reserve(end)
+        
+        for row, document in zip(row_ids, documents):
+            doc_type = document.get('type', 'unknown')
+            bitmap = self._type_bitmaps.get(doc_type)
+            if bitmap is None:
+                bitmap = self._type_bitmaps[doc_type] = np.zeros(self._capacity, dtype=bool)
+            bitmap[row] = True
+            self._timestamps[row] = to_timestamp(document.get('created_at'))
+            
+        self._size = max(self._size, end)
+        if self._size - len(self._sorted[0]) >= SORT_MERGE_ROWS:
+            self._sort_timestamps()
+    
+    def candidate_rows(
+        self,
+        document_types: Optional[List[str]] = None,
+        since: Optional[datetime] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Rows matching the type and time restrictions.
+        
+        Args:
+            document_types: Allowed document types (any if None/empty)
+            since: Earliest creation time (any if None)
+            
+        Returns:
+            Sorted row ids, or None when no restriction applies
+        """
+        if not document_types and since is None:
+            return None
+            
+        size = self._size  # Read once: a concurrent add() may grow it
+        mask = None
+        if document_types:
+            mask = np.zeros(size, dtype=bool)
+            for doc_type in document_types:
+                bitmap = self._type_bitmaps.get(doc_type)
+                if bitmap is not None:
+                    mask |= bitmap[:size]
+                    
+        if since is None:
+            return np.flatnonzero(mask)
+            
+        # Rows created at or after the cutoff form a suffix of the sorted view;
+        # rows appended since the last merge are checked one by one
+        cutoff = since.timestamp()
+        sorted_rows, sorted_timestamps = self._sorted
+        recent = sorted_rows[np.searchsorted(sorted_timestamps, cutoff, side='left'):]
+        if len(sorted_rows) < size:
+            tail = np.arange(len(sorted_rows), size)
+            recent = np.concatenate([recent, tail[self._timestamps[len(sorted_rows):size] >= cutoff]])
+        else:
+            recent = recent[recent < size]
+        if mask is not None:
+            recent = recent[mask[recent]]
+        return np.sort(recent)
+    
+    def type_counts(self) -> Dict[str, int]:
+        """Count indexed rows per document type."""
+        size = self._size
+        return {
+            doc_type: int(np.count_nonzero(bitmap[:size]))
+            for doc_type, bitmap in list(self._type_bitmaps.items())
+        }
+    
+    def _sort_timestamps(self) -> None:
+        """Merge rows appended since the last merge into the sorted timestamp view (writer only)."""
+        sorted_rows, sorted_timestamps = self._sorted
+        if len(sorted_rows) == self._size:
+            return
+            
+        # Sort only the new rows, then merge them in with one O(n) insert;
+        # ties go after existing rows, matching a stable sort by row id
+        new_rows = np.arange(len(sorted_rows), self._size)
+        new_timestamps = self._timestamps[len(sorted_rows):self._size]
+        order = np.argsort(new_timestamps, kind='stable')
+        new_rows, new_timestamps = new_rows[order], new_timestamps[order]
+        positions = np.searchsorted(sorted_timestamps, new_timestamps, side='right')
+        # Swapped in as one tuple so readers never pair rows with the wrong timestamps
+        self._sorted = (
+            np.insert(sorted_rows, positions, new_rows),
+            np.insert(sorted_timestamps, positions, new_timestamps)
+        )
+    
+    def _reserve(self, required: int) -> None:
+        if required <= self._capacity:
+            return
+            
+        capacity = max(required, self._capacity * 2)
+        timestamps = np.empty(capacity, dtype=np.float64)
+        timestamps[:self._size] = self._timestamps[:self._size]
+        self._timestamps = timestamps
+        for doc_type, bitmap in self._type_bitmaps.items():
+            grown = np.zeros(capacity, dtype=bool)
+            grown[:self._capacity] = bitmap
+            self._type_bitmaps[doc_type] = grown
+        self._capacity = capacity
+
+
+def to_timestamp(value: Any) -> float:
+    """
+    Convert a document date to POSIX seconds for the time index.
+    
+    Args:
+        value: datetime, ISO string or None
+        
+    Returns:
+        Timestamp in seconds (MISSING_TIMESTAMP when absent or unparseable)
+    """
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return MISSING_TIMESTAMP
+    return MISSING_TIMESTAMP
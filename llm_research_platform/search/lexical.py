@@ -0,0 +1,324 @@
+"""
+BM25 lexical index and rank fusion for hybrid semantic search.
+
+Postings are append-only (row ids only grow), so each postings list is
+stored as delta-encoded blocks packed into the narrowest unsigned integer
+type that fits, and decoded with a vectorized cumulative sum.
+
+The index has a single writer and lock-free readers; a search only scores
+rows below the size it read, so rows being appended are ignored.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from array import array
+import math
+import re
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+BLOCK_SIZE = 128
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+    
+    Keeps tickers, protocol names and hex contract addresses as single tokens.
+    
+    Args:
+        text: Text to tokenize
+        
+    Returns:
+        List of tokens
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _narrowest_uint(max_value: int) -> type:
+    if max_value < 2 ** 8:
+        return np.uint8
+    if max_value < 2 ** 16:
+        return np.uint16
+    return np.uint32
+
+
+class PostingsList:
+    """
+    Compressed postings list of (row id, term frequency) pairs.
+    
+    Recent postings accumulate in a small uncompressed tail; every
+    BLOCK_SIZE postings are frozen into a block of delta-encoded row ids and
+    term frequencies, each packed into uint8/uint16/uint32.
+    """
+    
+    __slots__ = ('_blocks', '_tail_rows', '_tail_tfs', '_last_row', '_frozen_last', 'count')
+    
+    def __init__(self):
+        self._blocks: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        self._tail_rows = array('q')
+        self._tail_tfs = array('I')
+        self._last_row = -1
+        self._frozen_last = 0  # Last row id of the newest frozen block
+        self.count = 0
+    
+    def append(self, row: int, term_frequency: int) -> None:
+        """
+        Append a posting (rows must be appended in increasing order).
+        
+        Args:
+            row: Row id containing the term
+            term_frequency: Occurrences of the term in the row
+        """
+        if row <= self._last_row:
+            raise ValueError("Postings must be appended in increasing row order")
+            
+        self._tail_rows.append(row)
+        self._tail_tfs.append(term_frequency)
+        self._last_row = row
+        self.count += 1
+        if len(self._tail_rows) >= BLOCK_SIZE:
+            self._freeze_tail()
+    
+    def decode(self, row_limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decode all postings, or those of rows below row_limit.
+        
+        Safe against a concurrent append: the tail is read before the
+        blocks, so a tail frozen in between is found in both and its copy in
+        the tail is dropped.
+        
+        Returns:
+            Tuple of (row ids, term frequencies) arrays
+        """
+        tail_rows = np.array(self._tail_rows, dtype=np.int64)
+        tail_tfs = np.array(self._tail_tfs, dtype=np.uint32)
+        length = min(len(tail_rows), len(tail_tfs))  # The writer appends rows first
+        
+        rows, tfs = [], []
+        for base, deltas, block_tfs in list(self._blocks):
+            rows.append(base + np.cumsum(deltas, dtype=np.int64))
+            tfs.append(block_tfs)
+        if length:
+            keep = tail_rows[:length] > rows[-1][-1] if rows else slice(length)
+            rows.append(tail_rows[:length][keep])
+            tfs.append(tail_tfs[:length][keep])
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        rows, tfs = np.concatenate(rows), np.concatenate(tfs).astype(np.float32)
+        if row_limit is not None:
+            end = np.searchsorted(rows, row_limit)
+            rows, tfs = rows[:end], tfs[:end]
+        return rows, tfs
+    
+    @property
+    def nbytes(self) -> int:
+        frozen = sum(deltas.nbytes + block_tfs.nbytes + 8 for _, deltas, block_tfs in self._blocks)
+        return frozen + len(self._tail_rows) * 12
+    
+    def _freeze_tail(self) -> None:
+        rows = np.array(self._tail_rows, dtype=np.int64)
+        tfs = np.array(self._tail_tfs, dtype=np.uint32)
+        # Deltas are relative to the last row of the previous block
+        deltas = np.diff(rows, prepend=self._frozen_last)
+        self._blocks.append((
+            self._frozen_last,
+            deltas.astype(_narrowest_uint(int(deltas.max()))),
+            tfs.astype(_narrowest_uint(int(tfs.max())))
+        ))
+        self._frozen_last = int(rows[-1])
+        self._tail_rows = array('q')
+        self._tail_tfs = array('I')
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring over stored rows.
+    
+    Example:
+        >>> lexical = BM25Index()
+        >>> lexical.add(np.arange(len(docs)), docs)
+        >>> rows, scores = lexical.search("uniswap v3 0x1f98431c", k=1000)
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75, fields: Tuple[str, ...] = ('title', 'content')):
+        """
+        Initialize an empty index.
+        
+        Args:
+            k1: Term-frequency saturation parameter
+            b: Document-length normalization parameter
+            fields: Document fields that are tokenized
+        """
+        self.k1 = k1
+        self.b = b
+        self.fields = fields
+        self._postings: Dict[str, PostingsList] = {}
+        self._lengths = np.zeros(1024, dtype=np.uint32)  # Token count per row
+        self._size = 0
+        self._total_length = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pack the postings tails into flat arrays: pickling one small array
+        # per term dominates the load time of a saved index otherwise
+        state = self.__dict__.copy()
+        postings = list(self._postings.values())
+        state['_postings'] = (
+            list(self._postings),
+            [p._blocks for p in postings],
+            np.array([(p._last_row, p._frozen_last, p.count, len(p._tail_rows)) for p in postings], dtype=np.int64),
+            b''.join(p._tail_rows.tobytes() for p in postings),
+            b''.join(p._tail_tfs.tobytes() for p in postings)
+        )
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        terms, blocks, counters, tail_rows, tail_tfs = state['_postings']
+        tail_ends = np.cumsum(counters[:, 3]).tolist() if len(terms) else []
+        postings = {}
+        start = 0
+        for term, term_blocks, (last_row, frozen_last, count, _), end in zip(terms, blocks, counters.tolist(), tail_ends):
+            p = PostingsList.__new__(PostingsList)
+            p._blocks = term_blocks
+            p._tail_rows = array('q', tail_rows[8 * start:8 * end])
+            p._tail_tfs = array('I', tail_tfs[4 * start:4 * end])
+            p._last_row = last_row
+            p._frozen_last = frozen_last
+            p.count = count
+            postings[term] = p
+            start = end
+        state['_postings'] = postings
+        self.__dict__.update(state)
+    
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(p.nbytes for p in self._postings.values()) + self._size * 4
+    
+    def add(self, row_ids: np.ndarray, documents: List[Dict[str, Any]]) -> None:
+        """
+        Index newly stored rows.
+        
+        Args:
+            row_ids: Row ids assigned to the documents (contiguous, increasing);
+                rows already indexed are skipped
+            documents: Documents aligned with row_ids
+        """
+        for row, document in zip(row_ids, documents):
+            row = int(row)
+            if row < self._size:
+                continue
+            tokens = []
+            for field in self.fields:
+                value = document.get(field)
+                if isinstance(value, str):
+                    tokens.extend(tokenize(value))
+                    
+            if row >= len(self._lengths):
+                grown = np.zeros(max(row + 1, 2 * len(self._lengths)), dtype=np.uint32)
+                grown[:self._size] = self._lengths[:self._size]
+                self._lengths = grown
+            self._lengths[row] = len(tokens)
+            self._size = max(self._size, row + 1)
+            self._total_length += len(tokens)
+            
+            frequencies: Dict[str, int] = {}
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + 1
+            for token, frequency in frequencies.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = PostingsList()
+                postings.append(row, frequency)
+    
+    def search(
+        self,
+        query: str,
+        k: int = 1000,
+        candidates: Optional[np.ndarray] = None,
+        row_limit: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score rows containing query terms with BM25.
+        
+        Args:
+            query: Query text
+            k: Maximum number of rows returned
+            candidates: Sorted row ids allowed by filters (all rows if None)
+            row_limit: Only score rows below this id (all indexed rows if None)
+            
+        Returns:
+            Tuple of (row ids, BM25 scores) sorted by descending score
+        """
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self._postings]
+        if not terms or not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            
+        # Size before lengths: the lengths array is grown before the size is
+        doc_count = self._size if row_limit is None else min(row_limit, self._size)
+        avg_length = self._total_length / self._size if self._size else 1.0
+        lengths = self._lengths
+        
+        row_parts, score_parts = [], []
+        for term in terms:
+            rows, tfs = self._postings[term].decode(doc_count)
+            idf = math.log(1 + (doc_count - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[rows] / max(avg_length, 1e-9))
+            row_parts.append(rows)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+            
+        rows = np.concatenate(row_parts)
+        scores = np.concatenate(score_parts)
+        
+        if candidates is not None:
+            position = np.minimum(np.searchsorted(candidates, rows), max(len(candidates) - 1, 0))
+            keep = candidates[position] == rows if len(candidates) else np.zeros(len(rows), dtype=bool)
+            rows, scores = rows[keep], scores[keep]
+            
+        # Sum per-term contributions per row
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores).astype(np.float32)
+        
+        if len(totals) > k:
+            top = np.argpartition(-totals, k - 1)[:k]
+        else:
+            top = np.arange(len(totals))
+        top = top[np.argsort(-totals[top], kind='stable')]
+        return unique_rows[top], totals[top]
+
+
+def reciprocal_rank_fusion(
+    rankings: List[np.ndarray],
+    k: int = 60,
+    weights: Optional[List[float]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuse ranked row-id lists with reciprocal rank fusion.
+    
+    Args:
+        rankings: Row-id arrays, each ordered best first
+        k: RRF rank constant
+        weights: Optional weight per ranking
+        
+    Returns:
+        Tuple of (row ids, fused scores) sorted by descending score
+    """
+    weights = weights or [1.0] * len(rankings)
+    rows = [np.asarray(ranking, dtype=np.int64) for ranking in rankings]
+    contributions = [
+        weight / (k + np.arange(1, len(ranking) + 1, dtype=np.float64))
+        for ranking, weight in zip(rows, weights)
+    ]
+    if not rows or not sum(len(r) for r in rows):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        
+    unique_rows, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+    fused = np.bincount(inverse, weights=np.concatenate(contributions))
+    order = np.argsort(-fused, kind='stable')
+    return unique_rows[order], fused[order]
@@ -0,0 +1,149 @@
+"""
+Contiguous embedding matrix for vectorized similarity scoring.
+
+Keeps every indexed embedding as an L2-normalized float32 row in a single
+growable array so that cosine similarity against the whole corpus is one
+matrix-vector product.
+"""
+
+from typing import Optional
+import numpy as np
+
+
+class EmbeddingMatrix:
+    """
+    Growable, pre-normalized float32 embedding matrix.
+    
+    Rows are normalized on insert, so the dot product of a normalized query
+    with the matrix yields cosine similarities directly. Capacity grows
+    geometrically to keep appends amortized O(1).
+    
+    Example:
+        >>> matrix = EmbeddingMatrix()
+        >>> matrix.append(np.random.rand(3, 1536))
+        >>> scores = matrix.scores(np.random.rand(1536))
+    """
+    
+    def __init__(self, dimension: Optional[int] = None, initial_capacity: int = 1024):
+        """
+        Initialize the embedding matrix.
+        
+        Args:
+            dimension: Embedding dimension (inferred from the first append if None)
+            initial_capacity: Number of rows to pre-allocate
+        """
+        self.dimension = dimension
+        self.initial_capacity = max(1, initial_capacity)
+        self._data = np.empty((0, dimension or 0), dtype=np.float32)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __getitem__(self, index):
+        return self.vectors[index]
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the populated rows (no copy)."""
+        return self._data[:self._size]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the populated rows."""
+        return self.vectors.nbytes
+    
+    @property
+    def resident_nbytes(self) -> int:
+        """Bytes of the populated rows held in process memory."""
+        return self.nbytes
+    
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Normalize and append one or more embeddings.
+        
+        Args:
+            vectors: Single vector of shape (d,) or batch of shape (n, d)
+            
+        Returns:
+            Row ids assigned to the appended vectors
+        """
+        batch = normalize_rows(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        if self.dimension is None:
+            self.dimension = batch.shape[1]
+        elif batch.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension mismatch: expected {self.dimension}, got {batch.shape[1]}"
+            )
+            
+        start = self._size
+        self._reserve(start + len(batch))
+        self._data[start:start + len(batch)] = batch
+        self._size += len(batch)
+        return np.arange(start, self._size)
+    
+    def scores(self, query_embedding: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cosine similarity of a query against every row, or a subset of rows.
+        
+        Args:
+            query_embedding: Query vector (normalized here)
+            rows: Row ids to score (all rows if None)
+            
+        Returns:
+            Array of similarity scores, one per (selected) row
+        """
+        if self._size == 0 or (rows is not None and len(rows) == 0):
+            return np.empty(0, dtype=np.float32)
+        
+        query = normalize_vector(query_embedding)
+        if rows is None:
+            return self.vectors @ query
+        
+        # Gathering is only cheaper than a full scan for selective subsets
+        if len(rows) * 4 < self._size:
+            return self.vectors[rows] @ query
+        return (self.vectors @ query)[rows]
+    
+    def _reserve(self, required: int) -> None:
+        """Grow the backing array to hold at least ``required`` rows."""
+        capacity = len(self._data)
+        if required <= capacity:
+            return
+            
+        new_capacity = max(required, capacity * 2, self.initial_capacity)
+        grown = np.empty((new_capacity, self.dimension), dtype=np.float32)
+        if self._size:
+            grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+
+def normalize_vector(vector: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize a single vector as float32.
+    
+    Args:
+        vector: Input vector
+        
+    Returns:
+        Unit-length float32 vector (zero vectors are returned unchanged)
+    """
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize each row of a 2-D array as float32.
+    
+    Args:
+        vectors: Array of shape (n, d)
+        
+    Returns:
+        Row-normalized float32 array (zero rows are left as zeros)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -0,0 +1,253 @@
+"""
+Vector quantizers for compressed embedding indexes.
+
+- ScalarQuantizer: 8 bits per dimension (4x smaller than float32)
+- ProductQuantizer: ``m`` sub-vectors encoded with trained codebooks,
+  ``m`` bytes per vector (e.g. 1536-d with m=96 is 64x smaller)
+
+Both score with asymmetric distance computation (ADC): the float query is
+compared directly against the codes, without decoding the database.
+"""
+
+from typing import Optional
+import numpy as np
+
+# Code rows decoded per scoring step; small enough for the float temporaries
+# to stay in cache
+SCORE_CHUNK_ROWS = 256
+
+
+class ScalarQuantizer:
+    """
+    Per-dimension 8-bit scalar quantizer.
+    
+    Each dimension is mapped linearly from its trained [min, max] range onto
+    0..255. Inner products are computed as ``q . min + (q * scale) . codes``.
+    """
+    
+    def __init__(self):
+        self.offset: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.offset is not None
+    
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return len(self.offset) if self.is_trained else 0
+    
+    @property
+    def nbytes(self) -> int:
+        return self.offset.nbytes + self.scale.nbytes if self.is_trained else 0
+    
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Learn the per-dimension value ranges.
+        
+        Args:
+            vectors: Training sample of shape (n, d)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.offset = vectors.min(axis=0)
+        scale = (vectors.max(axis=0) - self.offset) / 255.0
+        scale[scale == 0] = 1.0
+        self.scale = scale.astype(np.float32)
+    
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Encode vectors as uint8 codes of shape (n, d).
+        
+        Values outside the trained range are clipped.
+        """
+        codes = np.rint((np.asarray(vectors, dtype=np.float32) - self.offset) / self.scale)
+        return np.clip(codes, 0, 255).astype(np.uint8)
+    
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstruct approximate float32 vectors from codes."""
+        return codes.astype(np.float32) * self.scale + self.offset
+    
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Asymmetric inner products of a float query against codes.
+        
+        Args:
+            query: Query vector of shape (d,)
+            codes: Codes of shape (n, d)
+            
+        Returns:
+            Approximate inner products, one per code row
+        """
+        weights = (query * self.scale).astype(np.float32)
+        bias = float(query @ self.offset)
+        result = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_CHUNK_ROWS):
+            chunk = codes[start:start + SCORE_CHUNK_ROWS]
+            result[start:start + len(chunk)] = chunk.astype(np.float32) @ weights
+        return result + bias
+
+
+class ProductQuantizer:
+    """
+    Product quantizer with per-subspace k-means codebooks.
+    
+    Vectors are split into ``m`` contiguous sub-vectors; each is replaced by
+    the id of its nearest centroid among ``2 ** nbits``. A query is scored by
+    building an (m, 2 ** nbits) table of sub-vector inner products once and
+    summing table entries selected by the codes.
+    
+    Example:
+        >>> pq = ProductQuantizer(m=96)
+        >>> pq.train(sample)
+        >>> codes = pq.encode(vectors)
+        >>> scores = pq.scores(query, codes)
+    """
+    
+    def __init__(self, m: int = 96, nbits: int = 8, iterations: int = 10, seed: int = 42):
+        """
+        Initialize the product quantizer.
+        
+        Args:
+            m: Number of sub-vectors (must divide the dimension)
+            nbits: Bits per sub-vector code (at most 8)
+            iterations: Lloyd iterations per codebook
+            seed: Random seed for centroid initialization
+        """
+        if not 1 <= nbits <= 8:
+            raise ValueError("nbits must be between 1 and 8")
+        self.m = m
+        self.nbits = nbits
+        self.ksub = 2 ** nbits
+        self.iterations = iterations
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None  # (m, ksub, dsub)
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+    
+    @property
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+        return self.m
+    
+    @property
+    def nbytes(self) -> int:
+        return self.codebooks.nbytes if self.is_trained else 0
+    
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Train one codebook per subspace.
+        
+        Args:
+            vectors: Training sample of shape (n, d), n >= 2 ** nbits
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dimension = vectors.shape[1]
+        if dimension % self.m:
+            raise ValueError(f"Dimension {dimension} is not divisible by m={self.m}")
+            
+        dsub = dimension // self.m
+        self.codebooks = np.stack([
+            kmeans(vectors[:, j * dsub:(j + 1) * dsub], self.ksub, self.iterations, self.seed + j)
+            for j in range(self.m)
+        ])
+    
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Encode vectors as uint8 codes of shape (n, m)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dsub = self.codebooks.shape[2]
+        codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = nearest_centroids(vectors[:, j * dsub:(j + 1) * dsub], self.codebooks[j])
+        return codes
+    
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstruct approximate float32 vectors from codes."""
+        parts = [self.codebooks[j][codes[:, j]] for j in range(self.m)]
+        return np.concatenate(parts, axis=1)
+    
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Asymmetric inner products of a float query against codes.
+        
+        Args:
+            query: Query vector of shape (d,)
+            codes: Codes of shape (n, m)
+            
+        Returns:
+            Approximate inner products, one per code row
+        """
+        # Inner product of each query sub-vector with every centroid, flattened
+        # so code j of a row indexes table[j * ksub + code]
+        table = np.einsum('jkd,jd->jk', self.codebooks, query.reshape(self.m, -1).astype(np.float32)).ravel()
+        offsets = np.arange(self.m, dtype=np.int64) * self.ksub
+        result = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_CHUNK_ROWS):
+            chunk = codes[start:start + SCORE_CHUNK_ROWS]
+            result[start:start + len(chunk)] = np.take(table, chunk + offsets).sum(axis=1)
+        return result
+
+
+def nearest_centroids(
+    vectors: np.ndarray,
+    centroids: np.ndarray,
+    chunk_size: int = 65536
+) -> np.ndarray:
+    """
+    Index of the nearest (L2) centroid for each vector.
+    
+    Args:
+        vectors: Array of shape (n, d)
+        centroids: Array of shape (k, d)
+        chunk_size: Rows compared per chunk to bound memory
+        
+    Returns:
+        Array of centroid indices, one per vector
+    """
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 does not change the argmin
+    squared_norms = (centroids ** 2).sum(axis=1)
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        chunk = vectors[start:start + chunk_size]
+        assignments[start:start + chunk_size] = np.argmin(squared_norms - 2 * (chunk @ centroids.T), axis=1)
+    return assignments
+
+
+def kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 42) -> np.ndarray:
+    """
+    Cluster vectors with Euclidean k-means (Lloyd's algorithm).
+    
+    Args:
+        vectors: Array of shape (n, d)
+        n_clusters: Number of centroids
+        iterations: Lloyd iterations
+        seed: Random seed
+        
+    Returns:
+        Centroids of shape (n_clusters, d)
+    """
+    if len(vectors) < n_clusters:
+        raise ValueError(f"Need at least {n_clusters} vectors to train, got {len(vectors)}")
+        
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    
+    for _ in range(iterations):
+        assignments = nearest_centroids(vectors, centroids)
+        order = np.argsort(assignments, kind='stable')
+        clusters, starts = np.unique(assignments[order], return_index=True)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        sums[clusters] = np.add.reduceat(vectors[order], starts, axis=0)
+        
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        
+        # Re-seed empty clusters with random vectors
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+            
+    return centroids
@@ -0,0 +1,178 @@
+"""
+Multi-process sharded exact search over shared-memory embedding shards.
+
+The embedding rows are split into contiguous shards, each copied once into
+a ``multiprocessing.shared_memory`` block and scanned by its own worker
+process. The coordinator sends a query to every worker, each returns its
+local top-k, and the per-shard results are merged into the global top-k.
+"""
+
+from typing import List, Optional, Tuple
+from multiprocessing import shared_memory
+import multiprocessing
+import threading
+import weakref
+import numpy as np
+
+from .ann import top_k_indices
+from .matrix import EmbeddingMatrix, normalize_vector
+
+
+class ShardedSearchPool:
+    """
+    Pool of worker processes, each scanning one shard of the embedding rows.
+    
+    The pool covers the first ``len(pool)`` rows of the matrix it was built
+    from; callers score rows appended later themselves (or rebuild the pool).
+    
+    Example:
+        >>> pool = ShardedSearchPool(agent.embeddings, num_shards=8)
+        >>> ids, scores = pool.search(query_embedding, k=10)
+        >>> pool.close()
+    """
+    
+    def __init__(
+        self,
+        matrix: EmbeddingMatrix,
+        num_shards: int,
+        start_method: Optional[str] = None
+    ):
+        """
+        Copy the rows into shared memory and start one worker per shard.
+        
+        Args:
+            matrix: Normalized embedding rows to shard
+            num_shards: Number of shards / worker processes
+            start_method: multiprocessing start method (platform default if None)
+        """
+        self.matrix = matrix
+        self.size = len(matrix)
+        self.dimension = matrix.dimension
+        self.num_shards = max(1, min(num_shards, self.size))
+        self.bounds = np.linspace(0, self.size, self.num_shards + 1).astype(np.int64)
+        self._lock = threading.Lock()  # One fan-out/gather at a time per pipe
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self._connections = []
+        self._workers = []
+        
+        context = multiprocessing.get_context(start_method)
+        try:
+            for shard in range(self.num_shards):
+                start, end = int(self.bounds[shard]), int(self.bounds[shard + 1])
+                block = shared_memory.SharedMemory(create=True, size=max(1, (end - start) * self.dimension * 4))
+                self._blocks.append(block)
+                shard_view = np.ndarray((end - start, self.dimension), dtype=np.float32, buffer=block.buf)
+                shard_view[:] = matrix.vectors[start:end]
+                del shard_view
+                
+                parent, child = context.Pipe()
+                worker = context.Process(
+                    target=_shard_worker,
+                    args=(block.name, start, end - start, self.dimension, child),
+                    name=f"search-shard-{shard}",
+                    daemon=True
+                )
+                worker.start()
+                child.close()
+                self._connections.append(parent)
+                self._workers.append(worker)
+        except Exception:
+            _shutdown(self._connections, self._workers, self._blocks)
+            raise
+            
+        self._finalizer = weakref.finalize(self, _shutdown, self._connections, self._workers, self._blocks)
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        candidates: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k over the pooled rows, scanned in parallel.
+        
+        Args:
+            query_embedding: Query vector
+            k: Number of results
+            candidates: Sorted row ids to restrict the scan to (all if None)
+            
+        Returns:
+            Tuple of (row ids, scores) sorted by descending score
+        """
+        query = normalize_vector(query_embedding)
+        if candidates is not None:
+            # Each shard receives only the candidates inside its row range
+            cuts = np.searchsorted(candidates, self.bounds)
+            
+        with self._lock:
+            for shard, connection in enumerate(self._connections):
+                shard_candidates = None
+                if candidates is not None:
+                    shard_candidates = candidates[cuts[shard]:cuts[shard + 1]]
+                connection.send((query, k, shard_candidates))
+            results = [connection.recv() for connection in self._connections]
+            
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+                
+        # Merge the per-shard top-k lists into the global top-k
+        ids = np.concatenate([shard_ids for shard_ids, _ in results])
+        scores = np.concatenate([shard_scores for _, shard_scores in results])
+        top = top_k_indices(scores, k)
+        return ids[top], scores[top]
+    
+    def close(self) -> None:
+        """Stop the workers and release the shared memory."""
+        with self._lock:
+            self._finalizer()
+
+
+def _shard_worker(name: str, start: int, rows: int, dimension: int, connection) -> None:
+    """Serve top-k requests against one shared-memory shard until told to stop."""
+    block = shared_memory.SharedMemory(name=name)
+    vectors = np.ndarray((rows, dimension), dtype=np.float32, buffer=block.buf)
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+                
+            query, k, candidates = message
+            try:
+                if candidates is None:
+                    scores = vectors @ query
+                    top = top_k_indices(scores, k)
+                    connection.send((top + start, scores[top]))
+                else:
+                    scores = vectors[candidates - start] @ query
+                    top = top_k_indices(scores, k)
+                    connection.send((candidates[top], scores[top]))
+            except Exception as exc:
+                # Hand the failure to the coordinator instead of hanging it
+                connection.send(exc)
+    finally:
+        del vectors
+        block.close()
+
+
+def _shutdown(connections, workers, blocks) -> None:
+    for connection in connections:
+        try:
+            connection.send(None)
+            connection.close()
+        except OSError:
+            pass
+    for worker in workers:
+        worker.join(timeout=5)
+        if worker.is_alive():
+            worker.terminate()
+    for block in blocks:
+        block.close()
+        block.unlink()
@@ -0,0 +1,143 @@
+"""
+Incrementally maintained corpus statistics for the semantic index.
+
+Per-type document counts and the created_at range are updated as documents
+are indexed, replaced and deleted, so reading them does not scan the corpus.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import heapq
+import numpy as np
+
+from .filters import MISSING_TIMESTAMP, to_timestamp
+
+
+class CorpusStatistics:
+    """
+    Running per-type counts and min/max created_at over live documents.
+    
+    Only the first row of each document (``chunk_index`` 0) is counted.
+    The date range uses min/max heaps with lazy deletion: entries of
+    replaced or deleted documents are discarded when they reach the top.
+    
+    Example:
+        >>> stats = CorpusStatistics()
+        >>> stats.add(np.arange(len(docs)), docs)
+        >>> stats.remove("doc_001")
+        >>> stats.date_range()
+    """
+    
+    def __init__(self):
+        self.type_counts: Dict[str, int] = {}
+        self._documents: Dict[str, Tuple[str, float, Any]] = {}  # id -> (type, timestamp, created_at)
+        self._min_heap: List[Tuple[float, str]] = []
+        self._max_heap: List[Tuple[float, str]] = []
+        # Documents without an id can never be removed; track their extremes directly
+        self._anonymous_min: Optional[Tuple[float, Any]] = None
+        self._anonymous_max: Optional[Tuple[float, Any]] = None
+        self._rows = 0
+    
+    def __len__(self) -> int:
+        return self._rows
+    
+    def add(self, row_ids: np.ndarray, documents: List[Dict[str, Any]]) -> None:
+        """
+        Count newly stored rows; a known id replaces the previous version.
+        
+        Args:
+            row_ids: Row ids assigned to the rows (contiguous, increasing)
+            documents: Row documents (passages or whole documents)
+        """
+        for document in documents:
+            if document.get('chunk_index', 0) != 0:
+                continue
+                
+            doc_type = document.get('type', 'unknown')
+            created_at = document.get('created_at')
+            timestamp = to_timestamp(created_at)
+            self.type_counts[doc_type] = self.type_counts.get(doc_type, 0) + 1
+            
+            document_id = document.get('parent_id', document.get('id')) or None
+            if document_id is None:
+                if timestamp != MISSING_TIMESTAMP:
+                    if self._anonymous_min is None or timestamp < self._anonymous_min[0]:
+                        self._anonymous_min = (timestamp, created_at)
+                    if self._anonymous_max is None or timestamp > self._anonymous_max[0]:
+                        self._anonymous_max = (timestamp, created_at)
+                continue
+                
+            previous = self._documents.get(document_id)
+            self.remove(document_id)
+            self._documents[document_id] = (doc_type, timestamp, created_at)
+            # A replacement with the same date is still covered by the old heap entries
+            if timestamp != MISSING_TIMESTAMP and (previous is None or previous[1] != timestamp):
+                heapq.heappush(self._min_heap, (timestamp, document_id))
+                heapq.heappush(self._max_heap, (-timestamp, document_id))
+                
+        if len(row_ids):
+            self._rows = max(self._rows, int(row_ids[-1]) + 1)
+        if len(self._min_heap) > 2 * len(self._documents) + 1024:
+            self._rebuild_heaps()
+    
+    def remove(self, document_id: str) -> bool:
+        """
+        Stop counting a document.
+        
+        Args:
+            document_id: Id of the replaced or deleted document
+            
+        Returns:
+            True if the document was counted
+        """
+        entry = self._documents.pop(document_id, None)
+        if entry is None:
+            return False
+            
+        doc_type = entry[0]
+        self.type_counts[doc_type] -= 1
+        if not self.type_counts[doc_type]:
+            del self.type_counts[doc_type]
+        return True
+    
+    def date_range(self) -> Dict[str, Any]:
+        """
+        Earliest and latest created_at of live documents.
+        
+        Returns:
+            Dictionary with 'earliest' and 'latest' (None without dated documents)
+        """
+        earliest = self._heap_top(self._min_heap, 1)
+        latest = self._heap_top(self._max_heap, -1)
+        
+        if self._anonymous_min is not None:
+            if earliest is None or self._anonymous_min[0] < earliest[0]:
+                earliest = self._anonymous_min
+            if latest is None or self._anonymous_max[0] > latest[0]:
+                latest = self._anonymous_max
+                
+        return {
+            'earliest': earliest[1] if earliest else None,
+            'latest': latest[1] if latest else None
+        }
+    
+    def _rebuild_heaps(self) -> None:
+        """Drop stale heap entries left by replaced and deleted documents."""
+        dated = [
+            (timestamp, document_id)
+            for document_id, (_, timestamp, _) in self._documents.items()
+            if timestamp != MISSING_TIMESTAMP
+        ]
+        self._min_heap = dated
+        self._max_heap = [(-timestamp, document_id) for timestamp, document_id in dated]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+    
+    def _heap_top(self, heap: List[Tuple[float, str]], sign: int) -> Optional[Tuple[float, Any]]:
+        """Top live entry of a heap as (timestamp, created_at), dropping stale entries."""
+        while heap:
+            key, document_id = heap[0]
+            entry = self._documents.get(document_id)
+            if entry is not None and entry[1] == sign * key:
+                return entry[1], entry[2]
+            heapq.heappop(heap)
+        return None
@@ -0,0 +1,516 @@
+"""
+Persistent, memory-mapped embedding store for the semantic index.
+
+Layout under the store directory:
+- meta.json: dimension, embedding model, format version and generation
+- embeddings.f32: append-only raw float32 segment of normalized rows
+- documents.jsonl: one JSON document per line (the metadata sidecar)
+- documents.idx: raw int64 byte offsets into documents.jsonl
+- tombstones.idx: raw int64 ids of deleted rows
+- indexes.pkl: optional snapshot of the secondary (filter, chunk, row map,
+  statistics and BM25) indexes over a prefix of the rows
+
+Embeddings are opened with ``np.memmap`` so that every worker process
+reading the same store shares one copy of the pages through the OS page
+cache and starts without re-embedding the corpus. A store has a single
+writer; readers pick up appended rows with ``refresh()``.
+
+Compaction writes the live rows to a new generation of these files (e.g.
+``embeddings.1.f32``) and switches to it by rewriting meta.json, so a
+crash mid-compaction leaves the previous generation intact.
+"""
+
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+import json
+import os
+import pickle
+import numpy as np
+
+from .matrix import EmbeddingMatrix, normalize_rows
+
+FORMAT_VERSION = 1
+
+# Layout version of the pickled index snapshot (older snapshots are rebuilt)
+INDEXES_FORMAT_VERSION = 2
+
+# Rows copied per write when compacting embeddings
+COMPACTION_CHUNK_ROWS = 65536
+
+GENERATION_FILES = ('embeddings.f32', 'documents.jsonl', 'documents.idx', 'tombstones.idx', 'indexes.pkl')
+
+
+class MemmapEmbeddingMatrix(EmbeddingMatrix):
+    """
+    EmbeddingMatrix backed by an append-only raw float32 file.
+    
+    Appends are written to the end of the file and the read-only memory map
+    is re-opened over the grown file; existing pages stay shared.
+    """
+    
+    def __init__(self, path: str, dimension: Optional[int] = None, max_rows: Optional[int] = None):
+        """
+        Open (or create) a memory-mapped embedding segment.
+        
+        Args:
+            path: Path of the raw float32 segment file
+            dimension: Embedding dimension (None until the first append)
+            max_rows: Only expose this many rows (used to ignore a torn tail)
+        """
+        super().__init__(dimension)
+        self.path = path
+        self._max_rows = max_rows
+        self.refresh()
+    
+    @property
+    def resident_nbytes(self) -> int:
+        # Mapped pages are file-backed, shared and evictable: not process memory
+        return 0
+    
+    def refresh(self) -> None:
+        """Re-map the segment to pick up rows appended by a writer."""
+        if self.dimension is None or not os.path.exists(self.path):
+            return
+            
+        rows = os.path.getsize(self.path) // (4 * self.dimension)
+        if self._max_rows is not None:
+            rows = min(rows, self._max_rows)
+            self._max_rows = None
+        self._size = rows
+        self._data = (
+            np.memmap(self.path, dtype=np.float32, mode='r', shape=(rows, self.dimension))
+            if rows else np.empty((0, self.dimension), dtype=np.float32)
+        )
+    
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        batch = normalize_rows(np.atleast_2d(np.asarray(vectors, dtype=np.float32)))
+        if self.dimension is None:
+            self.dimension = batch.shape[1]
+        elif batch.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dimension mismatch: expected {self.dimension}, got {batch.shape[1]}"
+            )
+            
+        start = self._size
+        with open(self.path, 'r+b' if os.path.exists(self.path) else 'wb') as f:
+            # Overwrite any torn tail left beyond the last complete row
+            f.seek(start * 4 * self.dimension)
+            f.write(np.ascontiguousarray(batch).tobytes())
+            f.truncate()
+        self._max_rows = None
+        self.refresh()
+        return np.arange(start, self._size)
+
+
+class DocumentSidecar:
+    """
+    Append-only JSON-lines document store with an offset index.
+    
+    Behaves like a read-mostly list of documents: ``len()``, indexing and
+    iteration parse documents on demand, with a bounded LRU of parsed
+    documents for hot rows.
+    """
+    
+    def __init__(self, data_path: str, index_path: str, cache_size: int = 10000):
+        """
+        Open (or create) the sidecar.
+        
+        Args:
+            data_path: Path of the JSON-lines file
+            index_path: Path of the raw int64 offsets file
+            cache_size: Number of parsed documents kept in memory
+        """
+        self.data_path = data_path
+        self.index_path = index_path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._offsets = array('q')
+        self.refresh()
+    
+    def copy_rows(self, rows: np.ndarray, data_path: str, index_path: str) -> None:
+        """
+        Write the given rows to a new sidecar without re-parsing them.
+        
+        Args:
+            rows: Row ids to copy, in their new order
+            data_path: Path of the new JSON-lines file
+            index_path: Path of the new offsets file
+        """
+        offsets = array('q')
+        with open(self.data_path, 'rb') as source, open(data_path, 'wb') as target:
+            for row in rows:
+                source.seek(self._offsets[int(row)])
+                offsets.append(target.tell())
+                target.write(source.readline())
+        with open(index_path, 'wb') as f:
+            f.write(offsets.tobytes())
+    
+    def refresh(self) -> None:
+        """Reload the offset index to pick up appended documents."""
+        self._offsets = array('q')
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                self._offsets.frombytes(f.read())
+    
+    def truncate(self, count: int) -> None:
+        """Drop documents beyond ``count`` (recovery from a torn write)."""
+        if count >= len(self._offsets):
+            return
+            
+        end = self._offsets[count]
+        del self._offsets[count:]
+        with open(self.index_path, 'r+b') as f:
+            f.truncate(count * self._offsets.itemsize)
+        with open(self.data_path, 'r+b') as f:
+            f.truncate(end)
+        for row in [r for r in self._cache if r >= count]:
+            del self._cache[row]
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for start in range(0, len(self), COMPACTION_CHUNK_ROWS):
+            yield from self.read_range(start, min(start + COMPACTION_CHUNK_ROWS, len(self)))
+    
+    def read_range(self, start: int, stop: int) -> List[Dict[str, Any]]:
+        """
+        Parse a contiguous range of rows in one sequential read.
+        
+        Args:
+            start: First row
+            stop: Row after the last one
+            
+        Returns:
+            Documents of rows start..stop-1
+        """
+        stop = min(stop, len(self))
+        if start >= stop:
+            return []
+        documents = []
+        with open(self.data_path, 'rb') as f:
+            f.seek(self._offsets[start])
+            for row in range(start, stop):
+                line = f.readline()
+                cached = self._cache.get(row)
+                documents.append(cached if cached is not None else json.loads(line, object_hook=_decode_value))
+        return documents
+    
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        row = int(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("document row out of range")
+            
+        if row in self._cache:
+            self._cache.move_to_end(row)
+            return self._cache[row]
+            
+        with open(self.data_path, 'rb') as f:
+            f.seek(self._offsets[row])
+            document = json.loads(f.readline(), object_hook=_decode_value)
+        self._remember(row, document)
+        return document
+    
+    @staticmethod
+    def encode(document: Dict[str, Any]) -> bytes:
+        """Serialize a document to its JSON line (TypeError if it cannot be)."""
+        return (json.dumps(document, default=_encode_value) + "\n").encode('utf-8')
+    
+    def append(self, document: Dict[str, Any], line: Optional[bytes] = None) -> int:
+        """
+        Append a document.
+        
+        Args:
+            document: Document dictionary (datetimes are preserved)
+            line: The document already serialized with encode()
+            
+        Returns:
+            Row id of the appended document
+        """
+        if line is None:
+            line = self.encode(document)
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(line)
+        with open(self.index_path, 'ab') as f:
+            f.write(array('q', [offset]).tobytes())
+            
+        self._offsets.append(offset)
+        row = len(self._offsets) - 1
+        self._remember(row, document)
+        return row
+    
+    def _remember(self, row: int, document: Dict[str, Any]) -> None:
+        self._cache[row] = document
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding store: memory-mapped vectors plus document sidecar.
+    
+    Example:
+        >>> store = EmbeddingStore("/data/semantic_index", "text-embedding-ada-002")
+        >>> row = store.append(document, embedding)
+        >>> scores = store.embeddings.scores(query_embedding)
+    """
+    
+    def __init__(self, path: str, embedding_model: str):
+        """
+        Open (or create) a store directory.
+        
+        Args:
+            path: Store directory
+            embedding_model: Embedding model the vectors were produced with
+        """
+        self.path = path
+        self.embedding_model = embedding_model
+        os.makedirs(path, exist_ok=True)
+        
+        meta = self._read_meta()
+        if meta and meta.get('embedding_model') != embedding_model:
+            raise ValueError(
+                f"Store at {path} was built with {meta.get('embedding_model')}, "
+                f"not {embedding_model}"
+            )
+            
+        self.generation = meta.get('generation', 0) if meta else 0
+        self._open(meta.get('dimension') if meta else None)
+        
+        # Clean up after a crash between switching generations and cleanup
+        if self.generation:
+            self._remove_generation(self.generation - 1)
+    
+    def __len__(self) -> int:
+        return len(self.embeddings)
+    
+    def mark_deleted(self, rows: List[int]) -> None:
+        """
+        Persist tombstones for deleted rows.
+        
+        Args:
+            rows: Row ids that were deleted
+        """
+        with open(self._file('tombstones.idx'), 'ab') as f:
+            f.write(array('q', [int(row) for row in rows]).tobytes())
+    
+    def save_indexes(self, indexes: Dict[str, Any]) -> None:
+        """
+        Snapshot secondary indexes in the current generation.
+        
+        Args:
+            indexes: Picklable indexes, each covering a prefix of the rows
+        """
+        path = self._file('indexes.pkl')
+        # Write-then-rename so a reader never loads a partial snapshot
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump({'format_version': INDEXES_FORMAT_VERSION, 'indexes': indexes}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+    
+    def load_indexes(self) -> Optional[Dict[str, Any]]:
+        """Secondary indexes saved in the current generation, or None."""
+        path = self._file('indexes.pkl')
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None  # Unreadable snapshots are rebuilt from the sidecar
+        if snapshot.get('format_version') != INDEXES_FORMAT_VERSION:
+            return None
+        return snapshot['indexes']
+    
+    def deleted_rows(self) -> np.ndarray:
+        """Row ids tombstoned in the current generation."""
+        path = self._file('tombstones.idx')
+        if not os.path.exists(path):
+            return np.empty(0, dtype=np.int64)
+        return np.fromfile(path, dtype=np.int64)
+    
+    def prepare_compaction(self, live_rows: np.ndarray) -> Tuple[DocumentSidecar, MemmapEmbeddingMatrix]:
+        """
+        Write the live rows to the next generation of files.
+        
+        The current generation stays active until ``commit_compaction``.
+        
+        Args:
+            live_rows: Sorted ids of rows to keep
+            
+        Returns:
+            Tuple of (documents, embeddings) opened on the new files
+        """
+        generation = self.generation + 1
+        self._remove_generation(generation)  # Leftovers of an interrupted compaction
+        
+        with open(self._file('embeddings.f32', generation), 'wb') as f:
+            for start in range(0, len(live_rows), COMPACTION_CHUNK_ROWS):
+                rows = live_rows[start:start + COMPACTION_CHUNK_ROWS]
+                f.write(np.ascontiguousarray(self.embeddings.vectors[rows]).tobytes())
+                
+        self.documents.copy_rows(
+            live_rows,
+            self._file('documents.jsonl', generation),
+            self._file('documents.idx', generation)
+        )
+        documents = DocumentSidecar(
+            self._file('documents.jsonl', generation),
+            self._file('documents.idx', generation)
+        )
+        embeddings = MemmapEmbeddingMatrix(
+            self._file('embeddings.f32', generation),
+            dimension=self.embeddings.dimension,
+            max_rows=len(documents)
+        )
+        return documents, embeddings
+    
+    def commit_compaction(self, documents: DocumentSidecar, embeddings: MemmapEmbeddingMatrix) -> None:
+        """
+        Switch to the generation written by ``prepare_compaction``.
+        
+        Readers in other processes pick up the switch on ``refresh()``.
+        
+        Args:
+            documents: Documents returned by prepare_compaction
+            embeddings: Embeddings returned by prepare_compaction
+        """
+        self.generation += 1
+        self._write_meta()
+        self.documents = documents
+        self.embeddings = embeddings
+        self._remove_generation(self.generation - 1)
+    
+    def append(self, document: Dict[str, Any], embedding: np.ndarray) -> int:
+        """
+        Persist one document and its embedding.
+        
+        Args:
+            document: Document dictionary
+            embedding: Embedding vector
+            
+        Returns:
+            Row id assigned to the document
+        """
+        return int(self.append_batch([document], np.atleast_2d(embedding))[0])
+    
+    def encode_documents(self, documents: List[Dict[str, Any]]) -> List[bytes]:
+        """Serialize documents for append_batch, raising before anything is written."""
+        return [self.documents.encode(document) for document in documents]
+    
+    def append_batch(
+        self,
+        documents: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+        lines: Optional[List[bytes]] = None
+    ) -> np.ndarray:
+        """
+        Persist a batch of documents and their embeddings.
+        
+        Args:
+            documents: Document dictionaries
+            embeddings: Embedding matrix of shape (len(documents), d)
+            lines: The documents already serialized with encode_documents()
+            
+        Returns:
+            Row ids assigned to the documents
+        """
+        if lines is None:
+            lines = self.encode_documents(documents)
+        first_write = self.embeddings.dimension is None
+        row_ids = self.embeddings.append(embeddings)
+        if first_write:
+            self._write_meta()
+        for document, line in zip(documents, lines):
+            self.documents.append(document, line)
+        return row_ids
+    
+    def refresh(self) -> bool:
+        """
+        Pick up rows appended by the writer process.
+        
+        Returns:
+            True if the writer compacted the store and row ids changed
+        """
+        meta = self._read_meta()
+        generation = meta.get('generation', 0) if meta else 0
+        if generation != self.generation:
+            self.generation = generation
+            self._open(meta.get('dimension'))
+            return True
+            
+        if self.embeddings.dimension is None:
+            self.embeddings.dimension = meta.get('dimension') if meta else None
+        self.documents.refresh()
+        self.embeddings._max_rows = len(self.documents)
+        self.embeddings.refresh()
+        return False
+    
+    def _open(self, dimension: Optional[int]) -> None:
+        self.documents = DocumentSidecar(
+            self._file('documents.jsonl'),
+            self._file('documents.idx')
+        )
+        self.embeddings = MemmapEmbeddingMatrix(
+            self._file('embeddings.f32'),
+            dimension=dimension,
+            max_rows=len(self.documents)
+        )
+        
+        # Recover from a crash between the embedding and document writes
+        self.documents.truncate(len(self.embeddings))
+    
+    def _file(self, name: str, generation: Optional[int] = None) -> str:
+        """Path of a store file in the given (default: current) generation."""
+        generation = self.generation if generation is None else generation
+        if generation:
+            stem, extension = os.path.splitext(name)
+            name = f"{stem}.{generation}{extension}"
+        return os.path.join(self.path, name)
+    
+    def _remove_generation(self, generation: int) -> None:
+        for name in GENERATION_FILES:
+            path = self._file(name, generation)
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        meta_path = os.path.join(self.path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+    
+    def _write_meta(self) -> None:
+        meta_path = os.path.join(self.path, 'meta.json')
+        # Write-then-rename so readers never see a partial file
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({
+                'format_version': FORMAT_VERSION,
+                'embedding_model': self.embedding_model,
+                'dimension': self.embeddings.dimension,
+                'generation': self.generation
+            }, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON encoder hook preserving datetimes and numpy scalars."""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_value(obj: Dict[str, Any]) -> Any:
+    """JSON decoder hook restoring datetimes."""
+    if len(obj) == 1 and '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    return obj
@@ -0,0 +1,161 @@
+"""
+Document id to row mapping with tombstones for updates and deletes.
+
+Rows are append-only, so updating a document appends its new rows and
+tombstones the old ones; deleting only sets tombstone bits. Search drops
+tombstoned rows with a boolean mask, and compaction rewrites storage once
+the tombstone ratio grows too large.
+"""
+
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+class RowMap:
+    """
+    Live rows per document id plus a tombstone bitmap over all rows.
+    
+    Passage rows of one document share its id (``parent_id``); a row with
+    ``chunk_index`` 0 starts a new version of the document and supersedes
+    the rows of the previous version. Documents without an id cannot be
+    addressed and are never superseded.
+    
+    Example:
+        >>> row_map = RowMap()
+        >>> row_map.add(np.arange(len(rows)), rows)
+        >>> deleted = row_map.remove("doc_001")
+        >>> live = row_ids[~row_map.is_deleted(row_ids)]
+    """
+    
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize an empty map.
+        
+        Args:
+            initial_capacity: Rows to pre-allocate
+        """
+        self._rows: Dict[str, List[int]] = {}
+        self._owners: List[Optional[str]] = []  # Document id per row
+        self._deleted = np.zeros(max(1, initial_capacity), dtype=bool)
+        self._size = 0
+        self._anonymous = 0  # Live documents without an id
+        self.deleted_count = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._rows
+    
+    @property
+    def document_count(self) -> int:
+        """Number of live documents."""
+        return len(self._rows) + self._anonymous
+    
+    @property
+    def tombstone_ratio(self) -> float:
+        """Fraction of stored rows that are tombstoned."""
+        return self.deleted_count / self._size if self._size else 0.0
+    
+    def add(self, row_ids: np.ndarray, documents: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Map newly stored rows to their documents.
+        
+        Args:
+            row_ids: Row ids assigned to the rows (contiguous, increasing);
+                rows already mapped are skipped
+            documents: Row documents (passages or whole documents)
+            
+        Returns:
+            Rows of previous versions that were tombstoned
+        """
+        if len(row_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+        self._reserve(int(row_ids[-1]) + 1)
+        
+        superseded: List[int] = []
+        for row, document in zip(row_ids, documents):
+            row = int(row)
+            if row < self._size:
+                continue
+            document_id = document.get('parent_id', document.get('id')) or None
+            self._owners.append(document_id)
+            first_row = document.get('chunk_index', 0) == 0
+            
+            if document_id is None:
+                self._anonymous += first_row
+                continue
+            if first_row:
+                previous = self._rows.pop(document_id, None)
+                if previous:
+                    self._tombstone(previous)
+                    superseded.extend(previous)
+                self._rows[document_id] = [row]
+            else:
+                self._rows.setdefault(document_id, []).append(row)
+                
+        self._size = max(self._size, int(row_ids[-1]) + 1)
+        return np.asarray(superseded, dtype=np.int64)
+    
+    def rows(self, document_id: str) -> List[int]:
+        """Live rows of a document (empty if unknown or deleted)."""
+        return list(self._rows.get(document_id, []))
+    
+    def remove(self, document_id: str) -> List[int]:
+        """
+        Tombstone every row of a document.
+        
+        Args:
+            document_id: Id of the document to delete
+            
+        Returns:
+            Rows that were tombstoned (empty if the id is unknown)
+        """
+        rows = self._rows.pop(document_id, None)
+        if not rows:
+            return []
+        self._tombstone(rows)
+        return rows
+    
+    def mark_deleted(self, rows: np.ndarray) -> List[str]:
+        """
+        Re-apply persisted tombstones (e.g. after reopening a store).
+        
+        Args:
+            rows: Tombstoned row ids
+            
+        Returns:
+            Ids of the documents that were removed
+        """
+        removed = []
+        for row in np.asarray(rows, dtype=np.int64):
+            row = int(row)
+            if row >= self._size or self._deleted[row]:
+                continue
+            owner = self._owners[row]
+            if owner is not None and row in self._rows.get(owner, ()):
+                self.remove(owner)
+                removed.append(owner)
+        return removed
+    
+    def is_deleted(self, rows: np.ndarray) -> np.ndarray:
+        """Boolean mask of tombstoned rows."""
+        return self._deleted[rows]
+    
+    def live_rows(self) -> np.ndarray:
+        """Sorted ids of rows that are not tombstoned."""
+        return np.flatnonzero(~self._deleted[:self._size])
+    
+    def _tombstone(self, rows: List[int]) -> None:
+        fresh = [row for row in rows if not self._deleted[row]]
+        self._deleted[fresh] = True
+        self.deleted_count += len(fresh)
+    
+    def _reserve(self, required: int) -> None:
+        capacity = len(self._deleted)
+        if required <= capacity:
+            return
+            
+        grown = np.zeros(max(required, capacity * 2), dtype=bool)
+        grown[:capacity] = self._deleted
+        self._deleted = grown
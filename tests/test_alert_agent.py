@@ -0,0 +1,47 @@
+"""
+Alert grouping, escalation and enrichment in the alert agent.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from llm_research_platform.agents import AlertAgent
+from llm_research_platform.agents.alerts import AlertPriority
+
+
+@pytest.mark.parametrize('async_enrichment', [False, True])
+def test_escalated_occurrence_is_enriched_again(async_enrichment):
+    agent = AlertAgent(async_enrichment=async_enrichment)
+    start = datetime(2026, 3, 2, 9, 0)
+    context = {'region': 'US', 'detected_at': start}
+    
+    alert = agent.create_alert({'metric': 'revenue', 'change': -3}, context)
+    agent.wait_for_enrichment(timeout=5)
+    assert alert.priority == AlertPriority.LOW
+    assert "Market sentiment shift" not in alert.root_causes
+    
+    escalated = agent.create_alert(
+        {'metric': 'revenue', 'change': -30},
+        {**context, 'detected_at': start + timedelta(minutes=5)}
+    )
+    agent.wait_for_enrichment(timeout=5)
+    agent.close()
+    assert escalated is alert
+    assert alert.occurrences == 2
+    assert alert.priority == AlertPriority.CRITICAL
+    assert alert.enrichment_status == "complete"
+    assert "Market sentiment shift" in alert.root_causes
+    assert "-30%" in alert.description
+
+
+def test_entity_and_region_contexts_get_the_same_enrichment():
+    agent = AlertAgent()
+    by_entity = agent.create_alert({'metric': 'revenue', 'change': -3}, {'entity': 'EU'})
+    agent.resolve_alert(by_entity.id)
+    by_region = agent.create_alert({'metric': 'revenue', 'change': -3}, {'region': 'EU'})
+    assert by_region is not by_entity
+    assert by_region.fingerprint == by_entity.fingerprint
+    assert "Regulatory uncertainty in EU markets" in by_entity.root_causes
+    assert by_region.root_causes == by_entity.root_causes
+    assert "in EU" in by_entity.description
@@ -0,0 +1,81 @@
+"""
+Streaming anomaly detection: one alert per anomalous run, cooldown, alert hand-off.
+"""
+
+import numpy as np
+import pytest
+
+from llm_research_platform.agents import AlertAgent
+from llm_research_platform.alerting import StreamingAnomalyDetector
+
+
+class _Series:
+    """Feeds one series a point per minute."""
+    
+    def __init__(self, detector, entity='Ethereum', metric='tvl'):
+        self.detector = detector
+        self.entity = entity
+        self.metric = metric
+        self.timestamp = 0.0
+        self.rng = np.random.default_rng(0)
+    
+    def feed(self, value):
+        anomaly = self.detector.observe(self.entity, self.metric, value, self.timestamp)
+        self.timestamp += 60
+        return anomaly
+    
+    def baseline(self, points):
+        for _ in range(points):
+            assert self.feed(100 + self.rng.normal()) is None
+
+
+def test_one_alert_per_run_and_quiet_during_cooldown():
+    detector = StreamingAnomalyDetector(cooldown=900)
+    series = _Series(detector)
+    series.baseline(40)
+    
+    run = [series.feed(150) for _ in range(3)]
+    assert run[0] is not None and run[0].direction == "up"
+    assert run[1:] == [None, None]
+    
+    # A new spike six minutes after the alert is inside the cooldown
+    series.baseline(3)
+    assert series.feed(1000) is None
+    
+    series.baseline(15)
+    anomaly = series.feed(1000)
+    assert anomaly is not None
+    assert anomaly.timestamp - run[0].timestamp >= 900
+    assert detector.get_stats() == {
+        'series': 1, 'points': 63, 'flagged': 5, 'anomalies': 2, 'suppressed': 3
+    }
+
+
+def test_series_need_min_samples_before_alerting():
+    detector = StreamingAnomalyDetector(window=64, min_samples=30)
+    series = _Series(detector)
+    series.baseline(20)
+    assert series.feed(1000) is None
+    assert detector.get_stats()['flagged'] == 0
+    
+    with pytest.raises(ValueError):
+        StreamingAnomalyDetector(window=16, min_samples=30)
+
+
+def test_anomalies_after_cooldown_group_into_the_open_alert():
+    agent = AlertAgent(group_window=900)
+    detector = StreamingAnomalyDetector(alert_agent=agent, cooldown=300)
+    series = _Series(detector)
+    series.baseline(40)
+    first = series.feed(150)
+    series.baseline(9)
+    second = series.feed(1000)
+    assert first is not None and second is not None
+    
+    alerts = agent.active_alerts
+    assert len(alerts) == 1
+    assert alerts[0].occurrences == 2
+    assert alerts[0].fingerprint == ('tvl', 'Ethereum', 'up')
+    assert alerts[0].last_seen.timestamp() == second.timestamp
+    # Already critical at +50%: the larger spike does not replace the anomaly
+    assert alerts[0].metadata['current_value'] == first.value
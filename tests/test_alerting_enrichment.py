@@ -0,0 +1,75 @@
+"""
+EnrichmentPool delivery when submits race with close.
+"""
+
+import threading
+
+import pytest
+
+from llm_research_platform.alerting import EnrichmentPool
+
+
+def test_submit_after_close_raises():
+    pool = EnrichmentPool(lambda items: items, lambda item, result, error: None)
+    pool.submit(1)
+    pool.close(timeout=5)
+    with pytest.raises(RuntimeError):
+        pool.submit(2)
+    assert pool.join(timeout=5)
+
+
+def test_close_before_first_submit():
+    pool = EnrichmentPool(lambda items: items, lambda item, result, error: None)
+    pool.close()
+    with pytest.raises(RuntimeError):
+        pool.submit(1)
+    assert pool.join(timeout=1)
+
+
+def test_close_between_submit_checks_cannot_strand_an_item():
+    class ClosingPool(EnrichmentPool):
+        def _start(self):
+            super()._start()
+            if not self._closing:
+                self.close(timeout=5)  # Lands inside submit, after the loop started
+                
+    pool = ClosingPool(lambda items: items, lambda item, result, error: None)
+    with pytest.raises(RuntimeError):
+        pool.submit(1)
+    assert pool.join(timeout=1)
+    assert pool.pending == 0
+
+
+def test_items_accepted_before_close_are_delivered():
+    for _ in range(20):
+        delivered = []
+        pool = EnrichmentPool(
+            lambda items: items,
+            lambda item, result, error: delivered.append(item),
+            max_batch_size=8,
+            batch_window=0.001
+        )
+        accepted = []
+        lock = threading.Lock()
+        start = threading.Barrier(5)
+        
+        def produce(worker):
+            start.wait()
+            for i in range(200):
+                try:
+                    pool.submit((worker, i))
+                except RuntimeError:
+                    return
+                with lock:
+                    accepted.append((worker, i))
+                    
+        threads = [threading.Thread(target=produce, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        pool.close(timeout=5)
+        for thread in threads:
+            thread.join()
+            
+        assert pool.join(timeout=5)
+        assert sorted(delivered) == sorted(accepted)
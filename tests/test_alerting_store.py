@@ -0,0 +1,70 @@
+"""
+Indexed alert store, fingerprint grouping windows and the enrichment cache.
+"""
+
+from types import SimpleNamespace
+import time
+
+from llm_research_platform.alerting import AlertGrouper, AlertStore, EnrichmentCache
+
+
+def _alert(alert_id, status='active', priority='low'):
+    return SimpleNamespace(id=alert_id, status=status, priority=priority)
+
+
+def test_store_indexes_transitions_and_bounds_history():
+    store = AlertStore(history_size=2)
+    for i, priority in enumerate(['low', 'high', 'low', 'critical']):
+        store.add(_alert(f'a{i}', priority=priority))
+        
+    assert [a.id for a in store.select(['active'], ['critical', 'high', 'low'])] == ['a3', 'a1', 'a0', 'a2']
+    store.set_status('a0', 'acknowledged')
+    store.set_priority('a2', 'high')
+    assert [a.id for a in store.select(['active', 'acknowledged'], ['high', 'low'])] == ['a1', 'a2', 'a0']
+    assert store.count('active', 'high') == 2
+    assert store.status_counts == {'active': 3, 'acknowledged': 1}
+    assert store.priority_counts == {'low': 1, 'high': 2, 'critical': 1}
+    
+    for alert_id in ['a0', 'a1', 'a2']:
+        assert store.archive(alert_id, 'resolved').status == 'resolved'
+    assert store.archive('a0', 'resolved') is None
+    assert store.set_status('a1', 'active') is None
+    assert [a.id for a in store] == ['a3']
+    assert [a.id for a in store.history] == ['a1', 'a2']
+    assert store.archived_counts == {'resolved': 3}
+    assert store.status_counts['acknowledged'] == 0
+
+
+def test_grouping_window_slides_with_each_occurrence():
+    grouper = AlertGrouper(window_seconds=900)
+    fingerprint = ('tvl', 'Ethereum', 'down')
+    assert grouper.match(fingerprint, 0) is None
+    grouper.track(fingerprint, 'a1', 0)
+    
+    assert grouper.match(fingerprint, 800) == 'a1'
+    assert grouper.match(fingerprint, 1600) == 'a1'
+    assert grouper.match(('tvl', 'Ethereum', 'up'), 1600) is None
+    assert grouper.match(fingerprint, 2600) is None
+    assert len(grouper) == 0
+    
+    grouper.track(fingerprint, 'a2', 3000)
+    grouper.forget('a2')
+    assert grouper.match(fingerprint, 3001) is None
+    assert grouper.grouped == 2
+
+
+def test_enrichment_cache_evicts_least_recent_and_expires():
+    cache = EnrichmentCache(max_entries=2, ttl=None)
+    cache.put('a', {'root_causes': ['a']})
+    cache.put('b', {'root_causes': ['b']})
+    assert cache.get('a') == {'root_causes': ['a']}
+    cache.put('c', {'root_causes': ['c']})
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.get_stats()['hits'] == 3
+    
+    expiring = EnrichmentCache(ttl=0.01)
+    expiring.put('a', {'root_causes': []})
+    time.sleep(0.02)
+    assert expiring.get('a') is None
+    assert len(expiring) == 0
@@ -0,0 +1,65 @@
+"""
+Activity retention, trending windows and the counters derived from them.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+import random
+
+from llm_research_platform.agents import RecommendationAgent
+from llm_research_platform.recommendation import ActivityStore
+
+
+def test_trending_matches_a_full_count_of_the_window():
+    rng = random.Random(5)
+    store = ActivityStore(bucket_seconds=60, trending_buckets=5, top_size=8)
+    start = 1_700_000_000.0
+    events = []
+    for i in range(3000):
+        timestamp = start + i * 0.5 + rng.uniform(-30, 0)
+        item = f"item_{int(rng.paretovariate(1.2)) % 40}"
+        store.append(f"user_{i % 13}", {'type': 'view', 'item_id': item, 'timestamp': timestamp})
+        events.append((timestamp, item))
+        if i % 250 == 0:
+            now = start + i * 0.5
+            window_start = (int(now // 60) - 4) * 60
+            expected = Counter(item for timestamp, item in events if window_start <= timestamp)
+            counts = [count for _, count in store.trending(5, now=now)]
+            assert counts == sorted(expected.values(), reverse=True)[:5]
+            assert store.trending(20, now=now) == store.trending(20, now=now)
+
+
+def test_trending_expires_by_wall_clock_on_read():
+    store = ActivityStore(bucket_seconds=3600, trending_buckets=24)
+    now = datetime(2026, 5, 1, 12, 0)
+    store.append('user_a', {'type': 'view', 'item_id': 'paper_1', 'timestamp': now})
+    assert store.trending(3, now=now) == [('paper_1', 1)]
+    assert store.trending(3, now=now + timedelta(hours=25)) == []
+    
+    # Events after the wall-clock window moved on are counted again
+    later = now + timedelta(hours=26)
+    store.append('user_a', {'type': 'view', 'item_id': 'paper_2', 'timestamp': later})
+    assert store.trending(3, now=later) == [('paper_2', 1)]
+
+
+def test_interest_counts_drop_evicted_and_expired_activity():
+    agent = RecommendationAgent(max_activities_per_user=2, activity_retention_days=1)
+    start = datetime(2026, 5, 1, 12, 0)
+    agent.track_activity('user_a', {
+        'type': 'publish', 'category': 'defi', 'tags': ['lending'], 'timestamp': start
+    })
+    agent.track_activity('user_a', {'type': 'view', 'category': 'macro', 'timestamp': start})
+    assert agent.interest_counts['user_a'] == Counter({'defi': 1, 'lending': 1, 'macro': 1})
+    assert agent.expertise_counts['user_a'] == Counter({'defi': 1})
+    
+    # The per-user cap evicts the publish event
+    agent.track_activity('user_a', {'type': 'view', 'category': 'macro', 'timestamp': start})
+    assert agent.interest_counts['user_a'] == Counter({'macro': 2})
+    assert agent.expertise_counts['user_a'] == Counter()
+    assert agent._get_user_profile('user_a').expertise_areas == []
+    
+    # Retention expires both older events; a stale event is never counted
+    agent.track_activity('user_a', {'type': 'view', 'category': 'rates', 'timestamp': start + timedelta(days=2)})
+    agent.track_activity('user_a', {'type': 'view', 'category': 'macro', 'timestamp': start})
+    assert agent.interest_counts['user_a'] == Counter({'rates': 1})
+    assert agent._get_user_profile('user_a').interests == ['rates']
@@ -0,0 +1,75 @@
+"""
+Preference vectors over a catalogue mixing supplied and hashed embeddings.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from llm_research_platform.agents import RecommendationAgent
+from llm_research_platform.recommendation import (
+    PREFERENCE_DIMENSION,
+    PreferenceVectors,
+    content_embedding,
+)
+
+
+def _mixed_catalogue():
+    rng = np.random.default_rng(7)
+    return [
+        # Supplied embeddings of a different size than the hashed ones
+        {'id': 'ada_1', 'title': 'ETH staking yields', 'embedding': rng.standard_normal(1536)},
+        {'id': 'ada_2', 'title': 'Restaking risks', 'embedding': rng.standard_normal(1536)},
+        {'id': 'small_1', 'title': 'L2 fees', 'embedding': rng.standard_normal(64).tolist()},
+        # No embedding: hashed from tags, category and title
+        {'id': 'tags_1', 'title': 'DeFi lending', 'tags': ['defi', 'lending'], 'category': 'defi'},
+        {'id': 'tags_2', 'title': 'Stablecoin flows', 'tags': ['stablecoins'], 'category': 'markets'},
+    ]
+
+
+def test_content_embedding_has_preference_dimension():
+    for content in _mixed_catalogue():
+        vector = content_embedding(content)
+        assert vector.shape == (PREFERENCE_DIMENSION,)
+        assert np.isclose(np.linalg.norm(vector), 1.0, atol=1e-5)
+
+
+def test_projection_is_stable_and_preserves_similarity():
+    rng = np.random.default_rng(3)
+    base = rng.standard_normal(1536)
+    near = base + 0.1 * rng.standard_normal(1536)
+    far = rng.standard_normal(1536)
+    
+    vector = content_embedding({'embedding': base})
+    assert np.array_equal(vector, content_embedding({'embedding': base}))
+    assert vector @ content_embedding({'embedding': near}) > 0.9
+    assert abs(vector @ content_embedding({'embedding': far})) < 0.5
+
+
+def test_track_activity_over_mixed_catalogue():
+    agent = RecommendationAgent()
+    catalogue = _mixed_catalogue()
+    for content in catalogue:
+        agent.add_content(content)
+        
+    start = datetime(2024, 1, 1)
+    for i, user_id in enumerate(['user_a', 'user_b', 'user_c']):
+        for j, content in enumerate(catalogue):
+            agent.track_activity(user_id, {
+                'type': 'view',
+                'item_id': content['id'],
+                'timestamp': start + timedelta(minutes=10 * i + j)
+            })
+            
+    assert agent.preferences.vector('user_a').shape == (PREFERENCE_DIMENSION,)
+    similar = agent.preferences.similar('user_a', k=2)
+    assert {user_id for user_id, _ in similar} == {'user_b', 'user_c'}
+    assert agent.get_recommendations('user_a', limit=3) is not None
+
+
+def test_update_rejects_mismatched_dimension():
+    preferences = PreferenceVectors()
+    preferences.update('user_a', np.ones(PREFERENCE_DIMENSION), weight=1.0, timestamp=0.0)
+    with pytest.raises(ValueError):
+        preferences.update('user_a', np.ones(1536), weight=1.0, timestamp=1.0)
@@ -0,0 +1,93 @@
+"""
+BM25 over compressed postings, rank fusion and sharded exact scans.
+"""
+
+from collections import Counter
+import math
+import pickle
+
+import numpy as np
+
+from llm_research_platform.search import (
+    BM25Index,
+    EmbeddingMatrix,
+    ShardedSearchPool,
+    reciprocal_rank_fusion,
+)
+from llm_research_platform.search.lexical import tokenize
+
+VOCABULARY = ['eth', 'staking', 'yield', 'uniswap', 'v3', '0x1f98431c', 'lido', 'restaking', 'fees', 'l2']
+
+
+def _documents(count, seed=3):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'title': ' '.join(rng.choice(VOCABULARY, size=2)),
+            'content': ' '.join(rng.choice(VOCABULARY, size=int(rng.integers(3, 30))))
+        }
+        for _ in range(count)
+    ]
+
+
+def _reference_bm25(documents, query, k1=1.2, b=0.75):
+    tokens = [tokenize(d['title']) + tokenize(d['content']) for d in documents]
+    avg_length = sum(map(len, tokens)) / len(tokens)
+    scores = {}
+    for term in dict.fromkeys(tokenize(query)):
+        containing = [row for row, doc in enumerate(tokens) if term in doc]
+        idf = math.log(1 + (len(tokens) - len(containing) + 0.5) / (len(containing) + 0.5))
+        for row in containing:
+            tf = Counter(tokens[row])[term]
+            norm = k1 * (1 - b + b * len(tokens[row]) / avg_length)
+            scores[row] = scores.get(row, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def test_bm25_matches_reference_across_postings_blocks():
+    documents = _documents(700)
+    index = BM25Index()
+    for start in range(0, len(documents), 96):
+        batch = documents[start:start + 96]
+        index.add(np.arange(start, start + len(batch)), batch)
+    restored = pickle.loads(pickle.dumps(index))
+    
+    for query in ['eth staking', 'uniswap 0x1F98431C', 'lido lido fees']:
+        expected = _reference_bm25(documents, query)
+        for searched in (index, restored):
+            rows, scores = searched.search(query, k=len(documents))
+            assert set(rows.tolist()) == set(expected)
+            assert np.allclose(scores, [expected[row] for row in rows], rtol=1e-5)
+            assert np.all(np.diff(scores) <= 0)
+            
+    candidates = np.arange(0, 700, 7)
+    rows, _ = index.search('eth staking', k=10, candidates=candidates)
+    assert len(rows) == 10 and set(rows.tolist()) <= set(candidates.tolist())
+    assert index.search('bitcoin', k=10)[0].size == 0
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    rows, scores = reciprocal_rank_fusion([np.array([3, 1, 2]), np.array([1, 4])], k=60)
+    assert rows.tolist() == [1, 3, 4, 2]
+    assert np.isclose(scores[0], 1 / 62 + 1 / 61)
+    assert reciprocal_rank_fusion([np.array([], dtype=np.int64)])[0].size == 0
+
+
+def test_sharded_pool_matches_exact_scan():
+    rng = np.random.default_rng(11)
+    matrix = EmbeddingMatrix(32)
+    matrix.append(rng.standard_normal((1000, 32)))
+    query = rng.standard_normal(32)
+    exact = matrix.scores(query)
+    
+    pool = ShardedSearchPool(matrix, num_shards=3)
+    try:
+        ids, scores = pool.search(query, k=10)
+        assert ids.tolist() == np.argsort(-exact)[:10].tolist()
+        assert np.allclose(scores, exact[ids], atol=1e-6)
+        
+        candidates = np.arange(5, 1000, 9)
+        ids, _ = pool.search(query, k=10, candidates=candidates)
+        assert ids.tolist() == candidates[np.argsort(-exact[candidates])[:10]].tolist()
+    finally:
+        pool.close()
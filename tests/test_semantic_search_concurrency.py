@@ -0,0 +1,83 @@
+"""
+Searches running while another thread indexes, upserts and deletes documents.
+"""
+
+from datetime import datetime, timedelta
+import threading
+
+import pytest
+
+from llm_research_platform.agents import SemanticSearchAgent
+
+
+def _document(i, now):
+    return {
+        'id': f'doc_{i}',
+        'title': f'Report {i}',
+        'content': f'supply chain report {i} alpha beta gamma {i % 7}',
+        'type': ('daily_brief', 'monthly_wrap')[i % 2],
+        'created_at': now - timedelta(days=i % 100)
+    }
+
+
+@pytest.mark.parametrize('persistent', [False, True])
+def test_index_while_searching(tmp_path, persistent):
+    agent = SemanticSearchAgent(
+        vector_store_path=str(tmp_path) if persistent else None,
+        result_cache_size=0,
+        compaction_threshold=None
+    )
+    now = datetime.now()
+    for i in range(50):
+        agent.index_document(_document(i, now))
+        
+    errors = []
+    done = threading.Event()
+    
+    def write():
+        try:
+            for i in range(50, 400):
+                agent.index_document(_document(i, now))
+                if i % 10 == 0:
+                    agent.upsert_document(_document(i - 5, now))
+                if i % 17 == 0:
+                    agent.delete_document(f'doc_{i - 3}')
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            done.set()
+            
+    def read():
+        while not done.is_set():
+            try:
+                results = agent.search(
+                    'supply chain alpha', top_k=5, time_filter='last month',
+                    document_types=['daily_brief'], retrieval_mode='hybrid'
+                )
+                assert all(result.document_type == 'daily_brief' for result in results)
+                assert all(result.created_at >= now - timedelta(days=31) for result in results)
+                agent.search('gamma report', top_k=5, retrieval_mode='lexical')
+                agent.search('gamma report', top_k=5, document_types=['monthly_wrap'])
+            except Exception as exc:
+                errors.append(exc)
+                return
+                
+    threads = [threading.Thread(target=read) for _ in range(4)] + [threading.Thread(target=write)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+        
+    assert not errors, errors
+    live = {f'doc_{i}' for i in range(50)}
+    for i in range(50, 400):
+        live.add(f'doc_{i}')
+        if i % 10 == 0:
+            live.add(f'doc_{i - 5}')
+        if i % 17 == 0:
+            live.discard(f'doc_{i - 3}')
+    assert agent.get_statistics()['total_documents'] == len(live)
+    results = agent.search('gamma report', top_k=400, retrieval_mode='lexical')
+    ids = [result.document_id for result in results]
+    assert len(ids) == len(set(ids))
+    assert set(ids) == live
@@ -0,0 +1,129 @@
+"""
+Indexing, persistence and recovery of the semantic search agent's row storage.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from llm_research_platform.agents import SemanticSearchAgent
+
+
+def _document(i, now, **fields):
+    document = {
+        'id': f'doc_{i}',
+        'title': f'Report {i}',
+        'content': f'supply chain report {i} alpha beta gamma {i % 7}',
+        'type': ('daily_brief', 'monthly_wrap')[i % 2],
+        'created_at': now - timedelta(days=i)
+    }
+    document.update(fields)
+    return document
+
+
+def _agent(tmp_path, persistent, **kwargs):
+    return SemanticSearchAgent(
+        vector_store_path=str(tmp_path) if persistent else None,
+        result_cache_size=0,
+        compaction_threshold=None,
+        **kwargs
+    )
+
+
+@pytest.mark.parametrize('persistent', [False, True])
+def test_rejected_batch_leaves_indexes_untouched(tmp_path, persistent):
+    agent = _agent(tmp_path, persistent)
+    now = datetime.now()
+    for i in range(5):
+        agent.index_document(_document(i, now))
+        
+    rows = agent._prepare_rows(_document(5, now))
+    with pytest.raises(ValueError):
+        agent._store_rows(rows, np.ones((1, agent.embeddings.dimension + 1)))
+    if persistent:
+        with pytest.raises(TypeError):
+            agent.index_document(_document(5, now, source=object()))
+            
+    # The next batch reuses the rejected rows' ids and indexes normally
+    agent.index_document(_document(5, now, content='late filing notice'))
+    results = agent.search('late filing notice', top_k=3, retrieval_mode='lexical')
+    assert [result.document_id for result in results] == ['doc_5']
+    assert agent.get_statistics()['total_documents'] == 6
+
+
+def test_compaction_invalidates_cached_results():
+    agent = SemanticSearchAgent(compaction_threshold=None)
+    now = datetime.now()
+    for i in range(40):
+        agent.index_document(_document(i, now))
+    for i in range(0, 40, 3):
+        agent.delete_document(f'doc_{i}')
+        
+    before = agent.search('supply chain gamma 3', top_k=5, retrieval_mode='lexical')
+    agent.compact()
+    after = agent.search('supply chain gamma 3', top_k=5, retrieval_mode='lexical')
+    
+    fresh = SemanticSearchAgent(result_cache_size=0)
+    for i in range(40):
+        if i % 3:
+            fresh.index_document(_document(i, now))
+    expected = fresh.search('supply chain gamma 3', top_k=5, retrieval_mode='lexical')
+    assert [(r.document_id, r.score) for r in after] == [(r.document_id, r.score) for r in expected]
+    assert [r.score for r in after] != [r.score for r in before]
+
+
+def _snapshot(agent):
+    statistics = agent.get_statistics()
+    searches = [
+        [(r.document_id, round(r.score, 5)) for r in agent.search(query, top_k=10, retrieval_mode=mode)]
+        for query, mode in [('supply chain gamma 3', 'lexical'), ('report alpha', 'vector')]
+    ]
+    return statistics['total_documents'], statistics['document_types'], searches
+
+
+def test_reopen_sees_upserts_and_deletes(tmp_path):
+    now = datetime.now()
+    writer = _agent(tmp_path, True)
+    writer.batch_index([_document(i, now) for i in range(60)])
+    writer.close()
+    
+    # Changes after the index snapshot are caught up on reopen
+    writer = _agent(tmp_path, True)
+    assert writer.upsert_document(_document(4, now, content='late filing notice'))
+    assert writer.delete_document('doc_9')
+    expected = _snapshot(writer)
+    
+    reader = _agent(tmp_path, True)
+    assert _snapshot(reader) == expected
+    assert [r.document_id for r in reader.search('late filing', top_k=2, retrieval_mode='lexical')] == ['doc_4']
+    assert 'doc_9' not in [r.document_id for r in reader.search('report 9', top_k=60, retrieval_mode='lexical')]
+    writer.close()
+    assert _snapshot(_agent(tmp_path, True)) == expected
+
+
+def test_reopen_after_compaction(tmp_path):
+    now = datetime.now()
+    writer = _agent(tmp_path, True)
+    writer.batch_index([_document(i, now) for i in range(60)])
+    for i in range(0, 60, 4):
+        writer.delete_document(f'doc_{i}')
+    writer.upsert_document(_document(1, now, content='late filing notice'))
+    
+    reader = _agent(tmp_path, True)
+    reader.search('report alpha', top_k=5)
+    assert writer.compact()['rows_after'] == 45
+    expected = _snapshot(writer)
+    writer.close()
+    
+    reopened = _agent(tmp_path, True)
+    assert _snapshot(reopened) == expected
+    assert reopened.get_statistics()['deleted_rows'] == 0
+    # A reader opened before the compaction switches to the new generation
+    reader.refresh()
+    assert _snapshot(reader) == expected
+    
+    reopened.index_document(_document(100, now))
+    assert reopened.get_statistics()['total_documents'] == 46
+    reopened.close()
+    assert _agent(tmp_path, True).get_statistics()['total_documents'] == 46